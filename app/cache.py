@@ -0,0 +1,81 @@
+import threading
+import time
+from collections import OrderedDict
+from functools import wraps
+from typing import Callable
+
+import pandas as pd
+
+from db.versions import load_versions
+
+
+class VersionedCache:
+    """Process-wide result cache keyed on the data_versions watermark of each source table.
+
+    Entries survive Streamlit reruns and sessions and are only recomputed once the ETL has
+    bumped the version of a table the cached function reads from.
+    """
+
+    def __init__(self, loader: Callable[[], dict | None], max_entries: int = 512, version_ttl_seconds: float = 2.0):
+        self.loader = loader
+        self.max_entries = max_entries
+        self.version_ttl_seconds = version_ttl_seconds
+        self.entries: OrderedDict = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self._versions: dict | None = None
+        self._versions_loaded_at = float('-inf')
+        self._lock = threading.Lock()
+
+    def versions(self) -> dict | None:
+        now = time.monotonic()
+        if now - self._versions_loaded_at > self.version_ttl_seconds:
+            self._versions = self.loader()
+            self._versions_loaded_at = now
+        return self._versions
+
+    def invalidate(self) -> None:
+        with self._lock:
+            self.entries.clear()
+            self._versions_loaded_at = float('-inf')
+
+    def cached(self, *tables: str):
+        def decorator(func):
+            name = f'{func.__module__}.{func.__qualname__}'
+
+            @wraps(func)
+            def wrapper(*args, **kwargs):
+                versions = self.versions()
+                if versions is None:
+                    with self._lock:
+                        self.misses += 1
+                    return func(*args, **kwargs)
+
+                key = (name, args, tuple(sorted(kwargs.items())), tuple(versions.get(t, (0, None))[0] for t in tables))
+                with self._lock:
+                    if key in self.entries:
+                        self.hits += 1
+                        self.entries.move_to_end(key)
+                        return _copy(self.entries[key])
+                    self.misses += 1
+
+                result = func(*args, **kwargs)
+                with self._lock:
+                    self.entries[key] = result
+                    while len(self.entries) > self.max_entries:
+                        self.entries.popitem(last=False)
+                return _copy(result)
+
+            return wrapper
+
+        return decorator
+
+    def stats(self) -> dict[str, int]:
+        return {'hits': self.hits, 'misses': self.misses, 'entries': len(self.entries)}
+
+
+def _copy(value):
+    return value.copy() if isinstance(value, pd.DataFrame) else value
+
+
+QUERY_CACHE = VersionedCache(load_versions)
@@ -1,5 +1,5 @@
+from datetime import date
 from functools import lru_cache
-from pathlib import Path
 
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
@@ -16,8 +16,43 @@ class Settings(BaseSettings):
     postgres_user: str = 'nba'
     postgres_password: str = 'nba'
 
+    db_pool_size: int = 5
+    db_max_overflow: int = 10
+    db_pool_recycle_seconds: int = 1800
+    sqlite_journal_mode: str = 'WAL'
+    sqlite_synchronous: str = 'NORMAL'
+    sqlite_mmap_bytes: int = 256 * 1024 * 1024
+    sqlite_busy_timeout_ms: int = 5000
+    sqlite_cache_size: int = -65536
+    db_snapshots: bool = False
+    db_snapshot_keep: int = 2
+    db_snapshot_schema: str = 'nba_snapshot'
+
+    bulk_chunk_size: int = 5000
+
     api_throttle_seconds: float = 0.7
+    api_rate_per_second: float | None = None
+    api_burst: int = 3
+    api_max_workers: int = 4
     cache_dir: str = './data/cache'
+    cache_max_mb: int = 256
+    cache_compact_hours: float = 24.0
+    cache_live_seconds: int = 300
+    metrics_dir: str = './data/metrics'
+    profile_dir: str = './data/profiles'
+    history_dir: str = './data/history'
+    history_format: str = 'arrow'
+
+    nba_season: str = '2024-25'
+    etl_bulk_ingest: bool = True
+    etl_incremental: bool = True
+    roster_refresh_hours: float = 24.0
+    schedule_lookback_days: int = 1
+    etl_today: date | None = None
+    refresh_interval_minutes: float = 360.0
+    refresh_game_day_minutes: float = 30.0
+    refresh_poll_seconds: float = 5.0
+    refresh_lease_seconds: float = 120.0
 
     def database_url(self) -> str:
         if self.db_backend.lower() == 'postgres':
@@ -27,14 +62,12 @@ class Settings(BaseSettings):
             )
         return f"sqlite:///{self.sqlite_path}"
 
-    def ensure_dirs(self) -> None:
-        Path(self.cache_dir).mkdir(parents=True, exist_ok=True)
-        if self.db_backend.lower() == 'sqlite':
-            Path(self.sqlite_path).parent.mkdir(parents=True, exist_ok=True)
+    def api_rate(self) -> float:
+        if self.api_rate_per_second:
+            return self.api_rate_per_second
+        return 1 / max(self.api_throttle_seconds, 0.01)
 
 
 @lru_cache(maxsize=1)
 def get_settings() -> Settings:
-    settings = Settings()
-    settings.ensure_dirs()
-    return settings
+    return Settings()
@@ -1,124 +1,133 @@
-import subprocess
+import time
 from datetime import date, timedelta
 
 import pandas as pd
 import streamlit as st
-from sqlalchemy import text
+from sqlalchemy.exc import DBAPIError
 
-from db.database import get_engine
+from app.cache import QUERY_CACHE
+from app.config import get_settings
+from app.metrics import METRICS
+from app.players import POSITIONS, PlayerIndex, load_player_index
+from app.slate import Slate, load_slate
+from app.stats import player_log_with_rolling, season_history, window_averages
+from db.database import read_snapshots
+from db.refresh import refresh_status, request_refresh
 
 
 st.set_page_config(page_title='NBA MVP Analytics', layout='wide')
+read_snapshots()
 
 
-def qdf(query: str, params=None) -> pd.DataFrame:
-    with get_engine().begin() as conn:
-        return pd.read_sql(text(query), conn, params=params or {})
-
-
-def freshness(table: str) -> str:
-    df = qdf(f'SELECT MAX(updated_at) AS ts FROM {table}')
-    ts = df.iloc[0]['ts']
-    return str(ts) if ts is not None else 'Never'
-
-
-def load_schedule(selected_date: date) -> pd.DataFrame:
-    return qdf(
-        """
-        SELECT s.game_id, s.game_date, s.status,
-               ht.name AS home_name, ht.team_id AS home_team_id,
-               at.name AS away_name, at.team_id AS away_team_id
-        FROM schedule s
-        JOIN teams ht ON ht.team_id = s.home_team_id
-        JOIN teams at ON at.team_id = s.away_team_id
-        WHERE s.game_date = :game_date
-        ORDER BY s.game_date
-        """,
-        {'game_date': selected_date.isoformat()},
-    )
-
-
-def team_last5(team_id: int) -> pd.DataFrame:
-    return qdf(
-        """
-        SELECT game_date, matchup, wl, pts, reb, ast, tov, fg_pct, fg3_pct
-        FROM team_game_stats
-        WHERE team_id = :team_id
-        ORDER BY game_date DESC
-        LIMIT 5
-        """,
-        {'team_id': team_id},
-    )
-
-
-def latest_lineup(team_id: int) -> pd.DataFrame:
-    return qdf(
-        """
-        SELECT l.game_id, p.player_id, p.full_name, p.position, p.height, p.weight,
-               l.minutes, l.lineup_source
-        FROM lineups l
-        JOIN players p ON p.player_id = l.player_id
-        WHERE l.team_id = :team_id
-          AND l.game_id = (
-            SELECT game_id FROM lineups WHERE team_id = :team_id ORDER BY updated_at DESC LIMIT 1
-          )
-        ORDER BY p.position, p.full_name
-        """,
-        {'team_id': team_id},
-    )
-
-
-def player_log(player_id: int) -> pd.DataFrame:
-    df = qdf(
-        """
-        SELECT game_date, matchup, minutes, pts, reb, ast, stl, blk, tov, fg_pct, fg3_pct
-        FROM player_game_stats
-        WHERE player_id = :player_id
-        ORDER BY game_date DESC
-        LIMIT 10
-        """,
-        {'player_id': player_id},
-    )
-    if not df.empty:
-        for col in ['pts', 'reb', 'ast']:
-            df[f'{col}_roll5'] = df[col][::-1].rolling(5, min_periods=1).mean()[::-1].round(2)
-    return df
-
-
-def probable_matchups(home_lineup: pd.DataFrame, away_lineup: pd.DataFrame) -> pd.DataFrame:
-    positions = ['PG', 'SG', 'SF', 'PF', 'C']
-
-    def prep(df: pd.DataFrame) -> pd.DataFrame:
-        tmp = df.copy()
-        tmp['pos_norm'] = tmp['position'].fillna('UNK').str.split('-').str[0]
-        tmp['min_rank'] = pd.to_numeric(tmp['minutes'], errors='coerce').fillna(0)
-        return tmp
-
-    home = prep(home_lineup)
-    away = prep(away_lineup)
-    rows = []
-    for pos in positions:
-        h = home[home['pos_norm'] == pos].sort_values('min_rank', ascending=False).head(1)
-        a = away[away['pos_norm'] == pos].sort_values('min_rank', ascending=False).head(1)
-        if h.empty:
-            h = home.sort_values('min_rank', ascending=False).head(1)
-        if a.empty:
-            a = away.sort_values('min_rank', ascending=False).head(1)
-        rows.append({'Position': pos, 'Away Player': a.iloc[0]['full_name'] if not a.empty else '-', 'Home Player': h.iloc[0]['full_name'] if not h.empty else '-'})
-    return pd.DataFrame(rows)
-
-
-def team_tab(team_name: str, team_id: int):
+FRESHNESS_TABLES = ['teams', 'players', 'schedule', 'team_game_stats', 'player_game_stats', 'lineups']
+
+
+def freshness() -> dict[str, str]:
+    versions = QUERY_CACHE.versions() or {}
+    return {table: versions[table][1] if table in versions else 'Never' for table in FRESHNESS_TABLES}
+
+
+SLATE_TABLES = (
+    'schedule', 'teams', 'team_game_stats', 'lineups', 'players', 'player_game_stats', 'player_stat_totals', 'team_stat_totals', 'matchups',
+)
+
+
+@QUERY_CACHE.cached(*SLATE_TABLES)
+def slate(selected_date: date, window: int | None) -> Slate:
+    return load_slate(selected_date, window)
+
+
+@QUERY_CACHE.cached('history_player_game_stats', 'history_team_game_stats')
+def history(kind: str, entity_id: int) -> pd.DataFrame:
+    return season_history(kind, entity_id)
+
+
+@QUERY_CACHE.cached('player_index')
+def player_index() -> PlayerIndex:
+    return load_player_index()
+
+
+# Players outside the date's starting lineups are read one at a time, on demand.
+@QUERY_CACHE.cached('player_game_stats', 'player_stat_totals')
+def player_log(player_id: int, window: int | None) -> pd.DataFrame:
+    return player_log_with_rolling(player_id, window)
+
+
+@QUERY_CACHE.cached('player_stat_totals')
+def player_form(player_id: int, window: int | None) -> pd.DataFrame:
+    return window_averages('player', player_id, window)
+
+
+def query_latency_panel() -> None:
+    series = METRICS.snapshot()['histograms'].get('db_query_seconds', [])
+    if not series:
+        return
+    rows = [
+        {'query': s['labels']['query'], 'calls': s['count'], 'p50 ms': s['p50'] * 1000, 'p95 ms': s['p95'] * 1000, 'max ms': s['max'] * 1000}
+        for s in series
+    ]
+    with st.sidebar.expander('Query latency'):
+        st.dataframe(pd.DataFrame(rows).round(1), hide_index=True, use_container_width=True)
+
+
+@st.fragment(run_every=get_settings().refresh_poll_seconds)
+def refresh_status_panel() -> None:
+    """Polls the refresh worker's status on its own timer; reruns the page once a new run finishes."""
+    try:
+        status = refresh_status()
+    except DBAPIError:
+        st.caption('Refresh status unavailable; run scripts/init_db.py')
+        return
+    running, queued, last = status['running'], status['queued'], status['last']
+    if running:
+        done, total = running['stages_done'], running['stages_total'] or 0
+        label = f"Refreshing: {running['current_stage'] or 'starting'} ({done}/{total} stages)"
+        st.progress(done / total if total else 0.0, text=label)
+    if queued:
+        st.caption('Refresh queued')
+    if (running or queued) and not status['worker']:
+        st.warning('No refresh worker is running. Start it with `python scripts/refresh_service.py`.')
+    if last:
+        finished = str(last['finished_at'])[:19]
+        if last['status'] == 'ok':
+            st.caption(f'Last refresh {finished} UTC')
+        else:
+            st.error(f"Last refresh failed {finished} UTC: {last['error']}")
+    last_id = last['run_id'] if last else None
+    seen = st.session_state.get('refresh_last_run', last_id)
+    st.session_state['refresh_last_run'] = last_id
+    if last_id != seen:
+        st.rerun()
+
+
+FORM_WINDOWS = {'Last 5': 5, 'Last 10': 10, 'Last 20': 20, 'Season': None}
+
+
+def form_caption(averages: pd.DataFrame, label: str) -> None:
+    if averages.empty:
+        return
+    avg = averages.iloc[0]
+    cols = [c for c in ['win', 'minutes', 'pts', 'reb', 'ast', 'tov', 'plus_minus'] if c in averages.columns]
+    parts = [f"{c}: {avg[c]}" for c in cols]
+    st.caption(f"{label} averages over {int(avg['games'])} games - " + ', '.join(parts))
+
+
+def team_tab(team_name: str, team_id: int, window_label: str, games: Slate):
     st.subheader(f'{team_name}: Last 5 Games')
-    df = team_last5(team_id)
+    df = games.team_last5(team_id)
     if df.empty:
         st.warning('No recent games found yet.')
     else:
         st.dataframe(df, use_container_width=True)
         st.line_chart(df[['pts', 'reb', 'ast']].iloc[::-1], height=160)
+        form_caption(games.form('team', team_id).round(2), window_label)
+    seasons = history('team', team_id)
+    if not seasons.empty:
+        with st.expander('Season history'):
+            st.dataframe(seasons, hide_index=True, use_container_width=True)
 
     st.subheader('Most Recent Starting Lineup')
-    lineup = latest_lineup(team_id)
+    lineup = games.latest_lineup(team_id)
     if lineup.empty:
         st.error('No lineup data available. ETL will infer starters when player logs are available.')
         return None
@@ -128,6 +137,71 @@ def team_tab(team_name: str, team_id: int):
     return lineup
 
 
+def game_section(games: Slate, schedule: pd.DataFrame, window_label: str) -> pd.DataFrame:
+    """Render the selected game and return both starting lineups."""
+    schedule['label'] = schedule.apply(lambda r: f"{r.away_name} @ {r.home_name} ({r.game_date})", axis=1)
+    selected = st.sidebar.selectbox('Select game', schedule['label'].tolist())
+    row = schedule[schedule['label'] == selected].iloc[0]
+
+    st.header(f"{row['away_name']} @ {row['home_name']}")
+    st.caption('Matchups are heuristic only: a one-to-one pairing of starters by position, size, minutes and recent form. Not an official depth chart.')
+
+    away_tab, home_tab = st.tabs([row['away_name'], row['home_name']])
+    with away_tab:
+        away_lineup = team_tab(row['away_name'], int(row['away_team_id']), window_label, games)
+    with home_tab:
+        home_lineup = team_tab(row['home_name'], int(row['home_team_id']), window_label, games)
+
+    st.subheader('Probable Matchups (Heuristic)')
+    pairs = games.game_matchups(row['game_id'])
+    if pairs.empty:
+        st.info('No matchups computed for this game yet; they are built by the ETL once lineups are loaded.')
+    else:
+        table = pairs.rename(columns={'position': 'Position', 'away_player': 'Away Player', 'home_player': 'Home Player', 'score': 'Fit'})
+        st.dataframe(table[['Position', 'Away Player', 'Home Player', 'Fit']].round(2), hide_index=True, use_container_width=True)
+
+    lineups = [df for df in [away_lineup, home_lineup] if df is not None]
+    return pd.concat(lineups, ignore_index=True) if lineups else pd.DataFrame(columns=['player_id', 'full_name'])
+
+
+def player_drilldown(games: Slate, starters: pd.DataFrame, window_label: str) -> None:
+    """Any player in the league index; the date's starters are listed until a search or filter is set."""
+    st.subheader('Player drilldown')
+    index = player_index()
+    teams = index.teams()
+    search_col, team_col, position_col = st.columns([3, 1, 1])
+    query = search_col.text_input('Search all players', placeholder='Name or player id; close spellings match too')
+    team = team_col.selectbox('Team', ['All', *teams])
+    position = position_col.selectbox('Position', ['All', *POSITIONS])
+    st.caption(f'{len(index)} players indexed')
+    searching = bool(query) or team != 'All' or position != 'All'
+    if searching:
+        found = index.search(query, teams.get(team), None if position == 'All' else position).fillna({'team_abbreviation': '-', 'position': '-'})
+        names = dict(zip(found['player_id'], found['full_name']))
+        labels = {pid: f'{name} ({t}, {pos})' for pid, name, t, pos in zip(found['player_id'], found['full_name'], found['team_abbreviation'], found['position'])}
+    else:
+        names = labels = dict(zip(starters['player_id'].astype(int), starters['full_name']))
+    if not labels:
+        st.info('No players match; try fewer letters or clear the filters.' if searching else 'Search to open any player.')
+        return
+
+    pid = int(st.selectbox('Player', list(labels), format_func=labels.get))
+    if pid in set(starters['player_id'].astype(int)):
+        plog, form = games.player_log(pid), games.form('player', pid)
+    else:
+        plog, form = player_log(pid, games.window), player_form(pid, games.window)
+    st.subheader(f'{names[pid]} - Last 10 Games')
+    if plog.empty:
+        st.warning('No player logs loaded.')
+    else:
+        form_caption(form.round(2), window_label)
+        st.dataframe(plog.round(2), use_container_width=True)
+    seasons = history('player', pid)
+    if not seasons.empty:
+        st.subheader(f'{names[pid]} - Season History')
+        st.dataframe(seasons, hide_index=True, use_container_width=True)
+
+
 def main() -> None:
     st.title('NBA MVP Analytics Dashboard')
 
@@ -135,51 +209,34 @@ def main() -> None:
     with col1:
         selected_date = st.sidebar.date_input('Select date', value=date.today(), min_value=date.today() - timedelta(days=1), max_value=date.today() + timedelta(days=7))
     with col2:
-        if st.sidebar.button('Refresh data'):
-            with st.spinner('Running ETL...'):
-                try:
-                    subprocess.run(['python', 'scripts/run_etl.py'], check=True)
-                    st.sidebar.success('Data refresh complete')
-                except Exception as exc:
-                    st.sidebar.error(f'Refresh failed: {exc}')
+        with st.sidebar:
+            if st.button('Refresh data'):
+                request_refresh(requested_by='dashboard')
+            refresh_status_panel()
 
     st.sidebar.markdown('### Data Freshness')
-    for table in ['teams', 'players', 'schedule', 'team_game_stats', 'player_game_stats', 'lineups']:
-        st.sidebar.write(f'- {table}: {freshness(table)}')
+    for table, ts in freshness().items():
+        st.sidebar.write(f'- {table}: {ts}')
+    cache_stats = QUERY_CACHE.stats()
+    st.sidebar.caption(f"Query cache: {cache_stats['hits']} hits / {cache_stats['misses']} misses")
+    query_latency_panel()
 
-    schedule = load_schedule(selected_date)
+    window_label = st.sidebar.selectbox('Form window', list(FORM_WINDOWS))
+
+    games = slate(selected_date, FORM_WINDOWS[window_label])
+    schedule = games.schedule()
     if schedule.empty:
         st.info('No upcoming games for selected date. Try refreshing ETL.')
-        st.stop()
-
-    schedule['label'] = schedule.apply(lambda r: f"{r.away_name} @ {r.home_name} ({r.game_date})", axis=1)
-    selected = st.sidebar.selectbox('Select game', schedule['label'].tolist())
-    row = schedule[schedule['label'] == selected].iloc[0]
-
-    st.header(f"{row['away_name']} @ {row['home_name']}")
-    st.caption('Matchups are heuristic only, based on position and minutes/starting status. Not an official depth chart.')
-
-    away_tab, home_tab = st.tabs([row['away_name'], row['home_name']])
-    with away_tab:
-        away_lineup = team_tab(row['away_name'], int(row['away_team_id']))
-    with home_tab:
-        home_lineup = team_tab(row['home_name'], int(row['home_team_id']))
-
-    if away_lineup is not None and home_lineup is not None:
-        st.subheader('Probable Matchups (Heuristic)')
-        st.dataframe(probable_matchups(home_lineup, away_lineup), use_container_width=True)
-
-    all_lineup = pd.concat([df for df in [away_lineup, home_lineup] if df is not None], ignore_index=True)
-    if not all_lineup.empty:
-        player_name = st.selectbox('Player drilldown', all_lineup['full_name'].unique().tolist())
-        pid = int(all_lineup[all_lineup['full_name'] == player_name]['player_id'].iloc[0])
-        plog = player_log(pid)
-        st.subheader(f'{player_name} - Last 10 Games')
-        if plog.empty:
-            st.warning('No player logs loaded.')
-        else:
-            st.dataframe(plog, use_container_width=True)
+        starters = pd.DataFrame(columns=['player_id', 'full_name'])
+    else:
+        starters = game_section(games, schedule, window_label)
+    player_drilldown(games, starters, window_label)
 
 
 if __name__ == '__main__':
-    main()
+    started = time.perf_counter()
+    try:
+        main()
+    finally:
+        METRICS.observe('dashboard_render_seconds', time.perf_counter() - started)
+        METRICS.write(get_settings().metrics_dir, 'dashboard')
@@ -0,0 +1,225 @@
+import cProfile
+import io
+import json
+import logging
+import pstats
+import sys
+import threading
+import time
+from bisect import bisect_left
+from collections import Counter
+from contextlib import contextmanager, nullcontext
+from dataclasses import dataclass, field
+from pathlib import Path
+
+LOGGER = logging.getLogger(__name__)
+
+# Latency buckets in seconds, Prometheus-style upper bounds (+Inf implied).
+BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0)
+
+LabelKey = tuple[tuple[str, str], ...]
+
+
+def _labels(labels: dict) -> LabelKey:
+    return tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+
+@dataclass
+class Histogram:
+    counts: list[int] = field(default_factory=lambda: [0] * (len(BUCKETS) + 1))
+    count: int = 0
+    total: float = 0.0
+    max: float = 0.0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(BUCKETS, value)] += 1
+        self.count += 1
+        self.total += value
+        self.max = max(self.max, value)
+
+    def quantile(self, q: float) -> float:
+        """Upper bound of the bucket holding the q-th observation (the max for the overflow bucket)."""
+        if not self.count:
+            return 0.0
+        rank, seen = q * self.count, 0
+        for idx, n in enumerate(self.counts):
+            seen += n
+            if seen >= rank:
+                return min(BUCKETS[idx], self.max) if idx < len(BUCKETS) else self.max
+        return self.max
+
+    def as_dict(self) -> dict:
+        return {
+            'count': self.count,
+            'sum': round(self.total, 6),
+            'mean': round(self.total / self.count, 6) if self.count else 0.0,
+            'p50': self.quantile(0.5),
+            'p95': self.quantile(0.95),
+            'p99': self.quantile(0.99),
+            'max': round(self.max, 6),
+        }
+
+
+class Registry:
+    """Process-wide latency histograms and counters keyed by metric name and labels."""
+
+    def __init__(self):
+        self.histograms: dict[str, dict[LabelKey, Histogram]] = {}
+        self.counters: dict[str, Counter] = {}
+        self.lock = threading.Lock()
+
+    def observe(self, name: str, seconds: float, **labels) -> None:
+        with self.lock:
+            series = self.histograms.setdefault(name, {})
+            series.setdefault(_labels(labels), Histogram()).observe(seconds)
+
+    def inc(self, name: str, value: float = 1, **labels) -> None:
+        with self.lock:
+            self.counters.setdefault(name, Counter())[_labels(labels)] += value
+
+    @contextmanager
+    def span(self, name: str, **labels):
+        """Time the block into `<name>_seconds`; failures also count into `<name>_errors_total`."""
+        started = time.perf_counter()
+        try:
+            yield
+        except BaseException:
+            self.inc(f'{name}_errors_total', **labels)
+            raise
+        finally:
+            self.observe(f'{name}_seconds', time.perf_counter() - started, **labels)
+
+    def reset(self) -> None:
+        with self.lock:
+            self.histograms.clear()
+            self.counters.clear()
+
+    def snapshot(self) -> dict:
+        with self.lock:
+            return {
+                'histograms': {
+                    name: [{'labels': dict(key), **hist.as_dict()} for key, hist in sorted(series.items())]
+                    for name, series in sorted(self.histograms.items())
+                },
+                'counters': {
+                    name: [{'labels': dict(key), 'value': value} for key, value in sorted(series.items())]
+                    for name, series in sorted(self.counters.items())
+                },
+            }
+
+    def to_prometheus(self, prefix: str = 'nba_mvp') -> str:
+        def fmt(key: LabelKey, extra: tuple = ()) -> str:
+            pairs = list(key) + list(extra)
+            return '{' + ','.join(f'{k}="{v}"' for k, v in pairs) + '}' if pairs else ''
+
+        lines = []
+        with self.lock:
+            for name, series in sorted(self.histograms.items()):
+                metric = f'{prefix}_{name}'
+                lines.append(f'# TYPE {metric} histogram')
+                for key, hist in sorted(series.items()):
+                    cumulative = 0
+                    for bound, n in zip(BUCKETS, hist.counts):
+                        cumulative += n
+                        lines.append(f'{metric}_bucket{fmt(key, (("le", f"{bound:g}"),))} {cumulative}')
+                    lines.append(f'{metric}_bucket{fmt(key, (("le", "+Inf"),))} {hist.count}')
+                    lines.append(f'{metric}_sum{fmt(key)} {hist.total:.6f}')
+                    lines.append(f'{metric}_count{fmt(key)} {hist.count}')
+            for name, series in sorted(self.counters.items()):
+                metric = f'{prefix}_{name}'
+                lines.append(f'# TYPE {metric} counter')
+                lines.extend(f'{metric}{fmt(key)} {value:g}' for key, value in sorted(series.items()))
+        return '\n'.join(lines) + '\n'
+
+    def write(self, out_dir: str | Path, name: str, extra: dict | None = None) -> tuple[Path, Path]:
+        """Write `<name>.json` (snapshot plus `extra`) and `<name>.prom` (node_exporter textfile format)."""
+        out = Path(out_dir)
+        out.mkdir(parents=True, exist_ok=True)
+        json_path, prom_path = out / f'{name}.json', out / f'{name}.prom'
+        payload = {'generated_at': time.time(), **(extra or {}), **self.snapshot()}
+        json_path.write_text(json.dumps(payload, indent=2, default=str))
+        # Write-then-rename so a scraper never reads a half-written file.
+        tmp = prom_path.with_suffix('.prom.tmp')
+        tmp.write_text(self.to_prometheus())
+        tmp.replace(prom_path)
+        return json_path, prom_path
+
+
+METRICS = Registry()
+
+
+class StackSampler:
+    """Samples one thread's Python stack every `interval` seconds into folded-stack counts."""
+
+    def __init__(self, thread_id: int, interval: float = 0.005):
+        self.thread_id = thread_id
+        self.interval = interval
+        self.stacks: Counter = Counter()
+        self.stop_event = threading.Event()
+        self.thread = threading.Thread(target=self._run, name='stack-sampler', daemon=True)
+
+    def _run(self) -> None:
+        while not self.stop_event.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append(f'{Path(code.co_filename).name}:{code.co_name}')
+                frame = frame.f_back
+            if stack:
+                self.stacks[';'.join(reversed(stack))] += 1
+
+    def __enter__(self) -> 'StackSampler':
+        self.thread.start()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.stop_event.set()
+        self.thread.join()
+
+    def folded(self) -> str:
+        return '\n'.join(f'{stack} {n}' for stack, n in self.stacks.most_common()) + '\n'
+
+
+@dataclass
+class Profiler:
+    """Opt-in per-stage profiling: `cprofile` writes .prof (pstats/snakeviz), `sample` writes
+    folded stacks (flamegraph.pl / speedscope)."""
+
+    stages: frozenset[str] = frozenset()
+    mode: str = 'cprofile'
+    out_dir: str = './data/profiles'
+    interval: float = 0.005
+
+    def enabled_for(self, stage: str) -> bool:
+        return 'all' in self.stages or stage in self.stages
+
+    @contextmanager
+    def _cprofile(self, stage: str, path: Path):
+        profile = cProfile.Profile()
+        profile.enable()
+        try:
+            yield
+        finally:
+            profile.disable()
+            profile.dump_stats(path)
+            top = io.StringIO()
+            pstats.Stats(profile, stream=top).sort_stats('cumulative').print_stats(15)
+            LOGGER.info('Profile for stage %s written to %s\n%s', stage, path, top.getvalue())
+
+    @contextmanager
+    def _sample(self, stage: str, path: Path):
+        with StackSampler(threading.get_ident(), self.interval) as sampler:
+            yield
+        path.write_text(sampler.folded())
+        LOGGER.info('Sampled %s stacks for stage %s into %s', sum(sampler.stacks.values()), stage, path)
+
+    def stage(self, stage: str):
+        if not self.enabled_for(stage):
+            return nullcontext()
+        out = Path(self.out_dir)
+        out.mkdir(parents=True, exist_ok=True)
+        stamp = time.strftime('%Y%m%dT%H%M%S')
+        if self.mode == 'sample':
+            return self._sample(stage, out / f'{stage}-{stamp}.folded')
+        return self._cprofile(stage, out / f'{stage}-{stamp}.prof')
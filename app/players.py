@@ -0,0 +1,100 @@
+"""League-wide player search over the `player_index` table the ETL builds: prefix matches by bisection, fuzzy fallback."""
+
+import difflib
+import re
+import unicodedata
+from bisect import bisect_left
+from dataclasses import dataclass
+
+import pandas as pd
+
+from db.query import read_df
+
+PLAYER_INDEX_SQL = """
+    SELECT player_id, full_name, search_name, team_id, team_abbreviation, position, games, first_game_date, last_game_date
+    FROM player_index
+    ORDER BY search_name
+"""
+PLAYER_INDEX_DTYPES = {'player_id': 'int64', 'team_id': 'Int64', 'games': 'int32'}
+POSITIONS = ('G', 'F', 'C')
+FUZZY_CUTOFF = 0.75
+_DROPPED = re.compile(r"['’`.]")
+_SEPARATORS = re.compile(r'[^a-z0-9]+')
+# Ranks: the whole name starts with the query, every query word starts a name word, or a close spelling.
+NAME_PREFIX, WORD_PREFIX, FUZZY = 0, 1, 2
+
+
+def search_key(text: str) -> str:
+    """Lowercase ASCII words of a name: 'Luka Dončić' -> 'luka doncic', 'P.J. Tucker' -> 'pj tucker'."""
+    plain = unicodedata.normalize('NFKD', text).encode('ascii', 'ignore').decode().lower()
+    return _SEPARATORS.sub(' ', _DROPPED.sub('', plain)).strip()
+
+
+@dataclass(frozen=True)
+class PlayerIndex:
+    players: pd.DataFrame  # player_index rows sorted by search_name, positionally indexed
+    tokens: tuple[str, ...]  # every word of every name, sorted
+    token_rows: tuple[int, ...]  # row of `players` each token belongs to
+    vocabulary: tuple[str, ...]  # distinct tokens, the candidates for fuzzy matching
+
+    @classmethod
+    def from_frame(cls, players: pd.DataFrame) -> 'PlayerIndex':
+        players = players.sort_values('search_name', kind='stable', ignore_index=True)
+        pairs = sorted((token, row) for row, name in enumerate(players['search_name']) for token in name.split())
+        tokens = tuple(token for token, _ in pairs)
+        return cls(players, tokens, tuple(row for _, row in pairs), tuple(sorted(set(tokens))))
+
+    def __len__(self) -> int:
+        return len(self.players)
+
+    def teams(self) -> dict[str, int]:
+        teams = self.players.dropna(subset=['team_id', 'team_abbreviation'])
+        return dict(sorted(zip(teams['team_abbreviation'], teams['team_id'].astype(int))))
+
+    def _rows(self, token: str, prefix: bool = True) -> set[int]:
+        lo = bisect_left(self.tokens, token)
+        hi = bisect_left(self.tokens, token + '~' if prefix else token + ' ')  # '~' sorts after every ASCII letter and digit
+        return set(self.token_rows[lo:hi])
+
+    def _matches(self, key: str) -> dict[int, int]:
+        """Row -> rank for rows matching every word of `key`, falling back to close spellings per word."""
+        ranks = None
+        for token in key.split():
+            rows, rank = self._rows(token), WORD_PREFIX
+            if not rows:
+                close = difflib.get_close_matches(token, self.vocabulary, n=5, cutoff=FUZZY_CUTOFF)
+                rows, rank = set().union(*(self._rows(c, prefix=False) for c in close)), FUZZY
+            found = dict.fromkeys(rows, rank)
+            ranks = found if ranks is None else {r: max(ranks[r], found[r]) for r in ranks.keys() & found.keys()}
+            if not ranks:
+                return {}
+        names = self.players['search_name']
+        return {r: NAME_PREFIX if names.iat[r].startswith(key) else rank for r, rank in ranks.items()}
+
+    def search(self, query: str = '', team_id: int | None = None, position: str | None = None, limit: int = 25) -> pd.DataFrame:
+        """Players matching `query` (name words in any order, a prefix of each, or a player id), best first.
+
+        Typos fall back to the closest spellings; `team_id` and `position` ('G', 'F', 'C'; hybrid
+        listings like 'G-F' match both) narrow the result. No query lists the filtered players,
+        most recently active first.
+        """
+        key = search_key(query)
+        if key:
+            if key.isdigit():
+                ranks = dict.fromkeys(self.players.index[self.players['player_id'] == int(key)], NAME_PREFIX)
+            else:
+                ranks = self._matches(key)
+            rows = sorted(ranks)
+            found = self.players.take(rows).assign(rank=[ranks[r] for r in rows])
+        else:
+            found = self.players.assign(rank=NAME_PREFIX)
+        if team_id is not None:
+            found = found[found['team_id'] == team_id]
+        if position:
+            found = found[found['position'].fillna('').str.split('-').map(lambda parts: position in parts).astype(bool)]
+        found = found.sort_values(['rank', 'last_game_date', 'games', 'search_name'], ascending=[True, False, False, True], na_position='last')
+        return found.head(limit).drop(columns='rank').reset_index(drop=True)
+
+
+def load_player_index() -> PlayerIndex:
+    return PlayerIndex.from_frame(read_df(PLAYER_INDEX_SQL, name='player_index', dtype=PLAYER_INDEX_DTYPES))
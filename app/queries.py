@@ -0,0 +1,38 @@
+"""SQL behind the dashboard views, shared with the benchmark suite."""
+
+SCHEDULE_SQL = """
+    SELECT s.game_id, s.game_date, s.status,
+           ht.name AS home_name, ht.team_id AS home_team_id,
+           at.name AS away_name, at.team_id AS away_team_id
+    FROM schedule s
+    JOIN teams ht ON ht.team_id = s.home_team_id
+    JOIN teams at ON at.team_id = s.away_team_id
+    WHERE s.game_date = :game_date
+    ORDER BY s.game_date
+"""
+
+TEAM_LAST5_SQL = """
+    SELECT game_date, matchup, wl, pts, reb, ast, tov, fg_pct, fg3_pct
+    FROM team_game_stats
+    WHERE team_id = :team_id
+    ORDER BY game_date DESC
+    LIMIT 5
+"""
+TEAM_LAST5_DTYPES = {'pts': 'Int16', 'reb': 'Int16', 'ast': 'Int16', 'tov': 'Int16', 'fg_pct': 'float32', 'fg3_pct': 'float32'}
+
+LATEST_LINEUP_SQL = """
+    SELECT l.game_id, p.player_id, p.full_name, p.position, p.height, p.height_inches, p.weight,
+           l.minutes, l.lineup_source
+    FROM lineups l
+    JOIN players p ON p.player_id = l.player_id
+    WHERE l.team_id = :team_id
+      AND l.game_id = (
+        SELECT game_id FROM lineups WHERE team_id = :team_id ORDER BY updated_at DESC LIMIT 1
+      )
+    ORDER BY l.minutes IS NULL, l.minutes DESC, p.full_name
+"""
+LATEST_LINEUP_DTYPES = {'height_inches': 'Int8', 'weight': 'Int16', 'minutes': 'float32'}
+
+MATCHUPS_DTYPES = {
+    'slot': 'Int8', 'score': 'float32', 'position_fit': 'float32', 'size_fit': 'float32', 'minutes_fit': 'float32', 'form_fit': 'float32',
+}
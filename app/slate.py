@@ -0,0 +1,138 @@
+"""Everything the dashboard shows for one date, loaded for the whole slate in a few set-based queries."""
+
+from dataclasses import dataclass
+from datetime import date
+
+import pandas as pd
+
+from app.queries import LATEST_LINEUP_DTYPES, MATCHUPS_DTYPES, SCHEDULE_SQL, TEAM_LAST5_DTYPES
+from app.stats import PLAYER_LOG_DTYPES, player_log_sql, window_averages_sql
+from db.query import read_df
+
+# Teams playing on :game_date, the game of each one's latest stored lineup, and those starters.
+SLATE_CTE = """
+WITH slate_teams AS (
+    SELECT home_team_id AS team_id FROM schedule WHERE game_date = :game_date
+    UNION
+    SELECT away_team_id AS team_id FROM schedule WHERE game_date = :game_date
+),
+latest_lineups AS (
+    SELECT team_id, game_id
+    FROM (
+        SELECT l.team_id, l.game_id,
+               ROW_NUMBER() OVER (PARTITION BY l.team_id ORDER BY MAX(l.updated_at) DESC, l.game_id DESC) AS lineup_rank
+        FROM lineups l
+        JOIN slate_teams t ON t.team_id = l.team_id
+        GROUP BY l.team_id, l.game_id
+    ) ranked
+    WHERE lineup_rank = 1
+),
+slate_players AS (
+    SELECT l.team_id, l.game_id, l.player_id, l.minutes, l.lineup_source
+    FROM lineups l
+    JOIN latest_lineups g ON g.team_id = l.team_id AND g.game_id = l.game_id
+)
+"""
+SLATE_TEAM_GAMES_SQL = SLATE_CTE + """
+SELECT team_id, game_date, matchup, wl, pts, reb, ast, tov, fg_pct, fg3_pct
+FROM (
+    SELECT g.team_id, g.game_date, g.matchup, g.wl, g.pts, g.reb, g.ast, g.tov, g.fg_pct, g.fg3_pct,
+           ROW_NUMBER() OVER (PARTITION BY g.team_id ORDER BY g.game_date DESC) AS game_rank
+    FROM team_game_stats g
+    JOIN slate_teams t ON t.team_id = g.team_id
+) ranked
+WHERE game_rank <= 5
+"""
+SLATE_LINEUPS_SQL = SLATE_CTE + """
+SELECT sp.team_id, sp.game_id, p.player_id, p.full_name, p.position, p.height, p.height_inches, p.weight,
+       sp.minutes, sp.lineup_source
+FROM slate_players sp
+JOIN players p ON p.player_id = sp.player_id
+"""
+SLATE_MATCHUPS_SQL = """
+    SELECT m.game_id, m.slot, m.position, ap.full_name AS away_player, hp.full_name AS home_player, m.score,
+           m.position_fit, m.size_fit, m.minutes_fit, m.form_fit
+    FROM schedule s
+    JOIN matchups m ON m.game_id = s.game_id
+    LEFT JOIN players ap ON ap.player_id = m.away_player_id
+    LEFT JOIN players hp ON hp.player_id = m.home_player_id
+    WHERE s.game_date = :game_date
+"""
+SLATE_TEAMS = 'SELECT team_id FROM slate_teams'
+SLATE_PLAYERS = 'SELECT player_id FROM slate_players'
+
+
+def slate_player_logs_sql(window: int | None) -> str:
+    return SLATE_CTE + player_log_sql(window, players=SLATE_PLAYERS)
+
+
+def slate_form_sql(kind: str, window: int | None) -> str:
+    return SLATE_CTE + window_averages_sql(kind, window, entities=SLATE_TEAMS if kind == 'team' else SLATE_PLAYERS)
+
+
+def _indexed(df: pd.DataFrame, key: str, by: list[str] | None = None, ascending: list[bool] | None = None) -> pd.DataFrame:
+    """Sort by `key` (then `by`) and index on it, so per-entity lookups are index slices."""
+    df = df.sort_values([key, *(by or [])], ascending=[True, *(ascending or [])], na_position='last', kind='stable')
+    return df.set_index(key)
+
+
+def _rows(frame: pd.DataFrame, key) -> pd.DataFrame:
+    if key not in frame.index:
+        return frame.iloc[0:0].reset_index(drop=True)
+    return frame.loc[[key]].reset_index(drop=True)
+
+
+@dataclass(frozen=True)
+class Slate:
+    game_date: date
+    window: int | None
+    games: pd.DataFrame
+    team_games: pd.DataFrame
+    lineups: pd.DataFrame
+    player_logs: pd.DataFrame
+    team_form: pd.DataFrame
+    player_form: pd.DataFrame
+    matchups: pd.DataFrame
+
+    def schedule(self) -> pd.DataFrame:
+        return self.games.copy()
+
+    def team_last5(self, team_id: int) -> pd.DataFrame:
+        return _rows(self.team_games, team_id)
+
+    def latest_lineup(self, team_id: int) -> pd.DataFrame:
+        return _rows(self.lineups, team_id)
+
+    def player_log(self, player_id: int) -> pd.DataFrame:
+        return _rows(self.player_logs, player_id)
+
+    def form(self, kind: str, entity_id: int) -> pd.DataFrame:
+        return _rows(self.team_form if kind == 'team' else self.player_form, entity_id)
+
+    def game_matchups(self, game_id: str) -> pd.DataFrame:
+        return _rows(self.matchups, str(game_id))
+
+
+def load_slate(game_date: date, window: int | None = 5) -> Slate:
+    """Schedule, last five team games, latest lineups, starters' logs, form and matchups for `game_date`.
+
+    Seven queries cover every game on the date, so switching games or players within it needs none.
+    """
+    params = {'game_date': game_date.isoformat()}
+    # The *_DTYPES maps narrow these slate-wide frames only; single-entity reads keep pandas' default dtypes.
+    lineups = read_df(SLATE_LINEUPS_SQL, params, name='slate_lineups', dtype=LATEST_LINEUP_DTYPES)
+    matchups = read_df(SLATE_MATCHUPS_SQL, params, name='slate_matchups', dtype=MATCHUPS_DTYPES)
+    matchups['game_id'] = matchups['game_id'].astype(str)
+    return Slate(
+        game_date=game_date,
+        window=window,
+        games=read_df(SCHEDULE_SQL, params, name='schedule'),
+        team_games=_indexed(read_df(SLATE_TEAM_GAMES_SQL, params, name='slate_team_games', dtype=TEAM_LAST5_DTYPES), 'team_id', ['game_date'], [False]),
+        lineups=_indexed(lineups, 'team_id', ['minutes', 'full_name'], [False, True]),
+        player_logs=_indexed(
+            read_df(slate_player_logs_sql(window), params, name='slate_player_logs', dtype=PLAYER_LOG_DTYPES), 'player_id', ['game_date'], [False]
+        ),
+        team_form=_indexed(read_df(slate_form_sql('team', window), params, name='slate_team_form'), 'entity_id'),
+        player_form=_indexed(read_df(slate_form_sql('player', window), params, name='slate_player_form'), 'entity_id'),
+        matchups=_indexed(matchups, 'game_id', ['slot'], [True]),
+    )
@@ -0,0 +1,109 @@
+import pandas as pd
+import pyarrow.compute as pc
+
+from db.history import HistoryStore, history_store, read_history
+from db.query import read_df
+
+PLAYER_STATS = ['minutes', 'pts', 'reb', 'ast', 'stl', 'blk', 'tov', 'fg_pct', 'fg3_pct']
+TEAM_STATS = ['win', 'pts', 'reb', 'ast', 'tov', 'fg_pct', 'fg3_pct', 'plus_minus']
+PLAYER_LOG_DTYPES = {
+    'minutes': 'float32', 'pts': 'Int16', 'reb': 'Int16', 'ast': 'Int16', 'stl': 'Int16', 'blk': 'Int16', 'tov': 'Int16',
+    'fg_pct': 'float32', 'fg3_pct': 'float32',
+}
+
+TOTALS = {
+    'player': ('player_stat_totals', 'player_id', PLAYER_STATS),
+    'team': ('team_stat_totals', 'team_id', TEAM_STATS),
+}
+
+
+def _prev_seq(table: str, key: str, window: int | None) -> str:
+    """SQL for the running-total row that precedes the window ending at `cur`."""
+    if window is None:
+        return f'(SELECT MIN(t.game_seq) FROM {table} t WHERE t.{key} = cur.{key} AND t.season = cur.season) - 1'
+    return f'cur.game_seq - {int(window)}'
+
+
+def _avg_exprs(stats: list[str], suffix: str = '') -> str:
+    games = '(cur.gp - COALESCE(prev.gp, 0))'
+    return ', '.join(
+        f'(cur.{s}_sum - COALESCE(prev.{s}_sum, 0)) * 1.0 / {games} AS {s}{suffix}' for s in stats
+    )
+
+
+def window_averages_sql(kind: str, window: int | None = 5, stats: list[str] | None = None, entities: str | None = None) -> str:
+    """Averages for :entity_id, or for every id `entities` (a subquery) returns, with an entity_id column."""
+    table, key, default_stats = TOTALS[kind]
+    if entities is None:
+        select, where = '', f'cur.{key} = :entity_id AND cur.game_seq = (SELECT MAX(game_seq) FROM {table} WHERE {key} = :entity_id)'
+    else:
+        select = f'cur.{key} AS entity_id, '
+        where = f'cur.{key} IN ({entities}) AND cur.game_seq = (SELECT MAX(m.game_seq) FROM {table} m WHERE m.{key} = cur.{key})'
+    return f"""
+        SELECT {select}cur.game_date AS through_date, cur.gp - COALESCE(prev.gp, 0) AS games, {_avg_exprs(stats or default_stats)}
+        FROM {table} cur
+        LEFT JOIN {table} prev ON prev.{key} = cur.{key} AND prev.game_seq = {_prev_seq(table, key, window)}
+        WHERE {where}
+        """
+
+
+def window_averages(kind: str, entity_id: int, window: int | None = 5, stats: list[str] | None = None) -> pd.DataFrame:
+    """Per-game averages over the last `window` games (None = current season) from running totals.
+
+    Two primary-key lookups per entity regardless of how much history is stored.
+    """
+    return read_df(window_averages_sql(kind, window, stats), {'entity_id': entity_id}, name=f'{kind}_window_averages')
+
+
+def player_log_sql(window: int | None = 5, limit: int = 10, stats: tuple[str, ...] = ('pts', 'reb', 'ast'), players: str | None = None) -> str:
+    """Last `limit` games of :player_id, or of every id `players` (a subquery) returns, with a player_id column."""
+    label = 'season' if window is None else str(window)
+    if players is None:
+        select, source = '', 'player_game_stats s'
+        where, order = 'WHERE s.player_id = :player_id', f'ORDER BY s.game_date DESC LIMIT {int(limit)}'
+    else:
+        select = 's.player_id, '
+        source = (
+            '(SELECT g.*, ROW_NUMBER() OVER (PARTITION BY g.player_id ORDER BY g.game_date DESC) AS game_rank '
+            f'FROM player_game_stats g WHERE g.player_id IN ({players})) s'
+        )
+        where, order = f'WHERE s.game_rank <= {int(limit)}', ''
+    return f"""
+        SELECT {select}s.game_date, s.matchup, s.minutes, s.pts, s.reb, s.ast, s.stl, s.blk, s.tov, s.fg_pct, s.fg3_pct,
+               {_avg_exprs(list(stats), f'_roll{label}')}
+        FROM {source}
+        LEFT JOIN player_stat_totals cur ON cur.player_id = s.player_id AND cur.game_id = s.game_id
+        LEFT JOIN player_stat_totals prev ON prev.player_id = cur.player_id
+             AND prev.game_seq = {_prev_seq('player_stat_totals', 'player_id', window)}
+        {where}
+        {order}
+        """
+
+
+def player_log_with_rolling(player_id: int, window: int | None = 5, limit: int = 10, stats: tuple[str, ...] = ('pts', 'reb', 'ast')) -> pd.DataFrame:
+    """Last `limit` games for a player with trailing `window`-game averages as of each game."""
+    # No PLAYER_LOG_DTYPES here: the columns already arrive as int/float, and casting ten rows costs more than the query.
+    return read_df(player_log_sql(window, limit, stats), {'player_id': player_id}, name='player_log_rolling')
+
+
+def season_history(kind: str, entity_id: int, seasons: list[str] | None = None, store: HistoryStore | None = None) -> pd.DataFrame:
+    """Per-season games and averages from the columnar history store, newest season first.
+
+    Only the needed columns are read; team lookups and `seasons` prune whole partitions.
+    """
+    store = store or history_store()
+    if kind == 'team':
+        stats = TEAM_STATS
+        data = read_history(
+            store, 'team_game_stats', name='team_season_history', columns=['season', 'wl', *stats[1:]], seasons=seasons, team_ids=[entity_id]
+        )
+        data = data.append_column('win', pc.cast(pc.equal(data['wl'], 'W'), 'int8'))
+    else:
+        stats = PLAYER_STATS
+        data = read_history(
+            store, 'player_game_stats', name='player_season_history', columns=['season', *stats], seasons=seasons,
+            where=pc.field('player_id') == entity_id,
+        )
+    summary = data.group_by('season').aggregate([(stats[1], 'count')] + [(s, 'mean') for s in stats])
+    df = summary.to_pandas().rename(columns={f'{stats[1]}_count': 'games', **{f'{s}_mean': s for s in stats}})
+    return df[['season', 'games', *stats]].sort_values('season', ascending=False, ignore_index=True).round(2)
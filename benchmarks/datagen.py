@@ -0,0 +1,153 @@
+from dataclasses import dataclass
+from datetime import date, timedelta
+
+import numpy as np
+import pandas as pd
+from nba_api.stats.static import teams as static_teams
+
+POSITIONS = ['PG', 'SG', 'SF', 'PF', 'C', 'G', 'F', 'C', 'G-F', 'F-C', 'G', 'F', 'C', 'PG', 'SF']
+START_POSITIONS = ['G', 'G', 'F', 'F', 'C']
+ACTIVE_PER_GAME = 12
+SEASON_DAYS = 165
+
+
+@dataclass
+class League:
+    teams: pd.DataFrame
+    players: pd.DataFrame
+    schedule: pd.DataFrame
+    team_logs: pd.DataFrame
+    player_logs: pd.DataFrame
+
+
+def _teams(count: int) -> pd.DataFrame:
+    static = pd.DataFrame(static_teams.get_teams())[['id', 'full_name', 'abbreviation']]
+    if count <= len(static):
+        static = static.head(count)
+    else:
+        extra = pd.DataFrame(
+            {
+                'id': 1700000000 + np.arange(count - len(static)),
+                'full_name': [f'Team {i}' for i in range(len(static), count)],
+                'abbreviation': [f'T{i:02d}' for i in range(len(static), count)],
+            }
+        )
+        static = pd.concat([static, extra], ignore_index=True)
+    return static.rename(columns={'id': 'team_id', 'full_name': 'name'})
+
+
+def _players(teams: pd.DataFrame, per_team: int, rng: np.random.Generator) -> pd.DataFrame:
+    count = len(teams) * per_team
+    slot = np.tile(np.arange(per_team), len(teams))
+    inches = rng.integers(72, 88, count)
+    return pd.DataFrame(
+        {
+            'player_id': 1_000_000 + np.arange(count),
+            'full_name': [f'Player {i:04d}' for i in range(count)],
+            'team_id': np.repeat(teams['team_id'].to_numpy(), per_team),
+            'position': [POSITIONS[s % len(POSITIONS)] for s in slot],
+            'height': [f'{h // 12}-{h % 12}' for h in inches],
+            'height_inches': inches,
+            'weight': rng.integers(175, 280, count),
+        }
+    )
+
+
+def _season(season: int, teams: pd.DataFrame, per_team: int, rng: np.random.Generator) -> tuple[pd.DataFrame, pd.DataFrame]:
+    n_teams = len(teams)
+    n_games = n_teams * 41
+    home = rng.integers(0, n_teams, n_games)
+    away = (home + rng.integers(1, n_teams, n_games)) % n_teams
+    opener = date(season, 10, 22)
+    game_dates = pd.to_datetime([opener + timedelta(days=int(d)) for d in np.arange(n_games) * SEASON_DAYS // n_games])
+    game_ids = np.array([f'002{season % 100:02d}{i + 1:05d}' for i in range(n_games)])
+
+    # One row per team side of a game, then ACTIVE_PER_GAME player rows per side.
+    side_team = np.concatenate([home, away])
+    side_opp = np.concatenate([away, home])
+    side_game = np.tile(np.arange(n_games), 2)
+    side_home = np.repeat([True, False], n_games)
+    slot = np.tile(np.arange(ACTIVE_PER_GAME), len(side_team))
+    row_side = np.repeat(np.arange(len(side_team)), ACTIVE_PER_GAME)
+    starter = slot < 5
+    minutes = np.clip(np.where(starter, rng.normal(32, 4, slot.size), rng.normal(15, 6, slot.size)), 0, 48).round()
+
+    abbr = teams['abbreviation'].to_numpy()
+    matchup = np.where(side_home, abbr[side_team] + ' vs. ' + abbr[side_opp], abbr[side_team] + ' @ ' + abbr[side_opp])
+    team_ids = teams['team_id'].to_numpy()
+    players = pd.DataFrame(
+        {
+            'SEASON_ID': f'2{season}',
+            'PLAYER_ID': 1_000_000 + side_team[row_side] * per_team + slot,
+            'TEAM_ID': team_ids[side_team[row_side]],
+            'TEAM_ABBREVIATION': abbr[side_team[row_side]],
+            'GAME_ID': game_ids[side_game[row_side]],
+            'GAME_DATE': game_dates[side_game[row_side]].strftime('%Y-%m-%d'),
+            'MATCHUP': matchup[row_side],
+            'MIN': minutes.astype(int),
+            'PTS': rng.poisson(minutes * 0.48),
+            'REB': rng.poisson(minutes * 0.17),
+            'AST': rng.poisson(minutes * 0.1),
+            'STL': rng.poisson(minutes * 0.03),
+            'BLK': rng.poisson(minutes * 0.02),
+            'TOV': rng.poisson(minutes * 0.05),
+            'FG_PCT': rng.uniform(0.3, 0.65, slot.size).round(3),
+            'FG3_PCT': rng.uniform(0.15, 0.5, slot.size).round(3),
+            'START_POSITION': np.where(starter, np.array(START_POSITIONS * 3)[np.minimum(slot, 4)], ''),
+        }
+    )
+
+    sums = players.groupby(row_side)[['PTS', 'REB', 'AST', 'TOV']].sum().to_numpy()
+    means = players.groupby(row_side)[['FG_PCT', 'FG3_PCT']].mean().round(3).to_numpy()
+    opp_pts = np.concatenate([sums[n_games:, 0], sums[:n_games, 0]])
+    team_logs = pd.DataFrame(
+        {
+            'SEASON_ID': f'2{season}',
+            'TEAM_ID': team_ids[side_team],
+            'TEAM_ABBREVIATION': abbr[side_team],
+            'GAME_ID': game_ids[side_game],
+            'GAME_DATE': game_dates[side_game].strftime('%Y-%m-%d'),
+            'MATCHUP': matchup,
+            'WL': np.where(sums[:, 0] >= opp_pts, 'W', 'L'),
+            'PTS': sums[:, 0],
+            'REB': sums[:, 1],
+            'AST': sums[:, 2],
+            'TOV': sums[:, 3],
+            'FG_PCT': means[:, 0],
+            'FG3_PCT': means[:, 1],
+            'PLUS_MINUS': (sums[:, 0] - opp_pts).astype(float),
+        }
+    )
+    return team_logs, players
+
+
+def generate_league(seasons: int = 1, teams: int = 30, players_per_team: int = 15, last_season: int = 2024, seed: int = 7) -> League:
+    """Fabricate a deterministic league: rosters plus API-shaped (LeagueGameLog) team and player logs.
+
+    The final eight days of the last season double as the upcoming schedule window.
+    """
+    rng = np.random.default_rng(seed)
+    team_df = _teams(teams)
+    player_df = _players(team_df, players_per_team, rng)
+    team_frames, player_frames = [], []
+    for season in range(last_season - seasons + 1, last_season + 1):
+        team_logs, player_logs = _season(season, team_df, players_per_team, rng)
+        team_frames.append(team_logs)
+        player_frames.append(player_logs)
+    team_logs = pd.concat(team_frames, ignore_index=True)
+    player_logs = pd.concat(player_frames, ignore_index=True)
+
+    last = team_logs[team_logs['SEASON_ID'] == f'2{last_season}']
+    window_start = (pd.to_datetime(last['GAME_DATE']).max() - pd.Timedelta(days=7)).strftime('%Y-%m-%d')
+    upcoming = last[(last['GAME_DATE'] >= window_start) & last['MATCHUP'].str.contains(' vs. ')]
+    away = last[last['MATCHUP'].str.contains(' @ ')].set_index('GAME_ID')['TEAM_ID']
+    schedule = pd.DataFrame(
+        {
+            'game_id': upcoming['GAME_ID'].to_numpy(),
+            'game_date': upcoming['GAME_DATE'].to_numpy(),
+            'home_team_id': upcoming['TEAM_ID'].to_numpy(),
+            'away_team_id': upcoming['GAME_ID'].map(away).to_numpy(),
+            'status': '7:30 pm ET',
+        }
+    )
+    return League(team_df, player_df, schedule, team_logs, player_logs)
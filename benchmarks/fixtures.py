@@ -0,0 +1,142 @@
+import argparse
+import sys
+import tempfile
+from datetime import date, datetime
+from pathlib import Path
+
+import pandas as pd
+
+from benchmarks.datagen import League, generate_league
+
+SCOREBOARD_SETS = [
+    'Available', 'EastConfStandingsByDay', 'GameHeader', 'LastMeeting', 'LineScore', 'SeriesStandings',
+    'TeamLeaders', 'TicketLinks', 'WestConfStandingsByDay', 'WinProbability',
+]
+ROSTER_HEADERS = ['TeamID', 'SEASON', 'LeagueID', 'PLAYER', 'NUM', 'POSITION', 'HEIGHT', 'WEIGHT', 'PLAYER_ID']
+
+
+def _result_set(name: str, df: pd.DataFrame | None = None) -> dict:
+    if df is None:
+        return {'name': name, 'headers': [], 'rowSet': []}
+    rows = df.astype(object).where(df.notna(), None).values.tolist()
+    return {'name': name, 'headers': list(df.columns), 'rowSet': rows}
+
+
+def _payload(*result_sets: dict) -> dict:
+    return {'resource': 'synthetic', 'parameters': {}, 'resultSets': list(result_sets)}
+
+
+class LeagueResponder:
+    """Answers the stats endpoints the ETL uses from a synthetic League, as of `today`.
+
+    Games before `today` are final and appear in game logs; later games are scheduled only.
+    """
+
+    def __init__(self, league: League, today: date | None = None):
+        self.league = league
+        dates = pd.to_datetime(league.team_logs['GAME_DATE'])
+        self.today = today or (dates.max() - pd.Timedelta(days=6)).date()
+        cutoff = self.today.isoformat()
+        self.team_logs = league.team_logs[league.team_logs['GAME_DATE'] < cutoff]
+        self.player_logs = league.player_logs[league.player_logs['GAME_DATE'] < cutoff]
+
+    def __call__(self, endpoint: str, params: dict) -> dict | None:
+        handler = getattr(self, endpoint, None)
+        return handler(params) if handler else None
+
+    def scoreboardv2(self, params: dict) -> dict:
+        day = datetime.strptime(params['GameDate'], '%m/%d/%Y').date().isoformat()
+        logs = self.league.team_logs[self.league.team_logs['GAME_DATE'] == day]
+        home = logs[logs['MATCHUP'].str.contains(' vs. ')]
+        away = logs[logs['MATCHUP'].str.contains(' @ ')].set_index('GAME_ID')['TEAM_ID']
+        header = pd.DataFrame(
+            {
+                'GAME_DATE_EST': f'{day}T00:00:00',
+                'GAME_ID': home['GAME_ID'].to_numpy(),
+                'GAME_STATUS_TEXT': 'Final' if day < self.today.isoformat() else '7:30 pm ET',
+                'HOME_TEAM_ID': home['TEAM_ID'].to_numpy(),
+                'VISITOR_TEAM_ID': home['GAME_ID'].map(away).to_numpy(),
+            }
+        )
+        return _payload(*[_result_set(name, header if name == 'GameHeader' else None) for name in SCOREBOARD_SETS])
+
+    def commonteamroster(self, params: dict) -> dict:
+        team_id = int(params['TeamID'])
+        players = self.league.players[self.league.players['team_id'] == team_id]
+        roster = pd.DataFrame(
+            {
+                'TeamID': team_id,
+                'SEASON': params.get('Season', ''),
+                'LeagueID': '00',
+                'PLAYER': players['full_name'].to_numpy(),
+                'NUM': [str(i) for i in range(len(players))],
+                'POSITION': players['position'].to_numpy(),
+                'HEIGHT': players['height'].to_numpy(),
+                'WEIGHT': players['weight'].astype(str).to_numpy(),
+                'PLAYER_ID': players['player_id'].to_numpy(),
+            },
+            columns=ROSTER_HEADERS,
+        )
+        return _payload(_result_set('CommonTeamRoster', roster), _result_set('Coaches'))
+
+    def _season(self, df: pd.DataFrame, params: dict) -> pd.DataFrame:
+        season = params.get('Season')
+        return df[df['SEASON_ID'] == f'2{season[:4]}'] if season else df
+
+    def leaguegamelog(self, params: dict) -> dict:
+        logs = self.player_logs if params.get('PlayerOrTeam') == 'P' else self.team_logs
+        return _payload(_result_set('LeagueGameLog', self._season(logs, params)))
+
+    def leaguegamefinder(self, params: dict) -> dict:
+        if params.get('PlayerID'):
+            logs = self.player_logs[self.player_logs['PLAYER_ID'] == int(params['PlayerID'])]
+        else:
+            logs = self.player_logs if params.get('PlayerOrTeam') == 'P' else self.team_logs
+            if params.get('TeamID'):
+                logs = logs[logs['TEAM_ID'] == int(params['TeamID'])]
+        return _payload(_result_set('LeagueGameFinderResults', self._season(logs, params)))
+
+
+def synthesize(out_dir: str, seasons: int = 1, bulk: bool = True) -> dict:
+    """Run the ETL once against a scratch SQLite database, answering every API call from a
+    synthetic league and saving each response as a replayable fixture in `out_dir`."""
+    from benchmarks.run import configure
+
+    configure('sqlite', sqlite_path=str(Path(tempfile.mkdtemp(prefix='nba_fixtures_')) / 'etl.db'))
+    from db.migrate import migrate
+    from etl.common import SCHEDULER, SETTINGS
+    from etl.fetcher import TokenBucket
+    from etl.pipeline import run_pipeline
+    from etl.replay import FixtureStore, ReplayAdapter, mounted
+
+    league = generate_league(seasons=seasons)
+    responder = LeagueResponder(league)
+    SCHEDULER.bucket = TokenBucket(1000.0, 100)  # no real upstream to protect while synthesizing
+    SETTINGS.etl_today = responder.today
+    SETTINGS.etl_bulk_ingest = bulk
+    last = int(league.team_logs['SEASON_ID'].max()[1:])
+    SETTINGS.nba_season = f'{last}-{(last + 1) % 100:02d}'
+    migrate()
+
+    store = FixtureStore(out_dir)
+    store.write_manifest(
+        etl_today=responder.today.isoformat(), nba_season=SETTINGS.nba_season, etl_bulk_ingest=bulk, synthetic_seasons=seasons
+    )
+    with mounted(ReplayAdapter(store, responder=responder, record=True)) as adapter:
+        report = run_pipeline()
+    return {'report': report.as_dict(), 'transport': adapter.stats.as_dict()}
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description='Write a replayable nba_api fixture set from a synthetic league.')
+    parser.add_argument('out_dir')
+    parser.add_argument('--seasons', type=int, default=1)
+    parser.add_argument('--per-entity', action='store_true', help='Record per-team/per-player finder calls instead of league logs')
+    args = parser.parse_args()
+    result = synthesize(args.out_dir, args.seasons, bulk=not args.per_entity)
+    print(f"Recorded {result['transport']['recorded']} fixtures to {args.out_dir}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
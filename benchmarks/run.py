@@ -0,0 +1,226 @@
+import argparse
+import importlib
+import itertools
+import json
+import os
+import statistics
+import sys
+import tempfile
+import time
+from dataclasses import dataclass
+from datetime import date
+from pathlib import Path
+from typing import Callable
+
+BASELINES = Path(__file__).with_name('baselines.json')
+
+
+@dataclass
+class Bench:
+    name: str
+    fn: Callable[[], object]
+    setup: Callable[[], object] | None = None
+
+
+def configure(backend: str, sqlite_path: str | None = None, postgres_db: str | None = None):
+    """Point app settings (and therefore get_engine) at the benchmark database."""
+    os.environ['DB_BACKEND'] = backend
+    if sqlite_path:
+        os.environ['SQLITE_PATH'] = sqlite_path
+    if postgres_db:
+        os.environ['POSTGRES_DB'] = postgres_db
+    from app.config import get_settings
+
+    get_settings.cache_clear()
+    return get_settings()
+
+
+def recreate_postgres_database(settings, name: str) -> None:
+    from sqlalchemy import create_engine, text
+
+    admin_url = settings.database_url().rsplit('/', 1)[0] + '/postgres'
+    engine = create_engine(admin_url, isolation_level='AUTOCOMMIT')
+    with engine.connect() as conn:
+        conn.execute(text(f'DROP DATABASE IF EXISTS {name}'))
+        conn.execute(text(f'CREATE DATABASE {name}'))
+    engine.dispose()
+
+
+def seed(league) -> None:
+    from db.migrate import migrate
+    from etl.common import now_iso, upsert_rows
+    from etl.player_index import refresh_player_index
+    from etl.rolling import PLAYER_TOTALS, TEAM_TOTALS, refresh_totals
+    from etl.transforms import normalize_player_games, normalize_team_games
+
+    lineups = importlib.import_module('etl.06_load_lineups')
+    migrate()
+    stamp = now_iso()
+    upsert_rows('teams', league.teams.assign(updated_at=stamp), ['team_id'])
+    upsert_rows('players', league.players.assign(updated_at=stamp), ['player_id'])
+    upsert_rows('schedule', league.schedule.assign(updated_at=stamp), ['game_id'])
+    upsert_rows('team_game_stats', normalize_team_games(league.team_logs, updated_at=stamp), ['game_id', 'team_id'])
+    upsert_rows('player_game_stats', normalize_player_games(league.player_logs, updated_at=stamp), ['game_id', 'player_id'])
+    refresh_totals(TEAM_TOTALS)
+    refresh_totals(PLAYER_TOTALS)
+    upsert_rows('lineups', lineups.infer_lineups(), ['game_id', 'team_id', 'player_id'])
+    refresh_player_index()
+
+
+def suite(league) -> list[Bench]:
+    from app.players import load_player_index
+    from app.queries import LATEST_LINEUP_SQL, SCHEDULE_SQL, TEAM_LAST5_SQL
+    from app.slate import load_slate
+    from app.stats import player_log_with_rolling, window_averages
+    from db.query import execute, read_df
+    from db.versions import load_versions
+    from etl.common import now_iso, upsert_rows
+    from etl.player_index import refresh_player_index
+    from etl.rolling import PLAYER_TOTALS, refresh_totals
+    from etl.transforms import normalize_player_games, normalize_team_games
+
+    lineups = importlib.import_module('etl.06_load_lineups')
+    player_rows = normalize_player_games(league.player_logs, updated_at=now_iso())
+    team_rows = normalize_team_games(league.team_logs, updated_at=now_iso())
+    slate_date = str(league.schedule['game_date'].iloc[0])
+    slate_day = date.fromisoformat(slate_date[:10])
+    team_id = int(league.schedule['home_team_id'].iloc[0])
+    player_id = int(league.players.loc[league.players['team_id'] == team_id, 'player_id'].iloc[0])
+    index = load_player_index()
+    bumps, changed = itertools.count(1), {}
+
+    def change_points() -> None:
+        # A new pts value on every row each iteration, so change detection passes them all to the bulk write.
+        step = next(bumps)
+        changed['player_game_stats'] = player_rows.assign(pts=player_rows['pts'] + step)
+        changed['team_game_stats'] = team_rows.assign(pts=team_rows['pts'] + step)
+
+    def touch_latest_day() -> None:
+        execute(
+            'UPDATE player_game_stats SET updated_at = :ts WHERE game_date = (SELECT MAX(game_date) FROM player_game_stats)',
+            {'ts': '9999-12-31T00:00:00'},
+        )
+
+    return [
+        Bench('transform.player_games', lambda: normalize_player_games(league.player_logs, updated_at='now')),
+        Bench('transform.team_games', lambda: normalize_team_games(league.team_logs, updated_at='now')),
+        Bench('upsert.player_game_stats', lambda: upsert_rows('player_game_stats', changed['player_game_stats'], ['game_id', 'player_id']), setup=change_points),
+        Bench('upsert.team_game_stats', lambda: upsert_rows('team_game_stats', changed['team_game_stats'], ['game_id', 'team_id']), setup=change_points),
+        Bench('upsert.player_game_stats.unchanged', lambda: upsert_rows('player_game_stats', player_rows, ['game_id', 'player_id'])),
+        Bench('upsert.team_game_stats.unchanged', lambda: upsert_rows('team_game_stats', team_rows, ['game_id', 'team_id'])),
+        Bench('etl.lineup_inference', lineups.infer_lineups),
+        Bench('etl.rolling_totals_incremental', lambda: refresh_totals(PLAYER_TOTALS), setup=touch_latest_day),
+        Bench('etl.player_index_unchanged', refresh_player_index),
+        Bench('dashboard.load_schedule', lambda: read_df(SCHEDULE_SQL, {'game_date': slate_date})),
+        Bench('dashboard.team_last5', lambda: read_df(TEAM_LAST5_SQL, {'team_id': team_id})),
+        Bench('dashboard.latest_lineup', lambda: read_df(LATEST_LINEUP_SQL, {'team_id': team_id})),
+        Bench('dashboard.player_log', lambda: player_log_with_rolling(player_id, 5)),
+        Bench('dashboard.window_averages', lambda: window_averages('player', player_id, 20)),
+        Bench('dashboard.load_slate', lambda: load_slate(slate_day, 5)),
+        Bench('dashboard.load_player_index', load_player_index),
+        Bench('dashboard.player_search_prefix', lambda: index.search('player 01')),
+        Bench('dashboard.player_search_fuzzy', lambda: index.search('plyer 0101')),
+        Bench('dashboard.data_versions', load_versions),
+    ]
+
+
+def measure(bench: Bench, repeat: int) -> float:
+    if bench.setup:
+        bench.setup()
+    bench.fn()
+    samples = []
+    for _ in range(repeat):
+        if bench.setup:
+            bench.setup()
+        started = time.perf_counter()
+        bench.fn()
+        samples.append(time.perf_counter() - started)
+    return statistics.median(samples)
+
+
+def compare(results: dict[str, float], baseline: dict[str, float], threshold: float, min_delta_ms: float) -> list[str]:
+    regressions = []
+    for name, seconds in results.items():
+        base = baseline.get(name)
+        if base is None:
+            continue
+        if seconds > base * (1 + threshold) and (seconds - base) * 1000 > min_delta_ms:
+            regressions.append(f'{name}: {seconds * 1000:.2f}ms vs baseline {base * 1000:.2f}ms')
+    return regressions
+
+
+def format_results(results: dict[str, float], baseline: dict[str, float]) -> str:
+    lines = [f"{'benchmark':<38}{'median ms':>12}{'baseline ms':>13}{'change':>9}"]
+    for name, seconds in results.items():
+        base = baseline.get(name)
+        change = f'{(seconds / base - 1) * 100:+.0f}%' if base else '-'
+        base_ms = f'{base * 1000:.2f}' if base else '-'
+        lines.append(f'{name:<38}{seconds * 1000:>12.2f}{base_ms:>13}{change:>9}')
+    return '\n'.join(lines)
+
+
+def run_backend(backend: str, args, league) -> dict[str, float]:
+    if backend == 'sqlite':
+        configure('sqlite', sqlite_path=str(Path(tempfile.mkdtemp(prefix='nba_bench_')) / 'bench.db'))
+    else:
+        settings = configure('postgres', postgres_db=args.postgres_db)
+        try:
+            recreate_postgres_database(settings, args.postgres_db)
+        except Exception as exc:
+            if args.require_postgres:
+                raise
+            print(f'Skipping postgres benchmarks: {exc.__class__.__name__}: {exc}')
+            return {}
+    started = time.perf_counter()
+    seed(league)
+    print(f'[{backend}] seeded in {time.perf_counter() - started:.1f}s')
+    return {bench.name: measure(bench, args.repeat) for bench in suite(league)}
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description='Offline ETL and dashboard benchmarks on a synthetic league.')
+    parser.add_argument('--seasons', type=int, default=1, help='Seasons of game logs to generate (1-10)')
+    parser.add_argument('--backends', default='sqlite', help='Comma-separated: sqlite,postgres')
+    parser.add_argument('--postgres-db', default='nba_bench', help='Scratch database (dropped and recreated)')
+    parser.add_argument('--require-postgres', action='store_true', help='Fail instead of skipping when Postgres is down')
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--threshold', type=float, default=0.25, help='Allowed slowdown vs baseline (0.25 = 25%%)')
+    parser.add_argument('--min-delta-ms', type=float, default=1.0, help='Ignore regressions smaller than this')
+    parser.add_argument('--update-baseline', action='store_true', help='Store these results as the new baseline')
+    parser.add_argument('--output', help='Write raw results as JSON')
+    return parser.parse_args()
+
+
+def main() -> int:
+    args = parse_args()
+    from benchmarks.datagen import generate_league
+
+    league = generate_league(seasons=args.seasons)
+    print(f'Generated {len(league.player_logs)} player rows, {len(league.team_logs)} team rows')
+    baselines = json.loads(BASELINES.read_text()) if BASELINES.exists() else {}
+    all_results, regressions = {}, []
+    for backend in [b.strip() for b in args.backends.split(',') if b.strip()]:
+        results = run_backend(backend, args, league)
+        if not results:
+            continue
+        key = f'{backend}:seasons={args.seasons}'
+        all_results[key] = results
+        print(f'\n[{key}]')
+        print(format_results(results, baselines.get(key, {})))
+        regressions += [f'[{key}] {r}' for r in compare(results, baselines.get(key, {}), args.threshold, args.min_delta_ms)]
+
+    if args.output:
+        Path(args.output).write_text(json.dumps(all_results, indent=2))
+    if args.update_baseline:
+        baselines.update(all_results)
+        BASELINES.write_text(json.dumps(baselines, indent=2, sort_keys=True) + '\n')
+        print(f'\nBaseline updated: {BASELINES}')
+        return 0
+    if regressions:
+        print('\nRegressions over threshold:\n' + '\n'.join(regressions))
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
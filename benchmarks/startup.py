@@ -0,0 +1,113 @@
+import argparse
+import json
+import math
+import os
+import subprocess
+import sys
+from collections import Counter
+from dataclasses import dataclass
+from pathlib import Path
+
+from etl.pipeline import STAGE_MODULES
+
+ROOT = Path(__file__).resolve().parents[1]
+BUDGETS = Path(__file__).with_name('startup_budgets.json')
+
+# Entry point -> the module a cold process imports before doing any work. streamlit_app.py only
+# imports app.main and calls main(); run_etl.py is imported as a module so its __main__ block stays idle.
+ENTRY_POINTS = {
+    'streamlit_app.py': 'app.main',
+    'scripts/run_etl.py': 'scripts.run_etl',
+    **{f"etl/{module.split('.', 1)[1]}.py": module for module in STAGE_MODULES},
+}
+
+
+@dataclass
+class ImportProfile:
+    total_us: int
+    modules: dict[str, int]  # module -> self time (us), interpreter startup excluded
+
+    def by_package(self) -> Counter:
+        packages = Counter()
+        for name, self_us in self.modules.items():
+            packages[name.split('.', 1)[0]] += self_us
+        return packages
+
+
+def _importtime(code: str) -> list[tuple[str, int, int, int]]:
+    env = {**os.environ, 'PYTHONPATH': os.pathsep.join(filter(None, [str(ROOT), os.environ.get('PYTHONPATH')]))}
+    proc = subprocess.run([sys.executable, '-X', 'importtime', '-c', code], cwd=ROOT, env=env, capture_output=True, text=True)
+    if proc.returncode:
+        raise RuntimeError(f'{code!r} failed:\n{proc.stderr[-2000:]}')
+    rows = []
+    for line in proc.stderr.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        self_us, cumulative_us, name = line.split(':', 1)[1].split('|')
+        rows.append((name.strip(), (len(name) - len(name.lstrip()) - 1) // 2, int(self_us), int(cumulative_us)))
+    return rows
+
+
+def import_profile(module: str, startup: frozenset[str] = frozenset()) -> ImportProfile:
+    """Import `module` in a fresh interpreter under `-X importtime`; `startup` names modules to ignore."""
+    rows = [row for row in _importtime(f'__import__({module!r})') if row[0] not in startup]
+    total = sum(cumulative for _, depth, _, cumulative in rows if depth == 0)
+    return ImportProfile(total, {name: self_us for name, _, self_us, _ in rows})
+
+
+def interpreter_startup() -> frozenset[str]:
+    return frozenset(name for name, *_ in _importtime('pass'))
+
+
+def measure(module: str, repeat: int, startup: frozenset[str]) -> tuple[float, ImportProfile]:
+    import_profile(module, startup)  # warm-up: writes .pyc files and the OS page cache
+    profiles = sorted((import_profile(module, startup) for _ in range(repeat)), key=lambda p: p.total_us)
+    median = profiles[len(profiles) // 2]
+    return median.total_us / 1000, median
+
+
+def format_results(results: dict[str, tuple[float, ImportProfile]], budgets: dict[str, float]) -> str:
+    lines = [f"{'entry point':<36}{'import ms':>11}{'budget ms':>11}  heaviest packages (self ms)"]
+    for name, (ms, profile) in results.items():
+        budget = budgets.get(name)
+        heavy = ', '.join(f'{package} {us / 1000:.0f}' for package, us in profile.by_package().most_common(4))
+        lines.append(f"{name:<36}{ms:>11.0f}{budget if budget else '-':>11}  {heavy}")
+    return '\n'.join(lines)
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description='Cold-start import time of the app and ETL entry points against tracked budgets.')
+    parser.add_argument('--only', help='Comma-separated entry points (as listed in startup_budgets.json)')
+    parser.add_argument('--repeat', type=int, default=5, help='Fresh interpreters per entry point; the median is reported')
+    parser.add_argument('--headroom', type=float, default=0.3, help='Slack added when writing budgets (0.3 = 30%%)')
+    parser.add_argument('--update-budgets', action='store_true', help='Store these medians plus headroom as the budgets')
+    parser.add_argument('--output', help='Write per-entry import times and per-module self times as JSON')
+    return parser.parse_args()
+
+
+def main() -> int:
+    args = parse_args()
+    names = [n.strip() for n in args.only.split(',')] if args.only else list(ENTRY_POINTS)
+    unknown = sorted(set(names) - set(ENTRY_POINTS))
+    if unknown:
+        raise SystemExit(f'Unknown entry points: {unknown}')
+    budgets = json.loads(BUDGETS.read_text()) if BUDGETS.exists() else {}
+    startup = interpreter_startup()
+    results = {name: measure(ENTRY_POINTS[name], args.repeat, startup) for name in names}
+    print(format_results(results, budgets))
+    if args.output:
+        Path(args.output).write_text(json.dumps({name: {'ms': ms, 'modules': p.modules} for name, (ms, p) in results.items()}, indent=2))
+    if args.update_budgets:
+        budgets.update({name: int(math.ceil(ms * (1 + args.headroom) / 50) * 50) for name, (ms, _) in results.items()})
+        BUDGETS.write_text(json.dumps(budgets, indent=2, sort_keys=True) + '\n')
+        print(f'\nBudgets updated: {BUDGETS}')
+        return 0
+    over = [f'{name}: {ms:.0f}ms vs budget {budgets[name]}ms' for name, (ms, _) in results.items() if name in budgets and ms > budgets[name]]
+    if over:
+        print('\nOver budget:\n' + '\n'.join(over))
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
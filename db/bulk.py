@@ -0,0 +1,259 @@
+import csv
+import io
+import logging
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass
+from itertools import chain
+from typing import Iterable, Iterator
+
+import numpy as np
+import pandas as pd
+from sqlalchemy.engine import Connection
+
+from app.metrics import METRICS
+from db.query import statement
+from db.sqlite_utils import chunked, upsert_sql
+
+LOGGER = logging.getLogger(__name__)
+
+PG_NULL = '\\N'
+ROW_HASH = 'row_hash'
+# Tables with a row_hash column (migrations 0007 and 0008); upserts into them can skip unchanged rows.
+ROW_HASH_TABLES = frozenset({'teams', 'players', 'schedule', 'team_game_stats', 'player_game_stats', 'lineups', 'player_index'})
+UNHASHED_COLS = frozenset({ROW_HASH, 'updated_at'})
+MAX_LOOKUP_PARAMS = 30000  # below SQLite's default limit of 32766 bound parameters per statement
+
+_TRACKED: ContextVar[list | None] = ContextVar('bulk_writes', default=None)
+
+
+@dataclass
+class BulkWriteResult:
+    """`rows` is how many rows were written; with change detection also split into inserted/updated."""
+
+    table: str
+    rows: int = 0
+    seconds: float = 0.0
+    inserted: int = 0
+    updated: int = 0
+    unchanged: int = 0
+
+    @property
+    def rows_per_second(self) -> float:
+        return self.rows / self.seconds if self.seconds > 0 else 0.0
+
+
+@contextmanager
+def track_writes() -> Iterator[list[BulkWriteResult]]:
+    """Collect the result of every `bulk_upsert` made by this thread inside the block."""
+    writes: list[BulkWriteResult] = []
+    token = _TRACKED.set(writes)
+    try:
+        yield writes
+    finally:
+        _TRACKED.reset(token)
+
+
+def _canonical(values: pd.Series) -> pd.Series:
+    first = values.dropna().iloc[:1].tolist() if values.dtype == object else []
+    if first and isinstance(first[0], (bool, int, float, np.number)):
+        numeric = pd.to_numeric(values, errors='coerce')
+        if numeric.notna().sum() == values.notna().sum():
+            values = numeric
+    if pd.api.types.is_bool_dtype(values) or pd.api.types.is_numeric_dtype(values):
+        return pd.Series(values.to_numpy(dtype='float64', na_value=np.nan), index=values.index)
+    return values.astype(object).where(values.notna(), None).astype(str)
+
+
+def row_hashes(frame: pd.DataFrame, cols: list[str]) -> pd.Series:
+    """Stable signed 64-bit hash of `cols` per row. Numbers hash by value, so 12 and 12.0 match."""
+    canonical = pd.DataFrame({c: _canonical(frame[c]) for c in cols}, index=frame.index)
+    hashed = pd.util.hash_pandas_object(canonical, index=False).to_numpy()
+    return pd.Series(hashed.view('int64'), index=frame.index)
+
+
+def _stored_hashes(conn: Connection, table: str, keys: list[tuple], conflict_cols: list[str], chunk_size: int) -> dict[tuple, int | None]:
+    """Stored row_hash by key for every row sharing a leading key value with `keys`.
+
+    Conflict keys are primary keys, so probing the distinct values of their indexed first column
+    (a batch's game ids) is much cheaper than matching whole key tuples; extra rows are ignored.
+    """
+    # A raw DBAPI cursor: compiling an expanding IN, or building a Row per stored row, costs more than the lookup.
+    mark = '?' if conn.dialect.paramstyle == 'qmark' else '%s'
+    leading = list(dict.fromkeys(key[0] for key in keys))
+    stored = {}
+    cursor = conn.connection.cursor()
+    try:
+        for chunk in chunked(leading, max(1, min(chunk_size, MAX_LOOKUP_PARAMS))):
+            cursor.execute(
+                f"SELECT {', '.join(conflict_cols)}, {ROW_HASH} FROM {table} WHERE {conflict_cols[0]} IN ({', '.join([mark] * len(chunk))})",
+                tuple(chunk),
+            )
+            stored.update((tuple(found[:-1]), found[-1]) for found in cursor.fetchall())
+    finally:
+        cursor.close()
+    return stored
+
+
+def _changed_rows(
+    conn: Connection,
+    table: str,
+    rows: pd.DataFrame | Iterable[dict],
+    conflict_cols: list[str],
+    chunk_size: int,
+    result: BulkWriteResult,
+    update: bool = True,
+    known_new: pd.Series | None = None,
+) -> pd.DataFrame:
+    """New or changed rows with their row_hash, counting inserted/updated/unchanged into `result`.
+
+    Without `update` only new rows are kept and every stored row counts as unchanged. Rows flagged
+    in `known_new` are hashed but never looked up.
+    """
+    frame = rows if isinstance(rows, pd.DataFrame) else pd.DataFrame(list(rows))
+    if frame.empty:
+        return frame
+    frame = frame.drop_duplicates(conflict_cols, keep='last')
+    hashes = row_hashes(frame, [c for c in frame.columns if c not in UNHASHED_COLS])
+    frame = frame.assign(**{ROW_HASH: hashes})
+    keys = list(frame[conflict_cols].astype(object).itertuples(index=False, name=None))
+    if known_new is None:
+        lookup = keys
+    else:
+        lookup = [key for key, new in zip(keys, known_new.reindex(frame.index, fill_value=False).tolist()) if not new]
+    stored = _stored_hashes(conn, table, lookup, conflict_cols, chunk_size) if lookup else {}
+    missing = object()
+    previous = [stored.get(k, missing) for k in keys]
+    new = np.array([p is missing for p in previous])
+    same = np.array([p is not missing and p == h for p, h in zip(previous, hashes.tolist())])
+    if not update:
+        result.inserted = int(new.sum())
+        result.unchanged = len(frame) - result.inserted
+        return frame[new]
+    result.inserted, result.unchanged = int(new.sum()), int(same.sum())
+    result.updated = len(frame) - result.inserted - result.unchanged
+    return frame[~same]
+
+
+def _columns_and_tuples(rows: pd.DataFrame | Iterable[dict]) -> tuple[list[str], Iterable[tuple]]:
+    if isinstance(rows, pd.DataFrame):
+        if rows.empty:
+            return [], []
+        frame = rows.astype(object).where(rows.notna(), None)
+        return list(frame.columns), frame.itertuples(index=False, name=None)
+
+    it = iter(rows)
+    first = next(it, None)
+    if first is None:
+        return [], []
+    cols = list(first.keys())
+    return cols, (tuple(row.get(c) for c in cols) for row in chain([first], it))
+
+
+def _sqlite_upsert(
+    conn: Connection, table: str, cols: list[str], tuples: Iterable[tuple], conflict_cols: list[str], chunk_size: int, update: bool = True
+) -> int:
+    # One transaction, one SQL string: sqlite3 keeps the prepared statement cached across chunks.
+    sql = upsert_sql(table, cols, conflict_cols, update)
+    written = 0
+    for chunk in chunked(tuples, chunk_size):
+        conn.exec_driver_sql(sql, chunk)
+        written += len(chunk)
+    return written
+
+
+def _postgres_upsert(
+    conn: Connection, table: str, cols: list[str], tuples: Iterable[tuple], conflict_cols: list[str], chunk_size: int, update: bool = True
+) -> int:
+    staging = f'_stage_{table}'
+    col_csv = ', '.join(cols)
+    conflict_csv = ', '.join(conflict_cols)
+    update_cols = [c for c in cols if c not in conflict_cols] if update else []
+    action = 'DO UPDATE SET ' + ', '.join(f'{c}=excluded.{c}' for c in update_cols) if update_cols else 'DO NOTHING'
+
+    written = 0
+    cursor = conn.connection.cursor()
+    try:
+        cursor.execute(f'CREATE TEMP TABLE {staging} (LIKE {table} INCLUDING DEFAULTS) ON COMMIT DROP')
+        cursor.execute(f'ALTER TABLE {staging} ADD COLUMN _bulk_seq BIGSERIAL')
+        for chunk in chunked(tuples, chunk_size):
+            buffer = io.StringIO()
+            writer = csv.writer(buffer)
+            writer.writerows([PG_NULL if v is None else v for v in row] for row in chunk)
+            buffer.seek(0)
+            cursor.copy_expert(f"COPY {staging} ({col_csv}) FROM STDIN WITH (FORMAT csv, NULL '{PG_NULL}')", buffer)
+            written += len(chunk)
+        # Later rows win on duplicate keys, matching executemany semantics.
+        cursor.execute(
+            f'INSERT INTO {table} ({col_csv}) '
+            f'SELECT DISTINCT ON ({conflict_csv}) {col_csv} FROM {staging} ORDER BY {conflict_csv}, _bulk_seq DESC '
+            f'ON CONFLICT ({conflict_csv}) {action}'
+        )
+        cursor.execute(f'DROP TABLE {staging}')
+    finally:
+        cursor.close()
+    return written
+
+
+def _generic_upsert(
+    conn: Connection, table: str, cols: list[str], tuples: Iterable[tuple], conflict_cols: list[str], chunk_size: int, update: bool = True
+) -> int:
+    update_cols = [c for c in cols if c not in conflict_cols] if update else []
+    action = 'DO UPDATE SET ' + ', '.join(f'{c}=excluded.{c}' for c in update_cols) if update_cols else 'DO NOTHING'
+    sql = statement(
+        f"INSERT INTO {table} ({', '.join(cols)}) VALUES ({', '.join(f':{c}' for c in cols)}) "
+        f"ON CONFLICT ({', '.join(conflict_cols)}) {action}"
+    )
+    written = 0
+    for chunk in chunked(tuples, chunk_size):
+        conn.execute(sql, [dict(zip(cols, row)) for row in chunk])
+        written += len(chunk)
+    return written
+
+
+def bulk_upsert(
+    conn: Connection,
+    table: str,
+    rows: pd.DataFrame | Iterable[dict],
+    conflict_cols: list[str],
+    chunk_size: int = 5000,
+    detect_changes: bool = False,
+    update: bool = True,
+    known_new: pd.Series | None = None,
+) -> BulkWriteResult:
+    """Upsert DataFrame or dict rows inside the caller's transaction using the backend's fastest path.
+
+    Postgres streams rows with COPY into a temp staging table and merges once; SQLite runs
+    chunked executemany calls of one prepared statement. With `detect_changes` (tables in
+    ROW_HASH_TABLES) rows whose content hash matches the stored one are not written at all.
+    Without `update` existing rows are left untouched (ON CONFLICT DO NOTHING). `known_new` (a boolean
+    Series on the DataFrame's index) marks rows the caller knows were never stored, such as games after
+    a stage's high-water mark; they are hashed and written without the stored-hash lookup.
+    """
+    started = time.perf_counter()
+    result = BulkWriteResult(table)
+    if detect_changes:
+        rows = _changed_rows(conn, table, rows, conflict_cols, chunk_size, result, update, known_new)
+    cols, tuples = _columns_and_tuples(rows)
+    if not cols and not result.unchanged:
+        return result
+
+    if cols:
+        dialect = conn.dialect.name
+        if dialect == 'sqlite':
+            writer = _sqlite_upsert
+        elif dialect == 'postgresql' and conn.dialect.driver == 'psycopg2':
+            writer = _postgres_upsert
+        else:
+            writer = _generic_upsert
+        result.rows = writer(conn, table, cols, tuples, conflict_cols, chunk_size, update)
+    result.seconds = time.perf_counter() - started
+    METRICS.observe('db_write_seconds', result.seconds, table=table)
+    METRICS.inc('db_rows_written_total', result.rows, table=table)
+    if result.unchanged:
+        METRICS.inc('db_rows_unchanged_total', result.unchanged, table=table)
+    tracked = _TRACKED.get()
+    if tracked is not None:
+        tracked.append(result)
+    return result
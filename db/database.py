@@ -1,24 +1,142 @@
+import threading
 from contextlib import contextmanager
+from functools import lru_cache
+from pathlib import Path
 from typing import Iterator
+from urllib.parse import quote
 
-from sqlalchemy import create_engine, text
+from sqlalchemy import create_engine, event, text
 from sqlalchemy.engine import Engine
-from sqlalchemy.orm import sessionmaker
 
-from app.config import get_settings
+from app.config import Settings, get_settings
 
+_ENGINES: dict[str, Engine] = {}
+_ENGINES_LOCK = threading.Lock()
+SNAPSHOT_POINTER = 'CURRENT'
+# Readers that opted in with read_snapshots(); the pointer file's identity and the URL it resolved to.
+_SNAPSHOTS = {'enabled': False, 'key': None, 'url': None}
 
-def get_engine() -> Engine:
+
+def _apply_sqlite_pragmas(engine: Engine, settings: Settings) -> None:
+    pragmas = [
+        f'PRAGMA journal_mode={settings.sqlite_journal_mode}',
+        f'PRAGMA synchronous={settings.sqlite_synchronous}',
+        f'PRAGMA mmap_size={int(settings.sqlite_mmap_bytes)}',
+        f'PRAGMA busy_timeout={int(settings.sqlite_busy_timeout_ms)}',
+        f'PRAGMA cache_size={int(settings.sqlite_cache_size)}',
+        'PRAGMA temp_store=MEMORY',
+    ]
+
+    @event.listens_for(engine, 'connect')
+    def set_pragmas(dbapi_conn, _record) -> None:
+        cursor = dbapi_conn.cursor()
+        for pragma in pragmas:
+            cursor.execute(pragma)
+        cursor.close()
+
+
+def build_engine(url: str, settings: Settings) -> Engine:
+    if url.startswith('sqlite'):
+        if url == settings.database_url():
+            Path(settings.sqlite_path).parent.mkdir(parents=True, exist_ok=True)
+        engine = create_engine(
+            url,
+            future=True,
+            connect_args={'timeout': settings.sqlite_busy_timeout_ms / 1000, 'check_same_thread': False},
+        )
+        _apply_sqlite_pragmas(engine, settings)
+        return engine
+    return create_engine(
+        url,
+        future=True,
+        pool_size=settings.db_pool_size,
+        max_overflow=settings.db_max_overflow,
+        pool_recycle=settings.db_pool_recycle_seconds,
+        pool_pre_ping=True,
+    )
+
+
+def snapshot_dir(settings: Settings) -> Path:
+    return Path(settings.sqlite_path).parent / 'snapshots'
+
+
+def _retire(url: str | None) -> None:
+    with _ENGINES_LOCK:
+        engine = _ENGINES.pop(url, None) if url else None
+    if engine is not None:
+        engine.dispose()
+
+
+def snapshot_url(settings: Settings) -> str | None:
+    """The published snapshot readers should query, or None while nothing has been published.
+
+    SQLite snapshots are files named by `snapshots/CURRENT`, checked with one stat per call so a
+    swap is picked up on the next query. Postgres readers put the snapshot schema first on the
+    search_path; tables it lacks (the refresh queue) resolve to the live schema.
+    """
+    if settings.db_backend.lower() == 'postgres':
+        return f"{settings.database_url()}?options={quote(f'-csearch_path={settings.db_snapshot_schema},public')}"
+    pointer = snapshot_dir(settings) / SNAPSHOT_POINTER
+    try:
+        stat = pointer.stat()
+    except FileNotFoundError:
+        return None
+    key = (stat.st_ino, stat.st_mtime_ns, stat.st_size)
+    if _SNAPSHOTS['key'] != key:
+        previous = _SNAPSHOTS['url']
+        _SNAPSHOTS['url'] = f'sqlite:///{pointer.parent / pointer.read_text().strip()}'
+        _SNAPSHOTS['key'] = key
+        if previous != _SNAPSHOTS['url']:
+            _retire(previous)
+    return _SNAPSHOTS['url']
+
+
+def read_snapshots(enabled: bool = True) -> None:
+    """Route this process's default engine to the published snapshot (when DB_SNAPSHOTS is on)."""
+    _SNAPSHOTS['enabled'] = enabled
+
+
+def get_engine(url: str | None = None) -> Engine:
+    """Return the process-wide engine for `url`.
+
+    The default is the configured database, or its published snapshot in a process that called
+    read_snapshots(). Pass `live_url()` for tables that must never be read from a snapshot.
+    """
     settings = get_settings()
-    return create_engine(settings.database_url(), future=True)
+    if url is None and _SNAPSHOTS['enabled'] and settings.db_snapshots:
+        url = snapshot_url(settings)
+    url = url or settings.database_url()
+    engine = _ENGINES.get(url)
+    if engine is None:
+        with _ENGINES_LOCK:
+            engine = _ENGINES.get(url)
+            if engine is None:
+                engine = _ENGINES[url] = build_engine(url, settings)
+    return engine
+
+
+def live_url() -> str:
+    return get_settings().database_url()
+
+
+def dispose_engines() -> None:
+    with _ENGINES_LOCK:
+        for engine in _ENGINES.values():
+            engine.dispose()
+        _ENGINES.clear()
+
 
+@lru_cache(maxsize=1)
+def session_factory():
+    # The ORM is a large import that only session users need; engines come from Core alone.
+    from sqlalchemy.orm import sessionmaker
 
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=get_engine())
+    return sessionmaker(autocommit=False, autoflush=False, bind=get_engine())
 
 
 @contextmanager
 def get_session() -> Iterator:
-    session = SessionLocal()
+    session = session_factory()()
     try:
         yield session
         session.commit()
@@ -0,0 +1,184 @@
+import importlib
+import json
+import re
+from dataclasses import dataclass, field
+
+from sqlalchemy import text
+from sqlalchemy.engine import Connection, Engine
+
+from db.database import get_engine
+
+ALIAS = re.compile(r'\b(?:FROM|JOIN)\s+([A-Za-z_]\w*)(?:\s+(?:AS\s+)?([A-Za-z_]\w*))?', re.IGNORECASE)
+KEYWORDS = {'on', 'where', 'join', 'left', 'right', 'inner', 'outer', 'cross', 'group', 'order', 'limit', 'union', 'using', 'natural'}
+SQLITE_SCAN = re.compile(r'^(SCAN|SEARCH) (\S+)(.*)$')
+
+
+@dataclass(frozen=True)
+class PlannedQuery:
+    """A hot query with sample parameters, the tables it reads in full by design and how many
+    temp sorts it may need (None: any, for set-wide window queries)."""
+
+    name: str
+    sql: str
+    params: dict = field(default_factory=dict)
+    full_reads: frozenset[str] = frozenset()
+    sorts: int | None = 0
+
+
+@dataclass(frozen=True)
+class PlanIssue:
+    query: str
+    kind: str
+    detail: str
+
+    def __str__(self) -> str:
+        return f'{self.query}: {self.kind} ({self.detail})'
+
+
+def catalog() -> list[PlannedQuery]:
+    """Every dashboard and ETL read worth guarding, built from the SQL the code actually runs."""
+    from app.players import PLAYER_INDEX_SQL
+    from app.queries import LATEST_LINEUP_SQL, SCHEDULE_SQL, TEAM_LAST5_SQL
+    from app.slate import SLATE_LINEUPS_SQL, SLATE_MATCHUPS_SQL, SLATE_TEAM_GAMES_SQL, slate_form_sql, slate_player_logs_sql
+    from app.stats import player_log_sql, window_averages_sql
+    from db.refresh import LEASE_SQL, QUEUED_SQL, RECENT_RUNS_SQL
+    from etl.common import SCHEDULED_PLAYERS_SQL, SCHEDULED_TEAMS_SQL
+    from etl.history import SCHEMAS, changed_sql, partition_sql
+    from etl.matchups import SLATE_SQL, STARTERS_SQL
+    from etl.player_index import SOURCE_SQL as PLAYER_INDEX_SOURCE_SQL
+    from etl.refresh import GAME_DAY_SQL
+    from etl.rolling import PLAYER_TOTALS, TEAM_TOTALS, refresh_sql
+    from etl.watermarks import LAST_PLAYED_SQL, PLAYER_HIGH_WATER_SQL, PLAYER_TEAMS_SQL, TEAM_HIGH_WATER_SQL, WATERMARKS_SQL
+
+    lineups = importlib.import_module('etl.06_load_lineups')
+    queries = [
+        PlannedQuery('schedule', SCHEDULE_SQL, {'game_date': '2025-01-10'}),
+        PlannedQuery('team_last5', TEAM_LAST5_SQL, {'team_id': 1}),
+        # The final ORDER BY sorts one team's lineup (five to a dozen rows).
+        PlannedQuery('latest_lineup', LATEST_LINEUP_SQL, {'team_id': 1}, sorts=1),
+        PlannedQuery('slate_matchups', SLATE_MATCHUPS_SQL, {'game_date': '2025-01-10'}),
+        PlannedQuery('player_log_rolling', player_log_sql(5), {'player_id': 1}),
+        PlannedQuery('player_log_rolling_season', player_log_sql(None), {'player_id': 1}),
+        PlannedQuery('watermarks', WATERMARKS_SQL, {'stage': 'recent_games'}),
+        # Whole-table reads: one row per team/player, served from covering indexes.
+        PlannedQuery('scheduled_teams', SCHEDULED_TEAMS_SQL, full_reads=frozenset({'schedule'}), sorts=1),
+        PlannedQuery('scheduled_players', SCHEDULED_PLAYERS_SQL, full_reads=frozenset({'schedule'}), sorts=1),
+        PlannedQuery('team_last_played', LAST_PLAYED_SQL, {'today': '2025-01-10'}, sorts=1),
+        PlannedQuery('team_high_water', TEAM_HIGH_WATER_SQL, full_reads=frozenset({'team_game_stats'})),
+        PlannedQuery('player_high_water', PLAYER_HIGH_WATER_SQL, full_reads=frozenset({'player_game_stats'})),
+        PlannedQuery('player_teams', PLAYER_TEAMS_SQL, full_reads=frozenset({'players'})),
+        PlannedQuery('team_ids', 'SELECT team_id FROM teams', full_reads=frozenset({'teams'})),
+        PlannedQuery('data_versions', 'SELECT table_name, version, updated_at FROM data_versions', full_reads=frozenset({'data_versions'})),
+        PlannedQuery('matchup_slate', SLATE_SQL, {'today': '2025-01-10'}),
+        # Every slate team's latest lineup and its starters' recent games, ranked with window functions.
+        PlannedQuery('matchup_starters', STARTERS_SQL, {'today': '2025-01-10', 'form_games': 5}, full_reads=frozenset({'lineups'}), sorts=None),
+        # Polled by every open dashboard and by the refresh worker.
+        # A newest-first walk of idx_refresh_runs_requested that stops at LIMIT.
+        PlannedQuery('refresh_runs', RECENT_RUNS_SQL, {'limit': 5}, full_reads=frozenset({'refresh_runs'})),
+        PlannedQuery('refresh_lease', LEASE_SQL, {'name': 'refresh'}),
+        PlannedQuery('refresh_queued', QUEUED_SQL),
+        PlannedQuery('game_day', GAME_DAY_SQL, {'today': '2025-01-10'}),
+        # Latest game per scheduled team needs window functions over every scheduled team's logs.
+        PlannedQuery('infer_lineups', lineups.LINEUP_SQL, full_reads=frozenset({'schedule', 'player_game_stats'}), sorts=None),
+        # The whole index, loaded once per data version in search_name order straight off its index.
+        PlannedQuery('player_index', PLAYER_INDEX_SQL, full_reads=frozenset({'player_index'})),
+        # Rebuilding the index aggregates every stored game log per player.
+        PlannedQuery('player_index_source', PLAYER_INDEX_SOURCE_SQL, full_reads=frozenset({'players', 'player_game_stats'}), sorts=None),
+    ]
+    # Slate loads rank each slate team's or starter's rows with window functions.
+    slate = {'game_date': '2025-01-10'}
+    queries.append(PlannedQuery('slate_team_games', SLATE_TEAM_GAMES_SQL, slate, sorts=None))
+    queries.append(PlannedQuery('slate_lineups', SLATE_LINEUPS_SQL, slate, sorts=None))
+    queries.append(PlannedQuery('slate_player_logs', slate_player_logs_sql(5), slate, sorts=None))
+    for kind in ('player', 'team'):
+        queries.append(PlannedQuery(f'slate_{kind}_form', slate_form_sql(kind, 5), slate, sorts=None))
+        queries.append(PlannedQuery(f'{kind}_window_averages', window_averages_sql(kind, 5), {'entity_id': 1}))
+        queries.append(PlannedQuery(f'{kind}_window_averages_season', window_averages_sql(kind, None), {'entity_id': 1}))
+    for spec in (PLAYER_TOTALS, TEAM_TOTALS):
+        # Change detection compares every source row with its running-total row.
+        for purpose, sql in refresh_sql(spec).items():
+            queries.append(PlannedQuery(f'{spec.table}_{purpose}', sql, full_reads=frozenset({spec.source})))
+    for table in SCHEMAS:
+        # Finding touched partitions reads every row's updated_at; rewriting one is a range read.
+        queries.append(
+            PlannedQuery(f'history_changed_{table}', changed_sql(table, True), {'since': '2025-01-01'}, full_reads=frozenset({table}))
+        )
+        queries.append(
+            PlannedQuery(f'history_partition_{table}', partition_sql(table), {'team_id': 1, 'start': '2024-10-01', 'end': '2025-10-01'})
+        )
+    return queries
+
+
+def _aliases(sql: str) -> dict[str, str]:
+    out = {}
+    for table, alias in ALIAS.findall(sql):
+        out[table.lower()] = table.lower()
+        if alias and alias.lower() not in KEYWORDS:
+            out[alias.lower()] = table.lower()
+    return out
+
+
+def sqlite_plan(conn: Connection, query: PlannedQuery) -> list[str]:
+    return [row[3] for row in conn.execute(text(f'EXPLAIN QUERY PLAN {query.sql}'), query.params)]
+
+
+def sqlite_issues(query: PlannedQuery, plan: list[str], tables: set[str]) -> list[PlanIssue]:
+    """Full scans of base tables (including automatic indexes, which scan to build) and temp B-trees."""
+    aliases = _aliases(query.sql)
+    issues, sorts = [], []
+    for detail in plan:
+        match = SQLITE_SCAN.match(detail)
+        if match:
+            table = aliases.get(match[2].lower(), match[2].lower())
+            full = match[1] == 'SCAN' or 'AUTOMATIC' in match[3]
+            if full and table in tables and table not in query.full_reads:
+                issues.append(PlanIssue(query.name, 'full_scan', detail))
+        elif 'TEMP B-TREE' in detail:
+            sorts.append(detail)
+    return issues + _excess_sorts(query, sorts)
+
+
+def _excess_sorts(query: PlannedQuery, sorts: list[str]) -> list[PlanIssue]:
+    if query.sorts is None or len(sorts) <= query.sorts:
+        return []
+    return [PlanIssue(query.name, 'temp_sort', f'{len(sorts)} sorts, {query.sorts} allowed: ' + '; '.join(sorts))]
+
+
+def postgres_plan(conn: Connection, query: PlannedQuery) -> dict:
+    # Penalise the fallbacks so a small seeded database shows whether an index *can* serve the query.
+    conn.exec_driver_sql('SET LOCAL enable_seqscan = off')
+    conn.exec_driver_sql('SET LOCAL enable_sort = off')
+    raw = conn.execute(text(f'EXPLAIN (FORMAT JSON) {query.sql}'), query.params).scalar()
+    return (json.loads(raw) if isinstance(raw, str) else raw)[0]['Plan']
+
+
+def postgres_issues(query: PlannedQuery, plan: dict) -> list[PlanIssue]:
+    issues, sorts = [], []
+    stack = [plan]
+    while stack:
+        node = stack.pop()
+        kind = node.get('Node Type')
+        relation = node.get('Relation Name')
+        if kind == 'Seq Scan' and relation not in query.full_reads:
+            issues.append(PlanIssue(query.name, 'full_scan', f'Seq Scan on {relation}'))
+        elif kind == 'Sort':
+            sorts.append(f"Sort on {', '.join(node.get('Sort Key', []))}")
+        stack.extend(node.get('Plans', []))
+    return issues + _excess_sorts(query, sorts)
+
+
+def check_plans(engine: Engine | None = None, queries: list[PlannedQuery] | None = None) -> dict[str, list[PlanIssue]]:
+    """EXPLAIN every catalogued query; returns {query name: issues} (empty lists when the plan is clean)."""
+    engine = engine or get_engine()
+    queries = queries if queries is not None else catalog()
+    results = {}
+    with engine.connect() as conn:
+        if engine.dialect.name == 'sqlite':
+            tables = {r[0].lower() for r in conn.exec_driver_sql("SELECT name FROM sqlite_master WHERE type = 'table'")}
+            for query in queries:
+                results[query.name] = sqlite_issues(query, sqlite_plan(conn, query), tables)
+        else:
+            for query in queries:
+                with conn.begin():
+                    results[query.name] = postgres_issues(query, postgres_plan(conn, query))
+    return results
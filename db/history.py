@@ -0,0 +1,153 @@
+import os
+from pathlib import Path
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+from pyarrow import fs
+
+from app.config import get_settings
+from app.metrics import METRICS
+
+# Partition keys live in the directory names (hive style), not in the files.
+PARTITIONING = pa.schema([('season', pa.string()), ('team_id', pa.int64())])
+SCHEMAS = {
+    'player_game_stats': pa.schema(
+        [
+            ('game_id', pa.string()),
+            ('player_id', pa.int64()),
+            ('game_date', pa.date32()),
+            ('matchup', pa.string()),
+            ('minutes', pa.float32()),
+            ('pts', pa.int16()),
+            ('reb', pa.int16()),
+            ('ast', pa.int16()),
+            ('stl', pa.int16()),
+            ('blk', pa.int16()),
+            ('tov', pa.int16()),
+            ('fg_pct', pa.float32()),
+            ('fg3_pct', pa.float32()),
+            ('is_starter', pa.bool_()),
+        ]
+    ),
+    'team_game_stats': pa.schema(
+        [
+            ('game_id', pa.string()),
+            ('game_date', pa.date32()),
+            ('matchup', pa.string()),
+            ('wl', pa.string()),
+            ('pts', pa.int16()),
+            ('reb', pa.int16()),
+            ('ast', pa.int16()),
+            ('tov', pa.int16()),
+            ('fg_pct', pa.float32()),
+            ('fg3_pct', pa.float32()),
+            ('plus_minus', pa.float32()),
+        ]
+    ),
+}
+EXTENSIONS = {'arrow': 'arrow', 'parquet': 'parquet'}
+
+
+def to_arrow(table: str, df: pd.DataFrame) -> pa.Table:
+    """Cast a relational frame to the store's fixed schema so every partition unifies."""
+    schema = SCHEMAS[table]
+    columns = {}
+    for f in schema:
+        values = df[f.name] if f.name in df.columns else pd.Series(None, index=df.index, dtype='object')
+        if pa.types.is_integer(f.type):
+            values = pd.to_numeric(values, errors='coerce').astype(f'Int{f.type.bit_width}')
+        elif pa.types.is_floating(f.type):
+            values = pd.to_numeric(values, errors='coerce').astype('float32')
+        elif pa.types.is_date(f.type):
+            values = pd.to_datetime(values, errors='coerce').dt.date
+        elif pa.types.is_boolean(f.type):
+            values = values.astype('boolean')
+        else:
+            values = values.astype('string')
+        columns[f.name] = values
+    return pa.Table.from_pandas(pd.DataFrame(columns), schema=schema, preserve_index=False)
+
+
+class HistoryStore:
+    """Season/team partitioned columnar copy of the game-stat tables for multi-season reads.
+
+    `arrow` files are uncompressed Arrow IPC and are memory-mapped on read; `parquet` trades
+    that for smaller files.
+    """
+
+    def __init__(self, root: str | Path, fmt: str = 'arrow'):
+        if fmt not in EXTENSIONS:
+            raise ValueError(f'Unknown history format: {fmt}')
+        self.root = Path(root)
+        self.fmt = fmt
+
+    def partition_dir(self, table: str, season: str, team_id: int) -> Path:
+        return self.root / table / f'season={season}' / f'team_id={int(team_id)}'
+
+    def write_partition(self, table: str, season: str, team_id: int, df: pd.DataFrame) -> int:
+        """Replace one partition with `df` (an empty frame removes it); returns rows written."""
+        directory = self.partition_dir(table, season, team_id)
+        path = directory / f'part-0.{EXTENSIONS[self.fmt]}'
+        if df.empty:
+            path.unlink(missing_ok=True)
+            return 0
+        directory.mkdir(parents=True, exist_ok=True)
+        data = to_arrow(table, df)
+        tmp = path.with_name(f'.{path.name}.{os.getpid()}.tmp')
+        if self.fmt == 'arrow':
+            with pa.OSFile(str(tmp), 'wb') as sink, pa.ipc.new_file(sink, data.schema) as writer:
+                writer.write_table(data)
+        else:
+            pq.write_table(data, tmp, compression='zstd')
+        # Readers holding a mapping of the old file keep it; new readers see the new one.
+        tmp.replace(path)
+        return data.num_rows
+
+    def dataset(self, table: str) -> ds.Dataset | None:
+        base = self.root / table
+        if not base.exists():
+            return None
+        return ds.dataset(
+            str(base),
+            schema=pa.unify_schemas([SCHEMAS[table], PARTITIONING]),
+            format='ipc' if self.fmt == 'arrow' else 'parquet',
+            partitioning=ds.partitioning(PARTITIONING, flavor='hive'),
+            filesystem=fs.LocalFileSystem(use_mmap=self.fmt == 'arrow'),
+        )
+
+    def read(
+        self,
+        table: str,
+        columns: list[str] | None = None,
+        seasons: list[str] | None = None,
+        team_ids: list[int] | None = None,
+        where: pc.Expression | None = None,
+    ) -> pa.Table:
+        """Columns of `table` for the given seasons/teams; those filters prune whole partitions."""
+        schema = pa.unify_schemas([SCHEMAS[table], PARTITIONING])
+        columns = columns or schema.names
+        dataset = self.dataset(table)
+        if dataset is None:
+            return schema.empty_table().select(columns)
+        expr = where
+        for name, values in (('season', seasons), ('team_id', team_ids)):
+            if values:
+                cond = pc.field(name).isin(values)
+                expr = cond if expr is None else expr & cond
+        return dataset.to_table(columns=columns, filter=expr)
+
+
+def history_store() -> HistoryStore:
+    settings = get_settings()
+    return HistoryStore(settings.history_dir, settings.history_format)
+
+
+def read_history(store: HistoryStore, table: str, name: str = 'adhoc', **kwargs) -> pa.Table:
+    """`HistoryStore.read`, timed and counted like relational reads in `db.query`."""
+    with METRICS.span('history_query', query=name):
+        data = store.read(table, **kwargs)
+    METRICS.inc('history_rows_read_total', data.num_rows, query=name)
+    return data
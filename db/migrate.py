@@ -0,0 +1,132 @@
+import hashlib
+import logging
+import re
+from dataclasses import dataclass
+from pathlib import Path
+
+from sqlalchemy import text
+from sqlalchemy.engine import Connection, Engine
+
+from db.database import get_engine
+
+LOGGER = logging.getLogger(__name__)
+
+MIGRATIONS_DIR = Path(__file__).with_name('migrations')
+FILENAME = re.compile(r'^(?P<version>\d{4})_(?P<name>[a-z0-9_]+?)(?:\.(?P<backend>sqlite|postgres))?\.sql$')
+BACKENDS = {'sqlite': 'sqlite', 'postgresql': 'postgres'}
+PG_LOCK_ID = 7_210_331  # arbitrary, shared by every process migrating this database
+
+TRACKING_DDL = """
+CREATE TABLE IF NOT EXISTS schema_migrations (
+    version INTEGER PRIMARY KEY,
+    name TEXT NOT NULL,
+    checksum TEXT NOT NULL,
+    applied_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+)
+"""
+
+
+class MigrationError(RuntimeError):
+    pass
+
+
+@dataclass(frozen=True)
+class Migration:
+    version: int
+    name: str
+    path: Path
+
+    @property
+    def sql(self) -> str:
+        return self.path.read_text(encoding='utf-8')
+
+    @property
+    def checksum(self) -> str:
+        return hashlib.sha256(self.sql.encode('utf-8')).hexdigest()[:16]
+
+
+def discover(backend: str, directory: Path = MIGRATIONS_DIR) -> list[Migration]:
+    """Migrations for `backend` ('sqlite' or 'postgres') in version order.
+
+    `NNNN_name.sql` applies everywhere; `NNNN_name.<backend>.sql` replaces it for one backend.
+    """
+    chosen: dict[int, tuple[bool, Migration]] = {}
+    for path in sorted(directory.glob('*.sql')):
+        match = FILENAME.match(path.name)
+        if not match:
+            raise MigrationError(f'Unrecognised migration file name: {path.name}')
+        if match['backend'] and match['backend'] != backend:
+            continue
+        version, specific = int(match['version']), bool(match['backend'])
+        migration = Migration(version, match['name'], path)
+        if version in chosen:
+            other_specific, other = chosen[version]
+            if other.name != migration.name or other_specific == specific:
+                raise MigrationError(f'Conflicting migrations for version {version}: {other.path.name}, {path.name}')
+            if other_specific:
+                continue
+        chosen[version] = (specific, migration)
+    return [m for _, (_, m) in sorted(chosen.items())]
+
+
+def split_statements(sql: str) -> list[str]:
+    body = '\n'.join(line for line in sql.splitlines() if not line.strip().startswith('--'))
+    return [s.strip() for s in body.split(';') if s.strip()]
+
+
+def _apply(conn: Connection, migration: Migration) -> None:
+    if conn.dialect.name == 'sqlite':
+        for stmt in split_statements(migration.sql):
+            conn.exec_driver_sql(stmt)
+    else:
+        conn.exec_driver_sql(migration.sql)
+    conn.execute(
+        text('INSERT INTO schema_migrations (version, name, checksum) VALUES (:version, :name, :checksum)'),
+        {'version': migration.version, 'name': migration.name, 'checksum': migration.checksum},
+    )
+
+
+def applied_migrations(conn: Connection) -> dict[int, tuple[str, str]]:
+    conn.exec_driver_sql(TRACKING_DDL)
+    rows = conn.execute(text('SELECT version, name, checksum FROM schema_migrations')).fetchall()
+    return {int(r[0]): (r[1], r[2]) for r in rows}
+
+
+def pending_migrations(engine: Engine | None = None, directory: Path = MIGRATIONS_DIR) -> list[Migration]:
+    engine = engine or get_engine()
+    with engine.begin() as conn:
+        applied = applied_migrations(conn)
+    backend = BACKENDS.get(engine.dialect.name, engine.dialect.name)
+    return [m for m in discover(backend, directory) if m.version not in applied]
+
+
+def migrate(engine: Engine | None = None, target: int | None = None, directory: Path = MIGRATIONS_DIR) -> list[Migration]:
+    """Apply pending migrations up to `target`, each in its own transaction; returns those applied.
+
+    A changed file for an already-applied version is an error: ship a new migration instead.
+    """
+    engine = engine or get_engine()
+    backend = BACKENDS.get(engine.dialect.name, engine.dialect.name)
+    done = []
+    with engine.connect() as lock_conn:
+        if backend == 'postgres':
+            lock_conn.execute(text('SELECT pg_advisory_lock(:id)'), {'id': PG_LOCK_ID})
+        try:
+            with engine.begin() as conn:
+                applied = applied_migrations(conn)
+            for migration in discover(backend, directory):
+                if target is not None and migration.version > target:
+                    break
+                if migration.version in applied:
+                    name, checksum = applied[migration.version]
+                    if checksum != migration.checksum:
+                        raise MigrationError(f'Migration {migration.version}_{name} was modified after it was applied')
+                    continue
+                with engine.begin() as conn:
+                    _apply(conn, migration)
+                LOGGER.info('Applied migration %04d_%s', migration.version, migration.name)
+                done.append(migration)
+        finally:
+            if backend == 'postgres':
+                lock_conn.execute(text('SELECT pg_advisory_unlock(:id)'), {'id': PG_LOCK_ID})
+    return done
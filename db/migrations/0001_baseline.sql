@@ -85,3 +85,61 @@ CREATE INDEX IF NOT EXISTS idx_schedule_teams ON schedule(home_team_id, away_tea
 CREATE INDEX IF NOT EXISTS idx_team_stats_team_date ON team_game_stats(team_id, game_date);
 CREATE INDEX IF NOT EXISTS idx_player_stats_player_game ON player_game_stats(player_id, game_id);
 CREATE INDEX IF NOT EXISTS idx_lineups_team_game ON lineups(team_id, game_id);
+
+CREATE TABLE IF NOT EXISTS data_versions (
+    table_name TEXT PRIMARY KEY,
+    version INTEGER NOT NULL DEFAULT 0,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE TABLE IF NOT EXISTS etl_watermarks (
+    stage TEXT NOT NULL,
+    entity_id INTEGER NOT NULL,
+    watermark TEXT NOT NULL,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    PRIMARY KEY (stage, entity_id)
+);
+
+CREATE TABLE IF NOT EXISTS player_stat_totals (
+    player_id INTEGER NOT NULL,
+    game_seq INTEGER NOT NULL,
+    game_id TEXT NOT NULL,
+    game_date DATE,
+    season TEXT,
+    gp INTEGER NOT NULL,
+    minutes_sum FLOAT,
+    pts_sum INTEGER,
+    reb_sum INTEGER,
+    ast_sum INTEGER,
+    stl_sum INTEGER,
+    blk_sum INTEGER,
+    tov_sum INTEGER,
+    fg_pct_sum FLOAT,
+    fg3_pct_sum FLOAT,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    PRIMARY KEY (player_id, game_seq)
+);
+
+CREATE TABLE IF NOT EXISTS team_stat_totals (
+    team_id INTEGER NOT NULL,
+    game_seq INTEGER NOT NULL,
+    game_id TEXT NOT NULL,
+    game_date DATE,
+    season TEXT,
+    gp INTEGER NOT NULL,
+    win_sum INTEGER,
+    pts_sum INTEGER,
+    reb_sum INTEGER,
+    ast_sum INTEGER,
+    tov_sum INTEGER,
+    fg_pct_sum FLOAT,
+    fg3_pct_sum FLOAT,
+    plus_minus_sum FLOAT,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    PRIMARY KEY (team_id, game_seq)
+);
+
+CREATE INDEX IF NOT EXISTS idx_player_totals_game ON player_stat_totals(player_id, game_id);
+CREATE INDEX IF NOT EXISTS idx_player_totals_season ON player_stat_totals(player_id, season, game_seq);
+CREATE INDEX IF NOT EXISTS idx_team_totals_game ON team_stat_totals(team_id, game_id);
+CREATE INDEX IF NOT EXISTS idx_team_totals_season ON team_stat_totals(team_id, season, game_seq);
@@ -0,0 +1,11 @@
+-- latest_lineup: newest lineup per team without sorting the team's lineup history.
+CREATE INDEX IF NOT EXISTS idx_lineups_team_updated ON lineups(team_id, updated_at);
+
+-- Lineup inference and roster-wide reads walk a team's player logs by date.
+CREATE INDEX IF NOT EXISTS idx_player_stats_team_date ON player_game_stats(team_id, game_date, game_id);
+
+-- player_log orders one player's games by date; (player_id, game_id) could not serve the ORDER BY.
+CREATE INDEX IF NOT EXISTS idx_player_stats_player_date ON player_game_stats(player_id, game_date);
+
+-- scheduled_players filters players by the scheduled teams.
+CREATE INDEX IF NOT EXISTS idx_players_team ON players(team_id);
@@ -0,0 +1,26 @@
+-- Minutes become decimal minutes, weight pounds, and height gains an inches column.
+-- Legacy 'MM:SS' minutes are converted; unparseable values become NULL.
+ALTER TABLE player_game_stats ALTER COLUMN minutes TYPE FLOAT USING (
+    CASE
+        WHEN minutes ~ '^\s*[0-9]+:[0-9]+\s*$' THEN ROUND((
+            SPLIT_PART(TRIM(minutes), ':', 1)::numeric + SPLIT_PART(TRIM(minutes), ':', 2)::numeric / 60), 2)::float
+        WHEN minutes ~ '^\s*[0-9]+(\.[0-9]+)?\s*$' THEN TRIM(minutes)::float
+    END
+);
+
+ALTER TABLE lineups ALTER COLUMN minutes TYPE FLOAT USING (
+    CASE
+        WHEN minutes ~ '^\s*[0-9]+:[0-9]+\s*$' THEN ROUND((
+            SPLIT_PART(TRIM(minutes), ':', 1)::numeric + SPLIT_PART(TRIM(minutes), ':', 2)::numeric / 60), 2)::float
+        WHEN minutes ~ '^\s*[0-9]+(\.[0-9]+)?\s*$' THEN TRIM(minutes)::float
+    END
+);
+
+ALTER TABLE players ALTER COLUMN weight TYPE INTEGER USING (
+    CASE WHEN weight ~ '^\s*[0-9]+\s*$' THEN TRIM(weight)::integer END
+);
+
+ALTER TABLE players ADD COLUMN IF NOT EXISTS height_inches INTEGER;
+UPDATE players
+SET height_inches = SPLIT_PART(height, '-', 1)::integer * 12 + SPLIT_PART(height, '-', 2)::integer
+WHERE height ~ '^[0-9]+-[0-9]+$';
@@ -0,0 +1,99 @@
+-- Minutes become decimal minutes (REAL), weight pounds (INTEGER), and height gains an inches column.
+-- SQLite cannot change a column's type in place, so each table is rebuilt and its indexes recreated.
+-- Legacy 'MM:SS' minutes are converted; unparseable values become NULL.
+
+CREATE TABLE player_game_stats_new (
+    game_id TEXT NOT NULL,
+    player_id INTEGER NOT NULL,
+    team_id INTEGER,
+    game_date DATE,
+    matchup TEXT,
+    minutes REAL,
+    pts INTEGER,
+    reb INTEGER,
+    ast INTEGER,
+    stl INTEGER,
+    blk INTEGER,
+    tov INTEGER,
+    fg_pct FLOAT,
+    fg3_pct FLOAT,
+    is_starter BOOLEAN,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    PRIMARY KEY (game_id, player_id),
+    FOREIGN KEY(player_id) REFERENCES players(player_id),
+    FOREIGN KEY(team_id) REFERENCES teams(team_id)
+);
+
+INSERT INTO player_game_stats_new
+SELECT game_id, player_id, team_id, game_date, matchup,
+       CASE
+           WHEN minutes IS NULL OR TRIM(minutes) = '' THEN NULL
+           WHEN INSTR(minutes, ':') > 0 THEN ROUND(
+               CAST(SUBSTR(minutes, 1, INSTR(minutes, ':') - 1) AS REAL)
+               + CAST(SUBSTR(minutes, INSTR(minutes, ':') + 1) AS REAL) / 60, 2)
+           WHEN TRIM(minutes) GLOB '[0-9]*' THEN CAST(minutes AS REAL)
+       END,
+       pts, reb, ast, stl, blk, tov, fg_pct, fg3_pct, is_starter, updated_at
+FROM player_game_stats;
+
+DROP TABLE player_game_stats;
+ALTER TABLE player_game_stats_new RENAME TO player_game_stats;
+CREATE INDEX IF NOT EXISTS idx_player_stats_player_game ON player_game_stats(player_id, game_id);
+CREATE INDEX IF NOT EXISTS idx_player_stats_team_date ON player_game_stats(team_id, game_date, game_id);
+CREATE INDEX IF NOT EXISTS idx_player_stats_player_date ON player_game_stats(player_id, game_date);
+
+CREATE TABLE lineups_new (
+    game_id TEXT NOT NULL,
+    team_id INTEGER NOT NULL,
+    player_id INTEGER NOT NULL,
+    is_starter BOOLEAN DEFAULT FALSE,
+    minutes REAL,
+    lineup_source TEXT,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    PRIMARY KEY (game_id, team_id, player_id),
+    FOREIGN KEY(team_id) REFERENCES teams(team_id),
+    FOREIGN KEY(player_id) REFERENCES players(player_id)
+);
+
+INSERT INTO lineups_new
+SELECT game_id, team_id, player_id, is_starter,
+       CASE
+           WHEN minutes IS NULL OR TRIM(minutes) = '' THEN NULL
+           WHEN INSTR(minutes, ':') > 0 THEN ROUND(
+               CAST(SUBSTR(minutes, 1, INSTR(minutes, ':') - 1) AS REAL)
+               + CAST(SUBSTR(minutes, INSTR(minutes, ':') + 1) AS REAL) / 60, 2)
+           WHEN TRIM(minutes) GLOB '[0-9]*' THEN CAST(minutes AS REAL)
+       END,
+       lineup_source, updated_at
+FROM lineups;
+
+DROP TABLE lineups;
+ALTER TABLE lineups_new RENAME TO lineups;
+CREATE INDEX IF NOT EXISTS idx_lineups_team_game ON lineups(team_id, game_id);
+CREATE INDEX IF NOT EXISTS idx_lineups_team_updated ON lineups(team_id, updated_at);
+
+CREATE TABLE players_new (
+    player_id INTEGER PRIMARY KEY,
+    full_name TEXT NOT NULL,
+    team_id INTEGER,
+    position TEXT,
+    height TEXT,
+    height_inches INTEGER,
+    weight INTEGER,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    FOREIGN KEY(team_id) REFERENCES teams(team_id)
+);
+
+INSERT INTO players_new
+SELECT player_id, full_name, team_id, position, height,
+       CASE WHEN height GLOB '[0-9]*-[0-9]*' THEN
+           CAST(SUBSTR(height, 1, INSTR(height, '-') - 1) AS INTEGER) * 12
+           + CAST(SUBSTR(height, INSTR(height, '-') + 1) AS INTEGER)
+       END,
+       CASE WHEN TRIM(weight) GLOB '[0-9]*' THEN CAST(weight AS INTEGER) END,
+       updated_at
+FROM players;
+
+DROP TABLE players;
+ALTER TABLE players_new RENAME TO players;
+CREATE INDEX IF NOT EXISTS idx_players_team ON players(team_id);
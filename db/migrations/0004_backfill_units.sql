@@ -0,0 +1,14 @@
+-- Checkpoints for scripts/backfill.py: one row per season x team unit (team_id 0 = whole league).
+CREATE TABLE IF NOT EXISTS backfill_units (
+    season TEXT NOT NULL,
+    team_id INTEGER NOT NULL,
+    status TEXT NOT NULL DEFAULT 'pending',
+    attempts INTEGER NOT NULL DEFAULT 0,
+    team_rows INTEGER,
+    player_rows INTEGER,
+    error TEXT,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    PRIMARY KEY (season, team_id)
+);
+
+CREATE INDEX IF NOT EXISTS idx_backfill_units_status ON backfill_units(status, season);
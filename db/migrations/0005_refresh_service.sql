@@ -0,0 +1,29 @@
+-- Refresh queue and status for etl/refresh.py: the dashboard enqueues and polls, one worker runs.
+CREATE TABLE IF NOT EXISTS refresh_runs (
+    run_id TEXT PRIMARY KEY,
+    kind TEXT NOT NULL,
+    requested_by TEXT,
+    status TEXT NOT NULL DEFAULT 'queued',
+    requested_at TIMESTAMP NOT NULL,
+    started_at TIMESTAMP,
+    finished_at TIMESTAMP,
+    current_stage TEXT,
+    stages_done INTEGER NOT NULL DEFAULT 0,
+    stages_total INTEGER,
+    rows_written INTEGER,
+    error TEXT,
+    report TEXT
+);
+
+CREATE INDEX IF NOT EXISTS idx_refresh_runs_status ON refresh_runs(status, requested_at);
+CREATE INDEX IF NOT EXISTS idx_refresh_runs_requested ON refresh_runs(requested_at);
+
+-- One row per singleton worker; the holder renews expires_at while it is alive.
+CREATE TABLE IF NOT EXISTS service_leases (
+    name TEXT PRIMARY KEY,
+    owner TEXT,
+    heartbeat_at TIMESTAMP,
+    expires_at TIMESTAMP
+);
+
+INSERT INTO service_leases (name) VALUES ('refresh') ON CONFLICT (name) DO NOTHING;
@@ -0,0 +1,18 @@
+-- Precomputed one-to-one starter matchups per scheduled game, written by the matchups stage.
+CREATE TABLE IF NOT EXISTS matchups (
+    game_id TEXT NOT NULL,
+    slot INTEGER NOT NULL,
+    position TEXT,
+    home_team_id INTEGER NOT NULL,
+    away_team_id INTEGER NOT NULL,
+    home_player_id INTEGER,
+    away_player_id INTEGER,
+    score REAL,
+    position_fit REAL,
+    size_fit REAL,
+    minutes_fit REAL,
+    form_fit REAL,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    PRIMARY KEY (game_id, slot),
+    FOREIGN KEY(game_id) REFERENCES schedule(game_id)
+);
@@ -0,0 +1,7 @@
+-- Content hash of each row's business columns, so upserts can skip rows that did not change.
+ALTER TABLE teams ADD COLUMN row_hash BIGINT;
+ALTER TABLE players ADD COLUMN row_hash BIGINT;
+ALTER TABLE schedule ADD COLUMN row_hash BIGINT;
+ALTER TABLE team_game_stats ADD COLUMN row_hash BIGINT;
+ALTER TABLE player_game_stats ADD COLUMN row_hash BIGINT;
+ALTER TABLE lineups ADD COLUMN row_hash BIGINT;
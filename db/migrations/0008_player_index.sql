@@ -0,0 +1,16 @@
+-- One row per player ever loaded (rosters and game logs), rebuilt by the player_index stage for dashboard search.
+CREATE TABLE IF NOT EXISTS player_index (
+    player_id INTEGER PRIMARY KEY,
+    full_name TEXT NOT NULL,
+    search_name TEXT NOT NULL,
+    team_id INTEGER,
+    team_abbreviation TEXT,
+    position TEXT,
+    games INTEGER NOT NULL DEFAULT 0,
+    first_game_date DATE,
+    last_game_date DATE,
+    row_hash BIGINT,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE INDEX IF NOT EXISTS idx_player_index_search_name ON player_index(search_name);
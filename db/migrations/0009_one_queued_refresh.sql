@@ -0,0 +1,7 @@
+-- At most one queued refresh: concurrent requests insert with ON CONFLICT DO NOTHING and share that run.
+-- Fold duplicates left by the earlier check-then-insert enqueue into the oldest queued run first.
+UPDATE refresh_runs SET status = 'merged', finished_at = CURRENT_TIMESTAMP
+WHERE status = 'queued'
+  AND run_id <> (SELECT run_id FROM refresh_runs WHERE status = 'queued' ORDER BY requested_at, run_id LIMIT 1);
+
+CREATE UNIQUE INDEX IF NOT EXISTS idx_refresh_runs_one_queued ON refresh_runs(status) WHERE status = 'queued';
@@ -0,0 +1,36 @@
+from functools import lru_cache
+from typing import Any
+
+import pandas as pd
+from sqlalchemy import text
+from sqlalchemy.engine import Engine
+from sqlalchemy.sql.elements import TextClause
+
+from app.metrics import METRICS
+from db.database import get_engine
+
+
+@lru_cache(maxsize=256)
+def statement(sql: str) -> TextClause:
+    """Parse `sql` once; SQLAlchemy then reuses its compiled form from the engine's cache."""
+    return text(sql)
+
+
+def read_df(sql: str, params: dict[str, Any] | None = None, name: str = 'adhoc', dtype: dict[str, str] | None = None) -> pd.DataFrame:
+    """Run `sql` into a DataFrame; `dtype` narrows columns (e.g. 'Int16', 'float32') as they are read."""
+    with METRICS.span('db_query', query=name), get_engine().connect() as conn:
+        df = pd.read_sql(statement(sql), conn, params=params or {}, dtype=dtype)
+    METRICS.inc('db_rows_read_total', len(df), query=name)
+    return df
+
+
+def fetch_all(sql: str, params: dict[str, Any] | None = None, name: str = 'adhoc', engine: Engine | None = None) -> list:
+    with METRICS.span('db_query', query=name), (engine or get_engine()).connect() as conn:
+        rows = conn.execute(statement(sql), params or {}).fetchall()
+    METRICS.inc('db_rows_read_total', len(rows), query=name)
+    return rows
+
+
+def execute(sql: str, params: dict[str, Any] | list[dict[str, Any]] | None = None) -> None:
+    with get_engine().begin() as conn:
+        conn.execute(statement(sql), params or {})
@@ -0,0 +1,112 @@
+import json
+import uuid
+from datetime import datetime, timedelta
+
+from db.database import get_engine, live_url
+from db.query import fetch_all, statement
+
+LEASE = 'refresh'
+RUN_COLUMNS = [
+    'run_id', 'kind', 'requested_by', 'status', 'requested_at', 'started_at', 'finished_at',
+    'current_stage', 'stages_done', 'stages_total', 'rows_written', 'error',
+]
+
+QUEUED_SQL = "SELECT run_id FROM refresh_runs WHERE status = 'queued' ORDER BY requested_at LIMIT 1"
+# idx_refresh_runs_one_queued admits one queued run, so a request racing another one inserts nothing.
+ENQUEUE_SQL = (
+    "INSERT INTO refresh_runs (run_id, kind, requested_by, status, requested_at) VALUES (:run_id, :kind, :requested_by, 'queued', :now) "
+    'ON CONFLICT DO NOTHING'
+)
+CLAIM_SQL = "UPDATE refresh_runs SET status = 'running', started_at = :now WHERE run_id = :run_id AND status = 'queued'"
+PROGRESS_SQL = 'UPDATE refresh_runs SET current_stage = :stage, stages_done = :done, stages_total = :total WHERE run_id = :run_id'
+FINISH_SQL = (
+    'UPDATE refresh_runs SET status = :status, finished_at = :now, current_stage = NULL, rows_written = :rows, '
+    'error = :error, report = :report WHERE run_id = :run_id'
+)
+ORPHANS_SQL = "UPDATE refresh_runs SET status = 'failed', finished_at = :now, error = :error WHERE status = 'running'"
+RECENT_RUNS_SQL = f"SELECT {', '.join(RUN_COLUMNS)} FROM refresh_runs ORDER BY requested_at DESC LIMIT :limit"
+LEASE_SQL = 'SELECT owner, heartbeat_at, expires_at FROM service_leases WHERE name = :name'
+ACQUIRE_SQL = (
+    'UPDATE service_leases SET owner = :owner, heartbeat_at = :now, expires_at = :expires '
+    'WHERE name = :name AND (owner IS NULL OR owner = :owner OR expires_at < :now)'
+)
+RELEASE_SQL = 'UPDATE service_leases SET owner = NULL, expires_at = NULL WHERE name = :name AND owner = :owner'
+
+
+def _live():
+    # The queue and lease are never read from a snapshot: requests and progress must be current.
+    return get_engine(live_url())
+
+
+def _now() -> str:
+    return datetime.utcnow().isoformat()
+
+
+def request_refresh(kind: str = 'manual', requested_by: str | None = None) -> str:
+    """Queue a refresh unless one is already waiting; returns the id of the queued run."""
+    with _live().begin() as conn:
+        params = {'run_id': uuid.uuid4().hex, 'kind': kind, 'requested_by': requested_by, 'now': _now()}
+        if conn.execute(statement(ENQUEUE_SQL), params).rowcount == 1:
+            return params['run_id']
+        return str(conn.execute(statement(QUEUED_SQL)).scalar())
+
+
+def claim_next() -> str | None:
+    """Mark the queued run as running; requests made from now on queue the next one."""
+    with _live().begin() as conn:
+        run_id = conn.execute(statement(QUEUED_SQL)).scalar()
+        if run_id is None:
+            return None
+        if conn.execute(statement(CLAIM_SQL), {'run_id': run_id, 'now': _now()}).rowcount != 1:
+            return None
+    return str(run_id)
+
+
+def record_progress(run_id: str, stage: str | None, done: int, total: int) -> None:
+    with _live().begin() as conn:
+        conn.execute(statement(PROGRESS_SQL), {'run_id': run_id, 'stage': stage, 'done': done, 'total': total})
+
+
+def finish_run(run_id: str, status: str, rows: int = 0, error: str | None = None, report: dict | None = None) -> None:
+    params = {'run_id': run_id, 'status': status, 'now': _now(), 'rows': rows, 'error': error, 'report': json.dumps(report) if report else None}
+    with _live().begin() as conn:
+        conn.execute(statement(FINISH_SQL), params)
+
+
+def fail_orphaned_runs(error: str = 'refresh worker stopped mid-run') -> int:
+    """Close runs left 'running' by a worker that died; call only while holding the lease."""
+    with _live().begin() as conn:
+        return conn.execute(statement(ORPHANS_SQL), {'now': _now(), 'error': error}).rowcount
+
+
+def recent_runs(limit: int = 10) -> list[dict]:
+    rows = fetch_all(RECENT_RUNS_SQL, {'limit': limit}, name='refresh_runs', engine=_live())
+    return [dict(zip(RUN_COLUMNS, row)) for row in rows]
+
+
+def acquire_lease(owner: str, ttl_seconds: float, name: str = LEASE) -> bool:
+    """Take or renew the singleton lease `name`; False while another live owner holds it."""
+    now = datetime.utcnow()
+    params = {'name': name, 'owner': owner, 'now': now.isoformat(), 'expires': (now + timedelta(seconds=ttl_seconds)).isoformat()}
+    with _live().begin() as conn:
+        return conn.execute(statement(ACQUIRE_SQL), params).rowcount == 1
+
+
+def release_lease(owner: str, name: str = LEASE) -> None:
+    with _live().begin() as conn:
+        conn.execute(statement(RELEASE_SQL), {'name': name, 'owner': owner})
+
+
+def refresh_status(limit: int = 5) -> dict:
+    """What the dashboard polls: the running and queued runs, the last finished one and worker liveness."""
+    runs = recent_runs(limit)
+    lease = fetch_all(LEASE_SQL, {'name': LEASE}, name='refresh_lease', engine=_live())
+    owner, heartbeat_at, expires_at = lease[0] if lease else (None, None, None)
+    alive = owner is not None and expires_at is not None and datetime.fromisoformat(str(expires_at)) > datetime.utcnow()
+    return {
+        'running': next((r for r in runs if r['status'] == 'running'), None),
+        'queued': next((r for r in runs if r['status'] == 'queued'), None),
+        'last': next((r for r in runs if r['status'] in ('ok', 'failed')), None),
+        'worker': owner if alive else None,
+        'heartbeat_at': heartbeat_at,
+    }
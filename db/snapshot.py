@@ -0,0 +1,125 @@
+import logging
+import os
+import sqlite3
+import time
+from dataclasses import dataclass
+from datetime import datetime
+from pathlib import Path
+
+from sqlalchemy import text
+
+from app.config import Settings, get_settings
+from app.metrics import METRICS
+from db.database import SNAPSHOT_POINTER, get_engine, live_url, snapshot_dir
+
+LOGGER = logging.getLogger(__name__)
+
+# A snapshot missing either of these would render an empty dashboard; keep serving the old one.
+REQUIRED_TABLES = ('teams', 'schedule')
+# What the dashboard reads. The refresh queue and lease stay live so requests and progress are never stale.
+SNAPSHOT_TABLES = (
+    'teams', 'players', 'schedule', 'team_game_stats', 'player_game_stats', 'lineups',
+    'player_stat_totals', 'team_stat_totals', 'matchups', 'player_index', 'data_versions',
+)
+LIVE_SCHEMA = 'public'
+
+
+class SnapshotError(RuntimeError):
+    pass
+
+
+@dataclass
+class SnapshotResult:
+    name: str
+    seconds: float
+
+
+def _validate_sqlite(conn: sqlite3.Connection) -> None:
+    check = conn.execute('PRAGMA quick_check').fetchone()[0]
+    if check != 'ok':
+        raise SnapshotError(f'snapshot failed quick_check: {check}')
+    for table in REQUIRED_TABLES:
+        if conn.execute(f'SELECT 1 FROM {table} LIMIT 1').fetchone() is None:
+            raise SnapshotError(f'snapshot has no rows in {table}')
+
+
+def _prune(directory: Path, current: str, keep: int) -> None:
+    # Older snapshots are kept for a while so a reader still on one finishes undisturbed.
+    snapshots = sorted(p.name for p in directory.glob('*.db'))
+    stale = [name for name in snapshots[:-max(keep, 1)] if name != current]
+    stale += [p.name for p in directory.glob('*.building')]  # left by a publish that crashed
+    for name in stale:
+        for path in (directory / name, directory / f'{name}-wal', directory / f'{name}-shm'):
+            try:
+                path.unlink(missing_ok=True)
+            except OSError:
+                LOGGER.warning('Could not remove old snapshot file %s', path)
+
+
+def _publish_sqlite(settings: Settings) -> str:
+    live = Path(settings.sqlite_path)
+    directory = snapshot_dir(settings)
+    directory.mkdir(parents=True, exist_ok=True)
+    name = f'{live.stem}.{datetime.utcnow():%Y%m%dT%H%M%S%f}.db'
+    shadow = directory / f'{name}.building'
+    source, target = sqlite3.connect(live), sqlite3.connect(shadow)
+    try:
+        # The backup API copies a consistent point-in-time image even while others read the live file.
+        source.backup(target)
+        _validate_sqlite(target)
+    except Exception:
+        target.close()
+        shadow.unlink(missing_ok=True)
+        raise
+    finally:
+        source.close()
+    target.close()
+    os.replace(shadow, directory / name)
+    pointer = directory / f'{SNAPSHOT_POINTER}.tmp'
+    pointer.write_text(name)
+    os.replace(pointer, directory / SNAPSHOT_POINTER)
+    _prune(directory, name, settings.db_snapshot_keep)
+    return name
+
+
+def _publish_postgres(settings: Settings) -> str:
+    schema = settings.db_snapshot_schema
+    staging, retired = f'{schema}_next', f'{schema}_old'
+    engine = get_engine(live_url())
+    with engine.begin() as conn:
+        conn.execute(text(f'DROP SCHEMA IF EXISTS {staging} CASCADE'))
+        conn.execute(text(f'CREATE SCHEMA {staging}'))
+        for table in SNAPSHOT_TABLES:
+            conn.execute(text(f'CREATE TABLE {staging}.{table} (LIKE {LIVE_SCHEMA}.{table} INCLUDING ALL)'))
+            conn.execute(text(f'INSERT INTO {staging}.{table} SELECT * FROM {LIVE_SCHEMA}.{table}'))
+            conn.execute(text(f'ANALYZE {staging}.{table}'))
+        for table in REQUIRED_TABLES:
+            if conn.execute(text(f'SELECT 1 FROM {staging}.{table} LIMIT 1')).first() is None:
+                raise SnapshotError(f'snapshot has no rows in {table}')
+    # Renames only touch the catalog, so readers switch schemas at commit without waiting on table locks.
+    with engine.begin() as conn:
+        conn.execute(text(f'DROP SCHEMA IF EXISTS {retired} CASCADE'))
+        if conn.execute(text('SELECT 1 FROM pg_namespace WHERE nspname = :schema'), {'schema': schema}).first():
+            conn.execute(text(f'ALTER SCHEMA {schema} RENAME TO {retired}'))
+        conn.execute(text(f'ALTER SCHEMA {staging} RENAME TO {schema}'))
+    with engine.begin() as conn:
+        conn.execute(text(f'DROP SCHEMA IF EXISTS {retired} CASCADE'))
+    return schema
+
+
+def publish_snapshot(settings: Settings | None = None) -> SnapshotResult:
+    """Copy the live database into a new snapshot, validate it and atomically make it the one readers use.
+
+    SQLite clones the file with the backup API and swaps the `snapshots/CURRENT` pointer; Postgres
+    copies the dashboard tables into a staging schema and renames it over the snapshot schema.
+    """
+    settings = settings or get_settings()
+    started = time.perf_counter()
+    with METRICS.span('db_snapshot_publish'):
+        if settings.db_backend.lower() == 'postgres':
+            name = _publish_postgres(settings)
+        else:
+            name = _publish_sqlite(settings)
+    result = SnapshotResult(name, time.perf_counter() - started)
+    LOGGER.info('Published snapshot %s in %.2fs', result.name, result.seconds)
+    return result
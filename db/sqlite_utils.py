@@ -1,17 +1,38 @@
 import sqlite3
-from typing import Iterable
+from itertools import islice
+from typing import Iterable, Iterator
 
 
-def upsert_sqlite_rows(conn: sqlite3.Connection, table: str, rows: list[dict], conflict_cols: list[str]) -> None:
-    if not rows:
-        return
-    cols = list(rows[0].keys())
+def upsert_sql(table: str, cols: list[str], conflict_cols: list[str], update: bool = True) -> str:
     placeholders = ', '.join(['?' for _ in cols])
-    update_cols = [c for c in cols if c not in conflict_cols]
+    update_cols = [c for c in cols if c not in conflict_cols] if update else []
     set_clause = ', '.join([f"{c}=excluded.{c}" for c in update_cols])
-    sql = (
+    action = f'DO UPDATE SET {set_clause}' if update_cols else 'DO NOTHING'
+    return (
         f"INSERT INTO {table} ({', '.join(cols)}) VALUES ({placeholders}) "
-        f"ON CONFLICT ({', '.join(conflict_cols)}) DO UPDATE SET {set_clause}"
+        f"ON CONFLICT ({', '.join(conflict_cols)}) {action}"
     )
-    conn.executemany(sql, [tuple(row[c] for c in cols) for row in rows])
-    conn.commit()
+
+
+def chunked(rows: Iterable, size: int) -> Iterator[list]:
+    it = iter(rows)
+    while chunk := list(islice(it, size)):
+        yield chunk
+
+
+def upsert_sqlite_rows(
+    conn: sqlite3.Connection,
+    table: str,
+    rows: list[dict],
+    conflict_cols: list[str],
+    chunk_size: int = 5000,
+    commit: bool = True,
+) -> None:
+    if not rows:
+        return
+    cols = list(rows[0].keys())
+    sql = upsert_sql(table, cols, conflict_cols)
+    for chunk in chunked((tuple(row[c] for c in cols) for row in rows), chunk_size):
+        conn.executemany(sql, chunk)
+    if commit:
+        conn.commit()
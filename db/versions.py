@@ -0,0 +1,23 @@
+from sqlalchemy.engine import Connection
+from sqlalchemy.exc import DBAPIError
+
+from db.query import fetch_all, statement
+
+BUMP_SQL = (
+    'INSERT INTO data_versions (table_name, version, updated_at) VALUES (:table_name, 1, :updated_at) '
+    'ON CONFLICT (table_name) DO UPDATE SET version = data_versions.version + 1, updated_at = excluded.updated_at'
+)
+
+
+def bump_version(conn: Connection, table: str, updated_at: str) -> None:
+    """Record a successful write to `table`; call inside the writing transaction."""
+    conn.execute(statement(BUMP_SQL), {'table_name': table, 'updated_at': updated_at})
+
+
+def load_versions() -> dict[str, tuple[int, str]] | None:
+    """Return {table: (version, updated_at)}, or None when the watermark table is unavailable."""
+    try:
+        rows = fetch_all('SELECT table_name, version, updated_at FROM data_versions', name='data_versions')
+    except DBAPIError:
+        return None
+    return {r[0]: (int(r[1]), str(r[2])) for r in rows}
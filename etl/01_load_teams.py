@@ -1,7 +1,9 @@
 from etl.common import fetch_teams, now_iso, upsert_rows, validate_non_empty
+from etl.pipeline import stage
 
 
-if __name__ == '__main__':
+@stage('teams')
+def run() -> int:
     teams = fetch_teams()
     validate_non_empty('teams', teams)
     rows = [
@@ -15,3 +17,8 @@ if __name__ == '__main__':
     ]
     upsert_rows('teams', rows, ['team_id'])
     print(f'Upserted {len(rows)} teams')
+    return len(rows)
+
+
+if __name__ == '__main__':
+    run()
@@ -1,31 +1,39 @@
-from etl.common import fetch_roster, now_iso, scheduled_team_ids, upsert_rows
+from db.query import fetch_all
+from etl.common import SCHEDULER, fetch_rosters, now_iso, scheduled_team_ids, upsert_rows
+from etl.pipeline import stage
+from etl.transforms import height_inches, whole_number
+from etl.watermarks import save_watermarks, stale_rosters
 
 
-if __name__ == '__main__':
+@stage('rosters', after=('teams', 'schedule'))
+def run() -> int:
     team_ids = scheduled_team_ids()
     if not team_ids:
         print('No scheduled teams yet; loading all teams from teams table')
-        from db.database import get_engine
-        from sqlalchemy import text
-
-        with get_engine().begin() as conn:
-            team_ids = [row[0] for row in conn.execute(text('SELECT team_id FROM teams')).fetchall()]
+        team_ids = [row[0] for row in fetch_all('SELECT team_id FROM teams', name='team_ids')]
 
-    total = 0
-    for team_id in team_ids:
-        roster = fetch_roster(team_id)
-        rows = [
+    team_ids = stale_rosters(team_ids)
+    rows = []
+    for roster in fetch_rosters(team_ids):
+        rows.extend(
             {
                 'player_id': int(r.PLAYER_ID),
                 'full_name': r.PLAYER,
                 'team_id': int(r.TEAM_ID),
                 'position': r.POSITION,
                 'height': r.HEIGHT,
-                'weight': str(r.WEIGHT),
+                'height_inches': height_inches(r.HEIGHT),
+                'weight': whole_number(r.WEIGHT),
                 'updated_at': now_iso(),
             }
             for r in roster.itertuples()
-        ]
-        upsert_rows('players', rows, ['player_id'])
-        total += len(rows)
+        )
+    total = upsert_rows('players', rows, ['player_id']).rows
+    save_watermarks('rosters', team_ids, now_iso())
     print(f'Upserted {total} players')
+    return total
+
+
+if __name__ == '__main__':
+    run()
+    SCHEDULER.log_summary()
@@ -1,11 +1,14 @@
-from datetime import date, timedelta
+from datetime import timedelta
 
-from etl.common import fetch_schedule_window, now_iso, upsert_rows, validate_non_empty
+from etl.common import SCHEDULER, SETTINGS, etl_today, fetch_schedule_window, now_iso, upsert_rows, validate_non_empty
+from etl.pipeline import stage
 
 
-if __name__ == '__main__':
-    start = date.today()
-    end = start + timedelta(days=7)
+@stage('schedule', after=('teams',))
+def run() -> int:
+    today = etl_today()
+    start = today - timedelta(days=SETTINGS.schedule_lookback_days)
+    end = today + timedelta(days=7)
     schedule = fetch_schedule_window(start, end)
     validate_non_empty('schedule', schedule)
 
@@ -22,3 +25,9 @@ if __name__ == '__main__':
     ]
     upsert_rows('schedule', rows, ['game_id'])
     print(f'Upserted {len(rows)} schedule rows')
+    return len(rows)
+
+
+if __name__ == '__main__':
+    run()
+    SCHEDULER.log_summary()
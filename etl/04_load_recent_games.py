@@ -1,16 +1,31 @@
-from etl.common import fetch_team_recent_games, now_iso, scheduled_team_ids, upsert_rows
-from etl.transforms import parse_team_game_row
+from functools import partial
 
+import pandas as pd
 
-if __name__ == '__main__':
-    total = 0
-    for team_id in scheduled_team_ids():
-        games = fetch_team_recent_games(team_id, last_n=5)
-        rows = []
-        for g in games.itertuples():
-            parsed = parse_team_game_row(g)
-            parsed['updated_at'] = now_iso()
-            rows.append(parsed)
-        upsert_rows('team_game_stats', rows, ['game_id', 'team_id'])
-        total += len(rows)
+from etl.common import SCHEDULER, SETTINGS, fetch_league_team_recent_games, fetch_team_recent_games, now_iso, scheduled_team_ids, upsert_rows
+from etl.pipeline import stage
+from etl.transforms import normalize_team_games
+from etl.watermarks import completed_through, past_stored_games, save_watermarks, stale_teams
+
+
+@stage('recent_games', after=('schedule',))
+def run() -> int:
+    team_ids = stale_teams(scheduled_team_ids())
+    if not team_ids:
+        print('No teams with new games since last run')
+        return 0
+
+    if SETTINGS.etl_bulk_ingest:
+        games = fetch_league_team_recent_games(team_ids, last_n=5)
+    else:
+        games = pd.concat(SCHEDULER.map(partial(fetch_team_recent_games, last_n=5), team_ids), ignore_index=True)
+    rows = normalize_team_games(games, updated_at=now_iso())
+    total = upsert_rows('team_game_stats', rows, ['game_id', 'team_id'], known_new=past_stored_games(rows, 'team_id')).rows
+    save_watermarks('recent_games', team_ids, completed_through())
     print(f'Upserted {total} team game rows')
+    return total
+
+
+if __name__ == '__main__':
+    run()
+    SCHEDULER.log_summary()
@@ -1,76 +1,61 @@
 import logging
+from functools import partial
 
 import pandas as pd
 
-from etl.common import fetch_player_games, now_iso, scheduled_players, upsert_rows
+from etl.common import SCHEDULER, SETTINGS, fetch_league_player_recent_games, fetch_player_games, now_iso, scheduled_players, upsert_rows
+from etl.pipeline import stage
+from etl.transforms import normalize_player_games
+from etl.watermarks import completed_through, past_stored_games, save_watermarks, stale_players
 
 LOGGER = logging.getLogger(__name__)
 logging.basicConfig(level=logging.INFO, format='%(asctime)s %(levelname)s %(message)s')
 
-BATCH_SIZE = 50
 
+def parse_player_game_rows(logs: pd.DataFrame, player_id: int | None = None) -> pd.DataFrame:
+    return normalize_player_games(logs, player_id, updated_at=now_iso())
 
-def parse_player_game_rows(logs: pd.DataFrame, player_id: int) -> list[dict]:
-    if logs.empty:
-        return []
 
-    normalized = logs.copy()
-    normalized.columns = [c.lower() for c in normalized.columns]
-    rows = []
-    for _, row in normalized.iterrows():
-        game_date = pd.to_datetime(row.get('game_date'), errors='coerce')
-        if pd.isna(game_date):
-            continue
-
-        start_position = str(row.get('start_position') or '').strip()
-        rows.append(
-            {
-                'game_id': str(row.get('game_id', '')),
-                'player_id': int(row.get('player_id') or player_id),
-                'team_id': int(row.get('team_id')) if pd.notna(row.get('team_id')) else None,
-                'game_date': game_date.date().isoformat(),
-                'matchup': row.get('matchup'),
-                'minutes': str(row.get('min', '')),
-                'pts': int(pd.to_numeric(row.get('pts'), errors='coerce') or 0),
-                'reb': int(pd.to_numeric(row.get('reb'), errors='coerce') or 0),
-                'ast': int(pd.to_numeric(row.get('ast'), errors='coerce') or 0),
-                'stl': int(pd.to_numeric(row.get('stl'), errors='coerce') or 0),
-                'blk': int(pd.to_numeric(row.get('blk'), errors='coerce') or 0),
-                'tov': int(pd.to_numeric(row.get('tov'), errors='coerce') or 0),
-                'fg_pct': float(pd.to_numeric(row.get('fg_pct'), errors='coerce') or 0.0),
-                'fg3_pct': float(pd.to_numeric(row.get('fg3_pct'), errors='coerce') or 0.0),
-                'is_starter': start_position != '',
-                'updated_at': now_iso(),
-            }
-        )
-
-    return [r for r in rows if r['game_id']]
-
-
-if __name__ == '__main__':
-    players = scheduled_players()
-    buffer: list[dict] = []
-    total = 0
+def load_bulk(players: list[int]) -> pd.DataFrame:
+    logs = fetch_league_player_recent_games(players, last_n=10)
+    rows = parse_player_game_rows(logs)
+    LOGGER.info('Parsed %s rows for %s players from league game log', len(rows), rows['player_id'].nunique())
+    return rows
 
-    for idx, player_id in enumerate(players, start=1):
-        if idx % 10 == 0:
-            LOGGER.info('Processed %s/%s players', idx, len(players))
 
-        try:
-            logs = fetch_player_games(player_id, last_n=10)
-            buffer.extend(parse_player_game_rows(logs, player_id))
-        except Exception as exc:
-            LOGGER.warning('Skipping player %s due to API/parse failure: %s', player_id, exc)
+def load_per_player(players: list[int]) -> tuple[pd.DataFrame, set[int]]:
+    results = SCHEDULER.map(partial(fetch_player_games, last_n=10), players, return_exceptions=True)
+    frames: list[pd.DataFrame] = []
+    failed: set[int] = set()
+    for player_id, logs in zip(players, results):
+        if isinstance(logs, Exception):
+            LOGGER.warning('Skipping player %s due to API failure: %s', player_id, logs)
+            failed.add(player_id)
             continue
+        if 'PLAYER_ID' not in logs.columns:
+            logs = logs.assign(PLAYER_ID=player_id)
+        frames.append(logs)
+    logs = pd.concat(frames, ignore_index=True) if frames else pd.DataFrame()
+    return parse_player_game_rows(logs), failed
+
+
+@stage('player_gamelogs', after=('rosters',))
+def run() -> int:
+    players = stale_players(scheduled_players())
+    if not players:
+        print('No players with new games since last run')
+        return 0
+
+    if SETTINGS.etl_bulk_ingest:
+        rows, failed = load_bulk(players), set()
+    else:
+        rows, failed = load_per_player(players)
+    total = upsert_rows('player_game_stats', rows, ['game_id', 'player_id'], known_new=past_stored_games(rows, 'player_id')).rows
+    save_watermarks('player_gamelogs', [p for p in players if p not in failed], completed_through())
+    print(f'Upserted {total} player game rows')
+    return total
 
-        if len(buffer) >= BATCH_SIZE:
-            upsert_rows('player_game_stats', buffer, ['game_id', 'player_id'])
-            total += len(buffer)
-            LOGGER.info('Upserted batch of %s rows (%s total)', len(buffer), total)
-            buffer = []
-
-    if buffer:
-        upsert_rows('player_game_stats', buffer, ['game_id', 'player_id'])
-        total += len(buffer)
 
-    print(f'Upserted {total} player game rows')
+if __name__ == '__main__':
+    run()
+    SCHEDULER.log_summary()
@@ -1,59 +1,67 @@
 import pandas as pd
-from sqlalchemy import text
 
-from db.database import get_engine
+from db.query import read_df
 from etl.common import now_iso, scheduled_team_ids, upsert_rows
+from etl.pipeline import stage
 
-
-def infer_lineup(team_id: int) -> tuple[str, list[dict]]:
-    engine = get_engine()
-    query = text(
-        """
-        SELECT pgs.game_id, pgs.player_id, pgs.minutes, pgs.is_starter,
-               pgs.game_date
+LINEUP_SQL = """
+WITH scheduled AS (
+    SELECT home_team_id AS team_id FROM schedule
+    UNION
+    SELECT away_team_id AS team_id FROM schedule
+),
+ranked_games AS (
+    SELECT team_id, game_id,
+           ROW_NUMBER() OVER (PARTITION BY team_id ORDER BY game_date DESC, game_id DESC) AS game_rank
+    FROM (
+        SELECT pgs.team_id, pgs.game_id, MAX(pgs.game_date) AS game_date
         FROM player_game_stats pgs
-        WHERE pgs.team_id = :team_id
-        ORDER BY pgs.game_date DESC
-        """
-    )
-    with engine.begin() as conn:
-        df = pd.read_sql(query, conn, params={'team_id': team_id})
-
-    if df.empty:
-        return 'missing', []
-
-    latest_game = df['game_id'].iloc[0]
-    latest = df[df['game_id'] == latest_game].copy()
-    starters = latest[latest['is_starter'] == 1]
-    source = 'official_starters'
-
-    if starters.empty or len(starters) < 5:
-        source = 'inferred_by_minutes'
-        latest['min_num'] = pd.to_numeric(latest['minutes'], errors='coerce').fillna(0)
-        starters = latest.sort_values('min_num', ascending=False).head(5)
-
-    rows = [
-        {
-            'game_id': str(latest_game),
-            'team_id': int(team_id),
-            'player_id': int(r.player_id),
-            'is_starter': True,
-            'minutes': str(r.minutes),
-            'lineup_source': source,
-            'updated_at': now_iso(),
-        }
-        for r in starters.itertuples()
-    ]
-    return source, rows
+        JOIN scheduled s ON s.team_id = pgs.team_id
+        GROUP BY pgs.team_id, pgs.game_id
+    ) team_games
+),
+latest AS (
+    SELECT pgs.game_id, pgs.team_id, pgs.player_id, pgs.minutes, pgs.is_starter,
+           COALESCE(pgs.minutes, 0) AS min_num
+    FROM player_game_stats pgs
+    JOIN ranked_games g ON g.team_id = pgs.team_id AND g.game_id = pgs.game_id AND g.game_rank = 1
+),
+ranked_players AS (
+    SELECT game_id, team_id, player_id, minutes, is_starter,
+           SUM(CASE WHEN is_starter THEN 1 ELSE 0 END) OVER (PARTITION BY team_id) AS starter_count,
+           ROW_NUMBER() OVER (PARTITION BY team_id ORDER BY min_num DESC, player_id) AS minutes_rank
+    FROM latest
+)
+SELECT game_id, team_id, player_id, minutes,
+       CASE WHEN starter_count >= 5 THEN 'official_starters' ELSE 'inferred_by_minutes' END AS lineup_source
+FROM ranked_players
+WHERE (starter_count >= 5 AND is_starter) OR (starter_count < 5 AND minutes_rank <= 5)
+ORDER BY team_id, player_id
+"""
 
 
-if __name__ == '__main__':
-    count = 0
-    for team_id in scheduled_team_ids():
-        source, rows = infer_lineup(team_id)
-        if source == 'missing':
-            print(f'No lineup data for team {team_id}')
-            continue
-        upsert_rows('lineups', rows, ['game_id', 'team_id', 'player_id'])
-        count += len(rows)
+def infer_lineups() -> pd.DataFrame:
+    """Latest-game starters for every scheduled team in one set-based query.
+
+    Teams with five official starters in their latest game keep them; otherwise the five
+    highest-minute players are used.
+    """
+    lineups = read_df(LINEUP_SQL, name='infer_lineups')
+    lineups['game_id'] = lineups['game_id'].astype(str)
+    lineups['is_starter'] = True
+    lineups['updated_at'] = now_iso()
+    return lineups[['game_id', 'team_id', 'player_id', 'is_starter', 'minutes', 'lineup_source', 'updated_at']]
+
+
+@stage('lineups', after=('player_gamelogs',))
+def run() -> int:
+    lineups = infer_lineups()
+    for team_id in sorted(set(scheduled_team_ids()) - set(lineups['team_id'])):
+        print(f'No lineup data for team {team_id}')
+    count = upsert_rows('lineups', lineups, ['game_id', 'team_id', 'player_id']).rows
     print(f'Upserted {count} lineup rows')
+    return count
+
+
+if __name__ == '__main__':
+    run()
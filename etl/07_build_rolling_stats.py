@@ -0,0 +1,13 @@
+from etl.pipeline import stage
+from etl.rolling import PLAYER_TOTALS, TEAM_TOTALS, refresh_totals
+
+
+@stage('rolling_stats', after=('recent_games', 'player_gamelogs'))
+def run() -> int:
+    total = refresh_totals(TEAM_TOTALS) + refresh_totals(PLAYER_TOTALS)
+    print(f'Refreshed {total} running-total rows')
+    return total
+
+
+if __name__ == '__main__':
+    run()
@@ -0,0 +1,13 @@
+from etl.history import export_history
+from etl.pipeline import stage
+
+
+@stage('history', after=('recent_games', 'player_gamelogs'))
+def run() -> int:
+    total = export_history()
+    print(f'Exported {total} history rows')
+    return total
+
+
+if __name__ == '__main__':
+    run()
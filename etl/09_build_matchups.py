@@ -0,0 +1,13 @@
+from etl.matchups import refresh_matchups
+from etl.pipeline import stage
+
+
+@stage('matchups', after=('lineups', 'rosters'))
+def run() -> int:
+    total = refresh_matchups()
+    print(f'Stored {total} matchup rows')
+    return total
+
+
+if __name__ == '__main__':
+    run()
@@ -0,0 +1,13 @@
+from etl.pipeline import stage
+from etl.player_index import refresh_player_index
+
+
+@stage('player_index', after=('rosters', 'player_gamelogs'))
+def run() -> int:
+    total = refresh_player_index()
+    print(f'Indexed {total} new or changed players')
+    return total
+
+
+if __name__ == '__main__':
+    run()
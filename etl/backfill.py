@@ -0,0 +1,190 @@
+import logging
+import re
+import time
+from dataclasses import dataclass, field
+
+import pandas as pd
+
+from db.bulk import ROW_HASH_TABLES, bulk_upsert
+from db.database import get_engine
+from db.query import fetch_all, statement
+from db.versions import bump_version
+from etl.common import SCHEDULER, SETTINGS, fetch_league_game_logs, fetch_team_season_games, now_iso
+from etl.transforms import normalize_player_games, normalize_player_stubs, normalize_team_games
+
+LOGGER = logging.getLogger(__name__)
+
+LEAGUE = 0  # team_id of a unit that covers the whole league with two league-log calls
+SEASON_RE = re.compile(r'^(\d{4})-(\d{2})$')
+
+UNITS_SQL = 'SELECT season, team_id, status, attempts FROM backfill_units WHERE status IN ({statuses}) ORDER BY season DESC, team_id'
+STATUS_SQL = """
+    SELECT season, status, COUNT(*) AS units, SUM(attempts) AS attempts,
+           SUM(team_rows) AS team_rows, SUM(player_rows) AS player_rows
+    FROM backfill_units
+    GROUP BY season, status
+    ORDER BY season, status
+"""
+DONE_SQL = (
+    "UPDATE backfill_units SET status = 'done', attempts = attempts + 1, team_rows = :team_rows, "
+    'player_rows = :player_rows, error = NULL, updated_at = :updated_at WHERE season = :season AND team_id = :team_id'
+)
+FAILED_SQL = (
+    "UPDATE backfill_units SET status = 'failed', attempts = attempts + 1, error = :error, updated_at = :updated_at "
+    'WHERE season = :season AND team_id = :team_id'
+)
+
+
+@dataclass(frozen=True)
+class Unit:
+    season: str
+    team_id: int
+
+    @property
+    def label(self) -> str:
+        return f"{self.season}/{'league' if self.team_id == LEAGUE else self.team_id}"
+
+
+@dataclass
+class BackfillReport:
+    planned: int = 0
+    ran: int = 0
+    done: int = 0
+    failed: list[str] = field(default_factory=list)
+    team_rows: int = 0
+    player_rows: int = 0
+    derived_rows: int = 0
+    seconds: float = 0.0
+
+    def as_dict(self) -> dict:
+        return {
+            'planned': self.planned,
+            'ran': self.ran,
+            'done': self.done,
+            'failed': self.failed,
+            'team_rows': self.team_rows,
+            'player_rows': self.player_rows,
+            'derived_rows': self.derived_rows,
+            'seconds': round(self.seconds, 3),
+        }
+
+
+def season_range(first: str, last: str) -> list[str]:
+    """Every season label from `first` to `last` inclusive, e.g. ('2015-16', '2017-18')."""
+    years = []
+    for label in (first, last):
+        match = SEASON_RE.match(label)
+        if not match or (int(match.group(1)) + 1) % 100 != int(match.group(2)):
+            raise ValueError(f'Not a season label: {label!r} (expected e.g. 2024-25)')
+        years.append(int(match.group(1)))
+    if years[0] > years[1]:
+        raise ValueError(f'Season range is reversed: {first} > {last}')
+    return [f'{year}-{(year + 1) % 100:02d}' for year in range(years[0], years[1] + 1)]
+
+
+def plan_units(seasons: list[str], team_ids: list[int], bulk: bool) -> list[Unit]:
+    """Checkpoint one unit per season (bulk) or per season x team; existing units keep their status."""
+    units = [Unit(season, LEAGUE) for season in seasons] if bulk else [Unit(s, int(t)) for s in seasons for t in team_ids]
+    # Key-only rows make the upsert DO NOTHING on conflict, so done and failed units survive a re-plan.
+    with get_engine().begin() as conn:
+        bulk_upsert(conn, 'backfill_units', [{'season': u.season, 'team_id': u.team_id} for u in units], ['season', 'team_id'])
+    return units
+
+
+def units_to_run(seasons: list[str], only_failed: bool = False, max_attempts: int | None = None) -> list[Unit]:
+    statuses = ["'failed'"] if only_failed else ["'pending'", "'failed'"]
+    wanted = set(seasons)
+    rows = fetch_all(UNITS_SQL.format(statuses=', '.join(statuses)), name='backfill_units')
+    return [
+        Unit(str(r[0]), int(r[1]))
+        for r in rows
+        if str(r[0]) in wanted and (max_attempts is None or int(r[3]) < max_attempts)
+    ]
+
+
+def fetch_unit(unit: Unit) -> tuple[pd.DataFrame, pd.DataFrame]:
+    if unit.team_id == LEAGUE:
+        return fetch_league_game_logs('T', unit.season), fetch_league_game_logs('P', unit.season)
+    return fetch_team_season_games(unit.team_id, unit.season, 'T'), fetch_team_season_games(unit.team_id, unit.season, 'P')
+
+
+def run_unit(unit: Unit) -> tuple[int, int]:
+    """Fetch, write and checkpoint one unit in a single transaction; a failure is recorded and re-raised."""
+    try:
+        team_logs, player_logs = fetch_unit(unit)
+        updated_at = now_iso()
+        team_rows = normalize_team_games(team_logs, updated_at=updated_at)
+        player_rows = normalize_player_games(player_logs, updated_at=updated_at)
+        stubs = normalize_player_stubs(player_logs, updated_at=updated_at)
+        with get_engine().begin() as conn:
+            # player_game_stats.player_id references players, which only holds current rosters: add the
+            # other logged players first, never overwriting a roster row.
+            if bulk_upsert(conn, 'players', stubs, ['player_id'], chunk_size=SETTINGS.bulk_chunk_size, detect_changes=True, update=False).rows:
+                bump_version(conn, 'players', updated_at)
+            for table, rows, keys in (
+                ('team_game_stats', team_rows, ['game_id', 'team_id']),
+                ('player_game_stats', player_rows, ['game_id', 'player_id']),
+            ):
+                if bulk_upsert(conn, table, rows, keys, chunk_size=SETTINGS.bulk_chunk_size, detect_changes=table in ROW_HASH_TABLES).rows:
+                    bump_version(conn, table, updated_at)
+            params = {'team_rows': len(team_rows), 'player_rows': len(player_rows), 'updated_at': updated_at}
+            conn.execute(statement(DONE_SQL), {**params, 'season': unit.season, 'team_id': unit.team_id})
+    except Exception as exc:
+        with get_engine().begin() as conn:
+            conn.execute(
+                statement(FAILED_SQL),
+                {'error': f'{type(exc).__name__}: {exc}'[:500], 'updated_at': now_iso(), 'season': unit.season, 'team_id': unit.team_id},
+            )
+        raise
+    LOGGER.info('Backfilled %s: %s team rows, %s player rows', unit.label, len(team_rows), len(player_rows))
+    return len(team_rows), len(player_rows)
+
+
+def backfill_status() -> pd.DataFrame:
+    rows = fetch_all(STATUS_SQL, name='backfill_status')
+    return pd.DataFrame(rows, columns=['season', 'status', 'units', 'attempts', 'team_rows', 'player_rows'])
+
+
+def run_backfill(
+    seasons: list[str],
+    team_ids: list[int] | None = None,
+    bulk: bool | None = None,
+    only_failed: bool = False,
+    max_attempts: int | None = None,
+    derived: bool = True,
+) -> BackfillReport:
+    """Load game logs for `seasons`, resuming from the checkpoint table.
+
+    Units already done are skipped; pending and failed ones run in parallel on the shared
+    fetch scheduler, so the whole backfill stays inside the API rate budget.
+    """
+    started = time.perf_counter()
+    bulk = SETTINGS.etl_bulk_ingest if bulk is None else bulk
+    report = BackfillReport()
+    if not only_failed:
+        if not bulk and team_ids is None:
+            team_ids = [int(r[0]) for r in fetch_all('SELECT team_id FROM teams', name='teams')]
+            if not team_ids:
+                raise ValueError('No teams loaded; run the teams stage before a per-team backfill')
+        report.planned = len(plan_units(seasons, team_ids or [], bulk))
+
+    units = units_to_run(seasons, only_failed, max_attempts)
+    report.ran = len(units)
+    LOGGER.info('Backfill: %s units to run across %s seasons', len(units), len(seasons))
+    for unit, result in zip(units, SCHEDULER.map(run_unit, units, return_exceptions=True)):
+        if isinstance(result, Exception):
+            LOGGER.warning('Backfill unit %s failed: %s', unit.label, result)
+            report.failed.append(unit.label)
+            continue
+        report.done += 1
+        report.team_rows += result[0]
+        report.player_rows += result[1]
+
+    if derived and report.done:
+        from etl.history import export_history
+        from etl.player_index import refresh_player_index
+        from etl.rolling import PLAYER_TOTALS, TEAM_TOTALS, refresh_totals
+
+        report.derived_rows = refresh_totals(TEAM_TOTALS) + refresh_totals(PLAYER_TOTALS) + export_history() + refresh_player_index()
+    report.seconds = time.perf_counter() - started
+    return report
@@ -1,54 +1,67 @@
 import logging
-import time
 from datetime import date, datetime, timedelta
+from typing import Iterable
 
 import pandas as pd
-import requests_cache
-from nba_api.stats.endpoints import commonteamroster, leaguegamefinder, scoreboardv2
-from nba_api.stats.static import teams as static_teams
-from sqlalchemy import text
-from tenacity import retry, stop_after_attempt, wait_exponential
 
 from app.config import get_settings
 from db.database import get_engine
+from db.bulk import ROW_HASH_TABLES, BulkWriteResult, bulk_upsert
+from db.query import fetch_all
+from db.versions import bump_version
+from etl.fetcher import FetchScheduler, TokenBucket
+from etl.http_cache import CachePolicy, HttpCache
 
 logging.basicConfig(level=logging.INFO, format='%(asctime)s %(levelname)s %(message)s')
 LOGGER = logging.getLogger(__name__)
 
 SETTINGS = get_settings()
-requests_cache.install_cache(cache_name=f"{SETTINGS.cache_dir}/nba_api_cache", backend='sqlite', expire_after=3600)
+# Installed by the first API call (see safe_call), so importing a stage touches neither requests_cache nor disk.
+HTTP_CACHE = HttpCache(
+    f'{SETTINGS.cache_dir}/nba_api_cache',
+    CachePolicy(today=lambda: etl_today(), current_season=lambda: SETTINGS.nba_season, live_seconds=SETTINGS.cache_live_seconds),
+    max_bytes=SETTINGS.cache_max_mb * 1024 * 1024,
+    compact_hours=SETTINGS.cache_compact_hours,
+)
+SCHEDULER = FetchScheduler(TokenBucket(SETTINGS.api_rate(), SETTINGS.api_burst), max_workers=SETTINGS.api_max_workers)
 
 
-def throttle() -> None:
-    time.sleep(SETTINGS.api_throttle_seconds)
+def throttle() -> float:
+    return SCHEDULER.bucket.acquire()
 
 
-@retry(stop=stop_after_attempt(3), wait=wait_exponential(multiplier=1, min=1, max=8))
 def safe_call(func, *args, **kwargs):
-    throttle()
-    return func(*args, **kwargs)
-
-
-def upsert_rows(table: str, rows: list[dict], conflict_cols: list[str]) -> None:
-    if not rows:
-        return
-    engine = get_engine()
-    cols = list(rows[0].keys())
-    col_csv = ', '.join(cols)
-    conflict_csv = ', '.join(conflict_cols)
-    update_cols = [c for c in cols if c not in conflict_cols]
-    set_clause = ', '.join([f"{c}=excluded.{c}" for c in update_cols])
-
-    sql = text(
-        f"INSERT INTO {table} ({col_csv}) VALUES ({', '.join([f':{c}' for c in cols])}) "
-        f"ON CONFLICT ({conflict_csv}) DO UPDATE SET {set_clause}"
-    )
-
-    with engine.begin() as conn:
-        conn.execute(sql, rows)
+    HTTP_CACHE.ensure_installed()
+    return SCHEDULER.call(func, *args, **kwargs)
+
+
+def upsert_rows(
+    table: str, rows: pd.DataFrame | Iterable[dict], conflict_cols: list[str], known_new: pd.Series | None = None
+) -> BulkWriteResult:
+    """Upsert and bump the table's data version; rows of ROW_HASH_TABLES are only written when new or changed.
+
+    `known_new` flags rows the caller knows are not stored yet; they skip the stored-hash lookup.
+    """
+    detect = table in ROW_HASH_TABLES
+    with get_engine().begin() as conn:
+        result = bulk_upsert(
+            conn, table, rows, conflict_cols, chunk_size=SETTINGS.bulk_chunk_size, detect_changes=detect, known_new=known_new
+        )
+        if result.rows:
+            bump_version(conn, table, now_iso())
+    if detect and (result.rows or result.unchanged):
+        LOGGER.info(
+            'Upserted %s into %s in %.3fs: %s inserted, %s updated, %s unchanged',
+            result.rows, table, result.seconds, result.inserted, result.updated, result.unchanged,
+        )
+    elif result.rows:
+        LOGGER.info('Upserted %s rows into %s in %.3fs (%.0f rows/s)', result.rows, table, result.seconds, result.rows_per_second)
+    return result
 
 
 def fetch_teams() -> pd.DataFrame:
+    from nba_api.stats.static import teams as static_teams
+
     df = pd.DataFrame(static_teams.get_teams())
     required = ['id', 'full_name', 'abbreviation']
     missing = [col for col in required if col not in df.columns]
@@ -58,8 +71,17 @@ def fetch_teams() -> pd.DataFrame:
     return out.drop_duplicates()
 
 
+def static_player_names() -> dict[int, str]:
+    """player_id -> name for every player nba_api ships with (no request is made)."""
+    from nba_api.stats.static import players as static_players
+
+    return {int(p['id']): p['full_name'] for p in static_players.get_players()}
+
+
 def fetch_roster(team_id: int) -> pd.DataFrame:
-    roster = safe_call(commonteamroster.CommonTeamRoster, team_id=team_id, season='2024-25').common_team_roster.get_data_frame()
+    from nba_api.stats.endpoints import commonteamroster
+
+    roster = safe_call(commonteamroster.CommonTeamRoster, team_id=team_id, season=SETTINGS.nba_season).common_team_roster.get_data_frame()
     if 'TEAM_ID' not in roster.columns:
         roster['TEAM_ID'] = int(team_id)
 
@@ -70,15 +92,20 @@ def fetch_roster(team_id: int) -> pd.DataFrame:
     return roster[keep_cols]
 
 
+def fetch_rosters(team_ids: list[int]) -> list[pd.DataFrame]:
+    return SCHEDULER.map(fetch_roster, team_ids)
+
+
+def fetch_scoreboard(game_date: date) -> pd.DataFrame:
+    from nba_api.stats.endpoints import scoreboardv2
+
+    board = safe_call(scoreboardv2.ScoreboardV2, game_date=game_date.strftime('%m/%d/%Y'))
+    return board.game_header.get_data_frame()
+
+
 def fetch_schedule_window(start: date, end: date) -> pd.DataFrame:
-    game_rows = []
-    current = start
-    while current <= end:
-        board = safe_call(scoreboardv2.ScoreboardV2, game_date=current.strftime('%m/%d/%Y'))
-        games = board.game_header.get_data_frame()
-        if not games.empty:
-            game_rows.append(games)
-        current += timedelta(days=1)
+    days = [start + timedelta(days=offset) for offset in range((end - start).days + 1)]
+    game_rows = [games for games in SCHEDULER.map(fetch_scoreboard, days) if not games.empty]
     if not game_rows:
         return pd.DataFrame()
     out = pd.concat(game_rows, ignore_index=True)
@@ -87,6 +114,8 @@ def fetch_schedule_window(start: date, end: date) -> pd.DataFrame:
 
 
 def fetch_team_recent_games(team_id: int, last_n: int = 5) -> pd.DataFrame:
+    from nba_api.stats.endpoints import leaguegamefinder
+
     finder = safe_call(leaguegamefinder.LeagueGameFinder, team_id_nullable=team_id, season_type_nullable='Regular Season')
     df = finder.get_data_frames()[0]
     df['GAME_DATE'] = pd.to_datetime(df['GAME_DATE'])
@@ -94,6 +123,8 @@ def fetch_team_recent_games(team_id: int, last_n: int = 5) -> pd.DataFrame:
 
 
 def fetch_player_games(player_id: int, last_n: int = 10) -> pd.DataFrame:
+    from nba_api.stats.endpoints import leaguegamefinder
+
     finder = safe_call(leaguegamefinder.LeagueGameFinder, player_id_nullable=player_id, season_type_nullable='Regular Season')
     df = finder.get_data_frames()[0]
     if df.empty:
@@ -102,17 +133,67 @@ def fetch_player_games(player_id: int, last_n: int = 10) -> pd.DataFrame:
     return df.sort_values('GAME_DATE', ascending=False).head(last_n)
 
 
+def fetch_team_season_games(team_id: int, season: str, player_or_team: str = 'T') -> pd.DataFrame:
+    """One team's regular-season games ('T') or its players' game logs ('P') for `season`."""
+    from nba_api.stats.endpoints import leaguegamefinder
+
+    finder = safe_call(
+        leaguegamefinder.LeagueGameFinder,
+        team_id_nullable=team_id,
+        season_nullable=season,
+        player_or_team_abbreviation=player_or_team,
+        season_type_nullable='Regular Season',
+    )
+    return finder.get_data_frames()[0]
+
+
+def fetch_league_game_logs(player_or_team: str = 'T', season: str | None = None) -> pd.DataFrame:
+    from nba_api.stats.endpoints import leaguegamelog
+
+    log = safe_call(
+        leaguegamelog.LeagueGameLog,
+        season=season or SETTINGS.nba_season,
+        player_or_team_abbreviation=player_or_team,
+        season_type_all_star='Regular Season',
+    )
+    df = log.get_data_frames()[0]
+    if df.empty:
+        return df
+    df['GAME_DATE'] = pd.to_datetime(df['GAME_DATE'])
+    return df
+
+
+def recent_by_entity(df: pd.DataFrame, key: str, last_n: int, entity_ids=None) -> pd.DataFrame:
+    if df.empty:
+        return df
+    if entity_ids is not None:
+        df = df[df[key].isin(list(entity_ids))]
+    ordered = df.sort_values(['GAME_DATE', 'GAME_ID'], ascending=False, kind='stable')
+    return ordered.groupby(key, sort=False).head(last_n)
+
+
+def fetch_league_team_recent_games(team_ids=None, last_n: int = 5) -> pd.DataFrame:
+    return recent_by_entity(fetch_league_game_logs('T'), 'TEAM_ID', last_n, team_ids)
+
+
+def fetch_league_player_recent_games(player_ids=None, last_n: int = 10) -> pd.DataFrame:
+    return recent_by_entity(fetch_league_game_logs('P'), 'PLAYER_ID', last_n, player_ids)
+
+
+SCHEDULED_TEAMS_SQL = 'SELECT DISTINCT home_team_id AS team_id FROM schedule UNION SELECT DISTINCT away_team_id AS team_id FROM schedule'
+SCHEDULED_PLAYERS_SQL = (
+    'SELECT DISTINCT player_id FROM players '
+    'WHERE team_id IN (SELECT home_team_id FROM schedule UNION SELECT away_team_id FROM schedule)'
+)
+
+
 def scheduled_team_ids() -> list[int]:
-    engine = get_engine()
-    with engine.begin() as conn:
-        rows = conn.execute(text('SELECT DISTINCT home_team_id AS team_id FROM schedule UNION SELECT DISTINCT away_team_id AS team_id FROM schedule')).fetchall()
+    rows = fetch_all(SCHEDULED_TEAMS_SQL, name='scheduled_teams')
     return [int(r[0]) for r in rows]
 
 
 def scheduled_players() -> list[int]:
-    engine = get_engine()
-    with engine.begin() as conn:
-        rows = conn.execute(text('SELECT DISTINCT player_id FROM players WHERE team_id IN (SELECT home_team_id FROM schedule UNION SELECT away_team_id FROM schedule)')).fetchall()
+    rows = fetch_all(SCHEDULED_PLAYERS_SQL, name='scheduled_players')
     return [int(r[0]) for r in rows]
 
 
@@ -121,5 +202,10 @@ def validate_non_empty(name: str, df: pd.DataFrame) -> None:
         LOGGER.warning('%s returned no rows', name)
 
 
+def etl_today() -> date:
+    """The ETL's notion of today; ETL_TODAY pins it for reproducible (replayed) runs."""
+    return SETTINGS.etl_today or date.today()
+
+
 def now_iso() -> str:
     return datetime.utcnow().isoformat()
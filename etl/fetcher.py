@@ -0,0 +1,190 @@
+import json
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from functools import lru_cache
+
+from app.metrics import METRICS
+
+LOGGER = logging.getLogger(__name__)
+
+
+@lru_cache(maxsize=1)
+def throttle_errors() -> tuple[type[Exception], ...]:
+    # requests (and tenacity below) load on the first API call; stages that never fetch skip them.
+    import requests
+
+    return requests.exceptions.Timeout, requests.exceptions.ConnectionError, json.JSONDecodeError
+
+
+class TokenBucket:
+    """Global request budget: `rate` tokens/sec refilled up to `burst`, with adaptive backoff."""
+
+    def __init__(self, rate: float, burst: int = 1, min_rate: float | None = None):
+        self.max_rate = float(rate)
+        self.min_rate = float(min_rate or rate / 10)
+        self.rate = float(rate)
+        self.burst = max(1, int(burst))
+        self.tokens = float(self.burst)
+        self.updated = time.monotonic()
+        self.paused_until = 0.0
+        self.lock = threading.Lock()
+
+    def _refill(self, now: float) -> None:
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def acquire(self) -> float:
+        """Block until a token is available and return the seconds spent waiting."""
+        waited = 0.0
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self._refill(now)
+                if now < self.paused_until:
+                    delay = self.paused_until - now
+                elif self.tokens >= 1:
+                    self.tokens -= 1
+                    return waited
+                else:
+                    delay = (1 - self.tokens) / self.rate
+            time.sleep(delay)
+            waited += delay
+
+    def on_throttled(self, cooldown: float) -> None:
+        with self.lock:
+            self.rate = max(self.min_rate, self.rate / 2)
+            self.tokens = 0.0
+            self.paused_until = max(self.paused_until, time.monotonic() + cooldown)
+        LOGGER.warning('Upstream throttling detected; backing off to %.2f req/s', self.rate)
+
+    def on_success(self) -> None:
+        with self.lock:
+            if self.rate < self.max_rate:
+                self.rate = min(self.max_rate, self.rate + self.max_rate / 10)
+
+
+@dataclass
+class CallStats:
+    calls: int = 0
+    retries: int = 0
+    failures: int = 0
+    throttled: int = 0
+    latency_seconds: float = 0.0
+    max_latency_seconds: float = 0.0
+    wait_seconds: float = 0.0
+
+    def as_dict(self) -> dict:
+        avg = self.latency_seconds / self.calls if self.calls else 0.0
+        return {
+            'calls': self.calls,
+            'retries': self.retries,
+            'failures': self.failures,
+            'throttled': self.throttled,
+            'avg_latency_s': round(avg, 3),
+            'max_latency_s': round(self.max_latency_seconds, 3),
+            'wait_s': round(self.wait_seconds, 3),
+        }
+
+
+@dataclass
+class FetchScheduler:
+    """Runs upstream calls on a bounded worker pool under one shared TokenBucket."""
+
+    bucket: TokenBucket
+    max_workers: int = 4
+    max_attempts: int = 3
+    cooldown_seconds: float = 5.0
+    retry_min_seconds: float = 1.0
+    retry_max_seconds: float = 8.0
+    stats: dict[str, CallStats] = field(default_factory=dict)
+    stats_lock: threading.Lock = field(default_factory=threading.Lock)
+
+    def _record(self, name: str, **deltas) -> None:
+        with self.stats_lock:
+            stats = self.stats.setdefault(name, CallStats())
+            for key, value in deltas.items():
+                if key == 'max_latency_seconds':
+                    stats.max_latency_seconds = max(stats.max_latency_seconds, value)
+                else:
+                    setattr(stats, key, getattr(stats, key) + value)
+
+    def call(self, func, *args, **kwargs):
+        from tenacity import Retrying, stop_after_attempt, wait_exponential
+
+        name = getattr(func, '__name__', str(func))
+        throttling = throttle_errors()
+        retrying = Retrying(
+            stop=stop_after_attempt(self.max_attempts),
+            wait=wait_exponential(multiplier=1, min=self.retry_min_seconds, max=self.retry_max_seconds),
+            reraise=True,
+        )
+        # api_call_seconds covers the whole call: limiter waits, attempts and retry backoff.
+        try:
+            with METRICS.span('api_call', endpoint=name):
+                for attempt in retrying:
+                    with attempt:
+                        if attempt.retry_state.attempt_number > 1:
+                            self._record(name, retries=1)
+                            METRICS.inc('api_retries_total', endpoint=name)
+                        waited = self.bucket.acquire()
+                        METRICS.observe('api_throttle_wait_seconds', waited, endpoint=name)
+                        started = time.perf_counter()
+                        try:
+                            result = func(*args, **kwargs)
+                        except throttling:
+                            self._record(name, throttled=1)
+                            METRICS.inc('api_throttled_total', endpoint=name)
+                            self.bucket.on_throttled(self.cooldown_seconds)
+                            raise
+                        finally:
+                            elapsed = time.perf_counter() - started
+                            self._record(name, calls=1, latency_seconds=elapsed, max_latency_seconds=elapsed, wait_seconds=waited)
+                            METRICS.observe('api_attempt_seconds', elapsed, endpoint=name)
+                        self.bucket.on_success()
+                        return result
+        except Exception:
+            self._record(name, failures=1)
+            raise
+
+    def map(self, func, items, return_exceptions: bool = False) -> list:
+        """Apply `func` to every item concurrently, preserving input order."""
+        items = list(items)
+        if not items:
+            return []
+        pool = ThreadPoolExecutor(max_workers=min(self.max_workers, len(items)), thread_name_prefix='fetch')
+        try:
+            futures = [pool.submit(func, item) for item in items]
+            results = []
+            for future in futures:
+                try:
+                    results.append(future.result())
+                except Exception as exc:
+                    if not return_exceptions:
+                        raise
+                    results.append(exc)
+            return results
+        finally:
+            pool.shutdown(wait=True, cancel_futures=True)
+
+    def summary(self) -> dict[str, dict]:
+        with self.stats_lock:
+            return {name: stats.as_dict() for name, stats in sorted(self.stats.items())}
+
+    def totals(self) -> dict:
+        """Call counts and seconds blocked in the token bucket, summed over every endpoint."""
+        with self.stats_lock:
+            stats = list(self.stats.values())
+        return {
+            'calls': sum(s.calls for s in stats),
+            'retries': sum(s.retries for s in stats),
+            'failures': sum(s.failures for s in stats),
+            'throttled': sum(s.throttled for s in stats),
+            'wait_s': round(sum(s.wait_seconds for s in stats), 3),
+        }
+
+    def log_summary(self) -> None:
+        for name, stats in self.summary().items():
+            LOGGER.info('API %s: %s', name, stats)
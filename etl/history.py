@@ -0,0 +1,72 @@
+import logging
+
+from db.database import get_engine
+from db.history import SCHEMAS, HistoryStore, history_store
+from db.query import read_df
+from db.versions import bump_version
+from etl.common import SETTINGS, now_iso
+from etl.rolling import season_for_dates
+from etl.watermarks import load_watermarks, save_watermarks
+
+LOGGER = logging.getLogger(__name__)
+
+CHANGED_SQL = """
+    SELECT team_id, game_date, MAX(updated_at) AS updated_at
+    FROM {table}
+    WHERE team_id IS NOT NULL{since}
+    GROUP BY team_id, game_date
+"""
+PARTITION_SQL = """
+    SELECT {columns}
+    FROM {table}
+    WHERE team_id = :team_id AND game_date >= :start AND game_date < :end
+"""
+
+
+def changed_sql(table: str, incremental: bool) -> str:
+    return CHANGED_SQL.format(table=table, since=' AND updated_at > :since' if incremental else '')
+
+
+def partition_sql(table: str) -> str:
+    return PARTITION_SQL.format(table=table, columns=', '.join(SCHEMAS[table].names))
+
+
+def season_bounds(season: str) -> tuple[str, str]:
+    """[start, end) dates of an NBA season label; seasons roll over on October 1."""
+    start = int(season[:4])
+    return f'{start}-10-01', f'{start + 1}-10-01'
+
+
+def changed_partitions(table: str, since: str | None) -> tuple[list[tuple[str, int]], str | None]:
+    """(season, team_id) partitions with rows updated after `since`, and the newest updated_at seen."""
+    params = {'since': since} if since else {}
+    changed = read_df(changed_sql(table, bool(since)), params, name=f'history_changed_{table}')
+    if changed.empty:
+        return [], since
+    seasons = season_for_dates(changed['game_date'])
+    parts = sorted(set(zip(seasons, changed['team_id'].astype('int64'))))
+    return parts, str(changed['updated_at'].max())
+
+
+def export_table(table: str, store: HistoryStore | None = None) -> int:
+    """Rewrite every history partition of `table` touched since the last export."""
+    store = store or history_store()
+    stage = f'history_{table}'
+    since = load_watermarks(stage).get(0) if SETTINGS.etl_incremental else None
+    parts, mark = changed_partitions(table, since)
+    rows = 0
+    for season, team_id in parts:
+        start, end = season_bounds(season)
+        df = read_df(partition_sql(table), {'team_id': int(team_id), 'start': start, 'end': end}, name=f'history_partition_{table}')
+        rows += store.write_partition(table, season, team_id, df)
+    if parts:
+        with get_engine().begin() as conn:
+            bump_version(conn, stage, now_iso())
+        save_watermarks(stage, [0], mark)
+    LOGGER.info('History %s: rewrote %s partitions (%s rows)', table, len(parts), rows)
+    return rows
+
+
+def export_history(store: HistoryStore | None = None) -> int:
+    store = store or history_store()
+    return sum(export_table(table, store) for table in SCHEMAS)
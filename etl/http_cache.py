@@ -0,0 +1,214 @@
+import logging
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass, field
+from datetime import date, datetime, timedelta
+from functools import lru_cache
+from pathlib import Path
+from typing import Callable
+from urllib.parse import parse_qsl, urlsplit
+
+from app.metrics import METRICS
+
+LOGGER = logging.getLogger(__name__)
+
+# requests_cache.NEVER_EXPIRE; the package itself is imported only once a cache is installed or maintained.
+NEVER_EXPIRE = -1
+
+ACCESS_DDL = 'CREATE TABLE IF NOT EXISTS cache_access (key TEXT PRIMARY KEY, last_access REAL NOT NULL)'
+META_DDL = 'CREATE TABLE IF NOT EXISTS cache_meta (name TEXT PRIMARY KEY, value REAL NOT NULL)'
+
+
+def _request_params(url: str, params) -> tuple[str, dict]:
+    parts = urlsplit(url)
+    merged = dict(parse_qsl(parts.query, keep_blank_values=True))
+    if params:
+        merged.update(params.items() if isinstance(params, dict) else params)
+    return parts.path.rstrip('/').rsplit('/', 1)[-1].lower(), merged
+
+
+@dataclass
+class CachePolicy:
+    """TTL per stats endpoint and parameters: finished games never expire, live data is short-lived."""
+
+    today: Callable[[], date] = date.today
+    current_season: Callable[[], str] = lambda: ''
+    live_seconds: int = 300
+    schedule_seconds: int = 3600
+    roster_seconds: int = 86400
+    season_seconds: int = 21600
+    default_seconds: int = 3600
+
+    def _season(self, params: dict, recent_seconds: int) -> int:
+        season = str(params.get('Season') or '')
+        if season and self.current_season() and season < self.current_season():
+            return NEVER_EXPIRE
+        return recent_seconds
+
+    def expire_after(self, endpoint: str, params: dict) -> int:
+        if endpoint == 'scoreboardv2' and params.get('GameDate'):
+            day = datetime.strptime(str(params['GameDate']), '%m/%d/%Y').date()
+            today = self.today()
+            if day < today - timedelta(days=1):
+                return NEVER_EXPIRE
+            return self.live_seconds if day <= today else self.schedule_seconds
+        if endpoint == 'commonteamroster':
+            return self._season(params, self.roster_seconds)
+        if endpoint in ('leaguegamelog', 'leaguegamefinder'):
+            return self._season(params, self.season_seconds)
+        return self.default_seconds
+
+
+@dataclass
+class EndpointCacheStats:
+    hits: int = 0
+    misses: int = 0
+    bytes_from_cache: int = 0
+    bytes_fetched: int = 0
+
+    def as_dict(self) -> dict:
+        total = self.hits + self.misses
+        return {**self.__dict__, 'hit_rate': round(self.hits / total, 3) if total else 0.0}
+
+
+@lru_cache(maxsize=1)
+def policy_session() -> type:
+    from requests_cache import CachedSession
+
+    class PolicySession(CachedSession):
+        """CachedSession whose per-request expiry comes from the installed HttpCache policy."""
+
+        http_cache: 'HttpCache | None' = None
+
+        def request(self, method, url, *args, params=None, expire_after=None, **kwargs):
+            owner = self.http_cache
+            endpoint, merged = _request_params(url, params)
+            if owner is not None and expire_after is None:
+                expire_after = owner.policy.expire_after(endpoint, merged)
+            response = super().request(method, url, *args, params=params, expire_after=expire_after, **kwargs)
+            if owner is not None:
+                owner.record(endpoint, response)
+            return response
+
+    return PolicySession
+
+
+def __getattr__(name: str):
+    if name == 'PolicySession':
+        return policy_session()
+    raise AttributeError(f'module {__name__!r} has no attribute {name!r}')
+
+
+@dataclass
+class HttpCache:
+    """Installs the global nba_api HTTP cache and bounds it with LRU eviction and periodic VACUUM."""
+
+    cache_name: str
+    policy: CachePolicy = field(default_factory=CachePolicy)
+    max_bytes: int = 256 * 1024 * 1024
+    compact_hours: float = 24.0
+    stats: dict[str, EndpointCacheStats] = field(default_factory=dict)
+    touched: dict[str, float] = field(default_factory=dict)
+    lock: threading.Lock = field(default_factory=threading.Lock)
+    installed: bool = False
+
+    def install(self) -> 'HttpCache':
+        import requests_cache
+
+        Path(self.cache_name).parent.mkdir(parents=True, exist_ok=True)
+        session = policy_session()
+        session.http_cache = self
+        requests_cache.install_cache(
+            cache_name=self.cache_name, backend='sqlite', session_factory=session, expire_after=self.policy.default_seconds
+        )
+        self.installed = True
+        return self
+
+    def ensure_installed(self) -> 'HttpCache':
+        """Install on first use; safe to call before every request from any fetch thread."""
+        if not self.installed:
+            with self.lock:
+                if not self.installed:
+                    self.install()
+        return self
+
+    def record(self, endpoint: str, response) -> None:
+        hit = bool(getattr(response, 'from_cache', False))
+        size = len(response.content or b'')
+        key = getattr(response, 'cache_key', None)
+        METRICS.inc('http_cache_requests_total', endpoint=endpoint, result='hit' if hit else 'miss')
+        METRICS.inc('http_cache_bytes_total', size, endpoint=endpoint, result='hit' if hit else 'miss')
+        with self.lock:
+            stats = self.stats.setdefault(endpoint, EndpointCacheStats())
+            if hit:
+                stats.hits += 1
+                stats.bytes_from_cache += size
+            else:
+                stats.misses += 1
+                stats.bytes_fetched += size
+            if key:
+                self.touched[key] = time.time()
+
+    def summary(self) -> dict[str, dict]:
+        with self.lock:
+            return {name: stats.as_dict() for name, stats in sorted(self.stats.items())}
+
+    def log_summary(self) -> None:
+        for name, stats in self.summary().items():
+            LOGGER.info('HTTP cache %s: %s', name, stats)
+
+    def maintain(self, now: float | None = None) -> dict:
+        """Drop expired entries, evict least recently used ones above `max_bytes`, VACUUM when due."""
+        from requests_cache.backends.sqlite import SQLiteCache
+
+        now = now or time.time()
+        Path(self.cache_name).parent.mkdir(parents=True, exist_ok=True)
+        cache = SQLiteCache(self.cache_name)
+        with self.lock:
+            touched, self.touched = self.touched, {}
+        try:
+            with sqlite3.connect(cache.db_path) as conn:
+                conn.execute(ACCESS_DDL)
+                conn.execute(META_DDL)
+                conn.executemany(
+                    'INSERT INTO cache_access (key, last_access) VALUES (?, ?) '
+                    'ON CONFLICT(key) DO UPDATE SET last_access = excluded.last_access',
+                    touched.items(),
+                )
+            before = cache.responses.count(expired=True)
+            cache.delete(expired=True, vacuum=False)
+            expired = before - cache.responses.count(expired=True)
+
+            with sqlite3.connect(cache.db_path) as conn:
+                rows = conn.execute(
+                    'SELECT r.key, LENGTH(r.value), COALESCE(a.last_access, 0) FROM responses r '
+                    'LEFT JOIN cache_access a ON a.key = r.key ORDER BY 3, 1'
+                ).fetchall()
+                total = sum(r[1] for r in rows)
+                victims, freed = [], 0
+                for key, size, _ in rows:
+                    if total - freed <= self.max_bytes:
+                        break
+                    victims.append(key)
+                    freed += size
+                last = conn.execute("SELECT value FROM cache_meta WHERE name = 'compacted_at'").fetchone()
+            if victims:
+                cache.delete(*victims, vacuum=False)
+
+            compact = bool(victims) or not last or now - last[0] >= self.compact_hours * 3600
+            if compact:
+                cache.responses.vacuum()
+            with sqlite3.connect(cache.db_path) as conn:
+                conn.execute('DELETE FROM cache_access WHERE key NOT IN (SELECT key FROM responses)')
+                if compact:
+                    conn.execute(
+                        "INSERT INTO cache_meta (name, value) VALUES ('compacted_at', ?) "
+                        'ON CONFLICT(name) DO UPDATE SET value = excluded.value',
+                        (now,),
+                    )
+        finally:
+            cache.close()
+        result = {'expired': expired, 'evicted': len(victims), 'bytes': total - freed, 'compacted': compact}
+        LOGGER.info('HTTP cache maintenance: %s', result)
+        return result
@@ -0,0 +1,175 @@
+import logging
+from functools import lru_cache
+from itertools import permutations
+
+import numpy as np
+import pandas as pd
+
+from db.bulk import bulk_upsert
+from db.database import get_engine
+from db.query import read_df, statement
+from db.versions import bump_version
+from etl.common import SETTINGS, etl_today, now_iso
+
+LOGGER = logging.getLogger(__name__)
+
+STARTERS = 5
+FORM_GAMES = 5
+# Court position as a number so hybrid listings ('G-F') sit between their parts.
+POSITION_COORDS = {'PG': 1.0, 'G': 1.5, 'SG': 2.0, 'SF': 3.0, 'F': 3.5, 'PF': 4.0, 'C': 5.0}
+WEIGHTS = {'position': 0.45, 'size': 0.25, 'minutes': 0.1, 'form': 0.2}
+COLUMNS = [
+    'game_id', 'slot', 'position', 'home_team_id', 'away_team_id', 'home_player_id', 'away_player_id',
+    'score', 'position_fit', 'size_fit', 'minutes_fit', 'form_fit', 'updated_at',
+]
+
+SLATE_SQL = 'SELECT game_id, game_date, home_team_id, away_team_id FROM schedule WHERE game_date >= :today'
+STARTERS_SQL = """
+WITH slate_teams AS (
+    SELECT home_team_id AS team_id FROM schedule WHERE game_date >= :today
+    UNION
+    SELECT away_team_id AS team_id FROM schedule WHERE game_date >= :today
+),
+ranked_games AS (
+    SELECT team_id, game_id,
+           ROW_NUMBER() OVER (PARTITION BY team_id ORDER BY updated_at DESC, game_id DESC) AS game_rank
+    FROM (
+        SELECT l.team_id, l.game_id, MAX(l.updated_at) AS updated_at
+        FROM lineups l
+        JOIN slate_teams t ON t.team_id = l.team_id
+        GROUP BY l.team_id, l.game_id
+    ) team_games
+),
+starters AS (
+    SELECT l.team_id, l.player_id, l.minutes
+    FROM lineups l
+    JOIN ranked_games g ON g.team_id = l.team_id AND g.game_id = l.game_id AND g.game_rank = 1
+),
+recent AS (
+    SELECT pgs.player_id, COALESCE(pgs.pts, 0) + COALESCE(pgs.reb, 0) + COALESCE(pgs.ast, 0) AS production,
+           ROW_NUMBER() OVER (PARTITION BY pgs.player_id ORDER BY pgs.game_date DESC) AS game_rank
+    FROM player_game_stats pgs
+    JOIN starters s ON s.player_id = pgs.player_id
+),
+form AS (
+    SELECT player_id, AVG(production) AS form FROM recent WHERE game_rank <= :form_games GROUP BY player_id
+)
+SELECT s.team_id, s.player_id, p.position, p.height_inches, p.weight, s.minutes, f.form
+FROM starters s
+LEFT JOIN players p ON p.player_id = s.player_id
+LEFT JOIN form f ON f.player_id = s.player_id
+"""
+DELETE_SLATE_SQL = 'DELETE FROM matchups WHERE game_id IN (SELECT game_id FROM schedule WHERE game_date >= :today)'
+
+
+def position_coord(position) -> float:
+    parts = [POSITION_COORDS[p] for p in str(position or '').upper().replace(' ', '').split('-') if p in POSITION_COORDS]
+    return float(np.mean(parts)) if parts else np.nan
+
+
+def _closeness(home: pd.Series, away: pd.Series, scale: float) -> np.ndarray:
+    """1 for equal values falling linearly to 0 at `scale` apart; 0.5 when either side is unknown."""
+    h = pd.to_numeric(home, errors='coerce').to_numpy(dtype=float)[:, None]
+    a = pd.to_numeric(away, errors='coerce').to_numpy(dtype=float)[None, :]
+    fit = 1 - np.minimum(np.abs(h - a) / scale, 1)
+    return np.where(np.isnan(fit), 0.5, fit)
+
+
+def fit_matrices(home: pd.DataFrame, away: pd.DataFrame) -> dict[str, np.ndarray]:
+    """Per-criterion fit of every home starter (rows) against every away starter (columns), each in [0, 1]."""
+    return {
+        'position': _closeness(home['position'].map(position_coord), away['position'].map(position_coord), 4.0),
+        'size': (_closeness(home['height_inches'], away['height_inches'], 8.0) + _closeness(home['weight'], away['weight'], 60.0)) / 2,
+        'minutes': _closeness(home['minutes'], away['minutes'], 24.0),
+        'form': _closeness(home['form'], away['form'], 25.0),
+    }
+
+
+@lru_cache(maxsize=None)
+def _permutations(m: int, n: int) -> np.ndarray:
+    return np.array(list(permutations(range(m), n)), dtype=np.intp).reshape(-1, n)
+
+
+def best_assignment(score: np.ndarray) -> list[tuple[int, int]]:
+    """(row, column) pairs of the one-to-one assignment with the highest total score.
+
+    Starting fives make this at most 5! = 120 candidate assignments, scored at once with numpy.
+    """
+    n, m = score.shape
+    if n == 0 or m == 0:
+        return []
+    if n > m:
+        return [(r, c) for c, r in best_assignment(score.T)]
+    perms = _permutations(m, n)
+    best = perms[score[np.arange(n), perms].sum(axis=1).argmax()]
+    return list(zip(range(n), best.tolist()))
+
+
+def _top_starters(team: pd.DataFrame) -> pd.DataFrame:
+    return team.sort_values(['minutes', 'player_id'], ascending=[False, True], na_position='last').head(STARTERS).reset_index(drop=True)
+
+
+def game_matchups(game, home: pd.DataFrame, away: pd.DataFrame, updated_at: str) -> list[dict]:
+    home, away = _top_starters(home), _top_starters(away)
+    fits = fit_matrices(home, away)
+    score = sum(WEIGHTS[k] * fits[k] for k in WEIGHTS)
+    pairs = best_assignment(score)
+    unmatched = [(r, None) for r in range(len(home)) if r not in {p[0] for p in pairs}]
+    unmatched += [(None, c) for c in range(len(away)) if c not in {p[1] for p in pairs}]
+
+    rows = []
+    for r, c in pairs + unmatched:
+        h = home.iloc[r] if r is not None else None
+        a = away.iloc[c] if c is not None else None
+        listed = h['position'] if h is not None and pd.notna(h['position']) else (a['position'] if a is not None else None)
+        coord = position_coord(h['position'] if h is not None else None)
+        if np.isnan(coord) and a is not None:
+            coord = position_coord(a['position'])
+        row = {
+            'game_id': str(game.game_id),
+            'position': listed if pd.notna(listed) else None,
+            'home_team_id': int(game.home_team_id),
+            'away_team_id': int(game.away_team_id),
+            'home_player_id': int(h['player_id']) if h is not None else None,
+            'away_player_id': int(a['player_id']) if a is not None else None,
+            'updated_at': updated_at,
+            '_order': (r is None or c is None, coord if not np.isnan(coord) else 9.0),
+        }
+        for key in WEIGHTS:
+            row[f'{key}_fit'] = round(float(fits[key][r, c]), 4) if r is not None and c is not None else None
+        row['score'] = round(float(score[r, c]), 4) if r is not None and c is not None else None
+        rows.append(row)
+    # Slots run guard to center, with any unpaired starter last.
+    rows.sort(key=lambda row: row.pop('_order'))
+    for slot, row in enumerate(rows, start=1):
+        row['slot'] = slot
+    return rows
+
+
+def build_matchups(slate: pd.DataFrame, starters: pd.DataFrame, updated_at: str) -> pd.DataFrame:
+    """Matchup rows for every game in `slate` with a known lineup on at least one side."""
+    teams = {int(team_id): group for team_id, group in starters.groupby('team_id')}
+    empty = starters.iloc[0:0]
+    rows = []
+    for game in slate.sort_values(['game_date', 'game_id']).itertuples(index=False):
+        home, away = teams.get(int(game.home_team_id), empty), teams.get(int(game.away_team_id), empty)
+        if home.empty and away.empty:
+            continue
+        rows.extend(game_matchups(game, home, away, updated_at))
+    out = pd.DataFrame(rows, columns=COLUMNS)
+    return out.astype({'home_player_id': 'Int64', 'away_player_id': 'Int64'})
+
+
+def refresh_matchups() -> int:
+    """Recompute matchups for every game from today through the end of the loaded schedule."""
+    params = {'today': etl_today().isoformat()}
+    slate = read_df(SLATE_SQL, params, name='matchup_slate')
+    starters = read_df(STARTERS_SQL, {**params, 'form_games': FORM_GAMES}, name='matchup_starters')
+    updated_at = now_iso()
+    matchups = build_matchups(slate, starters, updated_at)
+    with get_engine().begin() as conn:
+        conn.execute(statement(DELETE_SLATE_SQL), params)
+        written = bulk_upsert(conn, 'matchups', matchups, ['game_id', 'slot'], chunk_size=SETTINGS.bulk_chunk_size).rows
+        bump_version(conn, 'matchups', updated_at)
+    LOGGER.info('Built %s matchup rows for %s of %s games', written, matchups['game_id'].nunique(), len(slate))
+    return written
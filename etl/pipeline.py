@@ -0,0 +1,182 @@
+import importlib
+import logging
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
+from typing import Callable
+
+from app.metrics import METRICS, Profiler
+from db.bulk import track_writes
+
+LOGGER = logging.getLogger(__name__)
+
+# Canonical stage order; importing each module registers its stage via @stage.
+STAGE_MODULES = [
+    'etl.01_load_teams',
+    'etl.03_load_schedule',
+    'etl.02_load_rosters',
+    'etl.04_load_recent_games',
+    'etl.05_load_player_gamelogs',
+    'etl.06_load_lineups',
+    'etl.07_build_rolling_stats',
+    'etl.08_export_history',
+    'etl.09_build_matchups',
+    'etl.10_build_player_index',
+]
+
+
+@dataclass(frozen=True)
+class Stage:
+    name: str
+    func: Callable[[], int]
+    after: tuple[str, ...] = ()
+
+
+@dataclass
+class StageResult:
+    name: str
+    status: str = 'pending'
+    seconds: float = 0.0
+    rows: int = 0
+    inserted: int = 0
+    updated: int = 0
+    unchanged: int = 0
+    error: str | None = None
+
+
+@dataclass
+class PipelineReport:
+    results: list[StageResult] = field(default_factory=list)
+    seconds: float = 0.0
+
+    @property
+    def ok(self) -> bool:
+        return all(r.status == 'ok' for r in self.results)
+
+    def as_dict(self) -> dict:
+        return {
+            'ok': self.ok,
+            'seconds': round(self.seconds, 3),
+            'rows': sum(r.rows for r in self.results),
+            'stages': [{**r.__dict__, 'seconds': round(r.seconds, 3)} for r in self.results],
+        }
+
+
+class PipelineError(RuntimeError):
+    def __init__(self, report: PipelineReport):
+        failed = [r.name for r in report.results if r.status == 'failed']
+        super().__init__(f'ETL stages failed: {", ".join(failed)}')
+        self.report = report
+
+
+REGISTRY: dict[str, Stage] = {}
+
+
+def stage(name: str, after: tuple[str, ...] = ()):
+    def register(func: Callable[[], int]) -> Callable[[], int]:
+        REGISTRY[name] = Stage(name, func, tuple(after))
+        return func
+
+    return register
+
+
+def load_stages() -> dict[str, Stage]:
+    for module in STAGE_MODULES:
+        importlib.import_module(module)
+    rank = {module: idx for idx, module in enumerate(STAGE_MODULES)}
+    ordered = sorted(REGISTRY.values(), key=lambda s: rank.get(s.func.__module__, len(rank)))
+    return {s.name: s for s in ordered}
+
+
+def select_stages(stages: dict[str, Stage], only: list[str] | None = None, start_from: str | None = None) -> list[str]:
+    names = list(stages)
+    unknown = [n for n in (only or []) + ([start_from] if start_from else []) if n not in stages]
+    if unknown:
+        raise ValueError(f'Unknown ETL stages: {unknown}; expected one of {names}')
+    if only:
+        return [n for n in names if n in only]
+    if start_from:
+        return names[names.index(start_from):]
+    return names
+
+
+def _run_stage(stage_def: Stage, profiler: Profiler | None = None) -> StageResult:
+    result = StageResult(stage_def.name, status='running')
+    started = time.perf_counter()
+    try:
+        with track_writes() as writes, METRICS.span('etl_stage', stage=stage_def.name), (profiler or Profiler()).stage(stage_def.name):
+            result.rows = int(stage_def.func() or 0)
+        result.inserted = sum(w.inserted for w in writes)
+        result.updated = sum(w.updated for w in writes)
+        result.unchanged = sum(w.unchanged for w in writes)
+        METRICS.inc('etl_stage_rows_total', result.rows, stage=stage_def.name)
+        result.status = 'ok'
+    except Exception as exc:
+        LOGGER.exception('Stage %s failed', stage_def.name)
+        result.status = 'failed'
+        result.error = str(exc)
+    result.seconds = time.perf_counter() - started
+    return result
+
+
+def run_pipeline(
+    only: list[str] | None = None,
+    start_from: str | None = None,
+    max_workers: int = 3,
+    stages: dict[str, Stage] | None = None,
+    profiler: Profiler | None = None,
+    on_progress: Callable[[list[StageResult]], None] | None = None,
+) -> PipelineReport:
+    """Run the selected stages in-process, overlapping stages whose dependencies are satisfied.
+
+    Dependencies on stages outside the selection are treated as already satisfied.
+    `on_progress` receives every stage's result each time a stage starts or finishes.
+    """
+    stages = stages if stages is not None else load_stages()
+    selected = select_stages(stages, only, start_from)
+    results = {name: StageResult(name) for name in selected}
+    report = PipelineReport()
+    pending = list(selected)
+    running = {}
+    failed = False
+    started = time.perf_counter()
+
+    with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='etl-stage') as pool:
+        while pending or running:
+            if not failed:
+                for name in list(pending):
+                    deps = [d for d in stages[name].after if d in results]
+                    if all(results[d].status == 'ok' for d in deps):
+                        pending.remove(name)
+                        LOGGER.info('Starting stage %s', name)
+                        running[pool.submit(_run_stage, stages[name], profiler)] = name
+                        results[name].status = 'running'
+                        if on_progress:
+                            on_progress(list(results.values()))
+            if not running:
+                break
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                name = running.pop(future)
+                results[name] = future.result()
+                LOGGER.info('Finished stage %s in %.2fs (%s rows)', name, results[name].seconds, results[name].rows)
+                failed = failed or results[name].status == 'failed'
+                if on_progress:
+                    on_progress(list(results.values()))
+
+    for name in pending:
+        results[name].status = 'skipped'
+    report.results = [results[n] for n in selected]
+    report.seconds = time.perf_counter() - started
+    if not report.ok:
+        raise PipelineError(report)
+    return report
+
+
+def format_report(report: PipelineReport) -> str:
+    lines = [f"{'stage':<18}{'status':<10}{'seconds':>9}{'rows':>9}{'inserted':>10}{'updated':>9}{'unchanged':>11}"]
+    for r in report.results:
+        lines.append(f'{r.name:<18}{r.status:<10}{r.seconds:>9.2f}{r.rows:>9}{r.inserted:>10}{r.updated:>9}{r.unchanged:>11}')
+    totals = [sum(getattr(r, k) for r in report.results) for k in ('rows', 'inserted', 'updated', 'unchanged')]
+    lines.append(f"{'total':<28}{report.seconds:>9.2f}{totals[0]:>9}{totals[1]:>10}{totals[2]:>9}{totals[3]:>11}")
+    return '\n'.join(lines)
@@ -0,0 +1,75 @@
+import logging
+
+import pandas as pd
+
+from app.players import search_key
+from db.bulk import bulk_upsert
+from db.database import get_engine
+from db.query import read_df
+from db.versions import bump_version
+from etl.common import SETTINGS, now_iso, static_player_names
+
+LOGGER = logging.getLogger(__name__)
+
+COLUMNS = [
+    'player_id', 'full_name', 'search_name', 'team_id', 'team_abbreviation', 'position',
+    'games', 'first_game_date', 'last_game_date', 'updated_at',
+]
+
+# Every rostered player plus everyone with a stored game log (backfilled seasons included, named by
+# the players rows backfill adds), with the roster team or, failing that, the team of their latest game.
+SOURCE_SQL = """
+WITH logs AS (
+    SELECT player_id, COUNT(*) AS games, MIN(game_date) AS first_game_date, MAX(game_date) AS last_game_date
+    FROM player_game_stats
+    GROUP BY player_id
+),
+last_teams AS (
+    SELECT player_id, team_id
+    FROM (
+        SELECT player_id, team_id, ROW_NUMBER() OVER (PARTITION BY player_id ORDER BY game_date DESC, game_id DESC) AS game_rank
+        FROM player_game_stats
+    ) ranked
+    WHERE game_rank = 1
+),
+ids AS (
+    SELECT player_id FROM players
+    UNION
+    SELECT player_id FROM logs
+)
+SELECT ids.player_id, p.full_name, COALESCE(p.team_id, lt.team_id) AS team_id, t.abbreviation AS team_abbreviation,
+       p.position, COALESCE(l.games, 0) AS games, l.first_game_date, l.last_game_date
+FROM ids
+LEFT JOIN players p ON p.player_id = ids.player_id
+LEFT JOIN logs l ON l.player_id = ids.player_id
+LEFT JOIN last_teams lt ON lt.player_id = ids.player_id
+LEFT JOIN teams t ON t.team_id = COALESCE(p.team_id, lt.team_id)
+"""
+
+
+def build_index(source: pd.DataFrame, updated_at: str, known_names: dict[int, str] | None = None) -> pd.DataFrame:
+    """player_index rows; a player with no players row is named from `known_names`, else by id (an id search still finds them)."""
+    out = source.copy()
+    ids = out['player_id'].astype('int64')
+    names = out['full_name'].fillna(ids.map(known_names)) if known_names else out['full_name']
+    out['full_name'] = names.where(names.notna(), 'Player ' + ids.astype(str))
+    out['search_name'] = out['full_name'].map(search_key)
+    out['team_id'] = pd.to_numeric(out['team_id'], errors='coerce').astype('Int64')
+    out['games'] = out['games'].astype('int64')
+    out['updated_at'] = updated_at
+    return out[COLUMNS]
+
+
+def refresh_player_index() -> int:
+    """Rebuild the search index; unchanged players are skipped, so its data version only moves when one changed."""
+    updated_at = now_iso()
+    source = read_df(SOURCE_SQL, name='player_index_source')
+    # Only logs written before backfill added players rows lack a name; nba_api's static list fills most.
+    known_names = static_player_names() if source['full_name'].isna().any() else None
+    rows = build_index(source, updated_at, known_names)
+    with get_engine().begin() as conn:
+        result = bulk_upsert(conn, 'player_index', rows, ['player_id'], chunk_size=SETTINGS.bulk_chunk_size, detect_changes=True)
+        if result.rows:
+            bump_version(conn, 'player_index', updated_at)
+    LOGGER.info('Indexed %s players: %s inserted, %s updated, %s unchanged', len(rows), result.inserted, result.updated, result.unchanged)
+    return result.rows
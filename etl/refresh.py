@@ -0,0 +1,130 @@
+import logging
+import os
+import socket
+import threading
+from datetime import date, datetime, timedelta
+from typing import Callable
+
+from app.config import Settings, get_settings
+from app.metrics import METRICS
+from db.query import fetch_all
+from db.refresh import acquire_lease, claim_next, fail_orphaned_runs, finish_run, recent_runs, record_progress, release_lease, request_refresh
+from db.snapshot import publish_snapshot
+from etl.common import HTTP_CACHE
+from etl.pipeline import PipelineError, PipelineReport, StageResult, run_pipeline
+
+LOGGER = logging.getLogger(__name__)
+
+GAME_DAY_SQL = 'SELECT game_id FROM schedule WHERE game_date = :today LIMIT 1'
+
+
+def is_game_day(today: date) -> bool:
+    return bool(fetch_all(GAME_DAY_SQL, {'today': today.isoformat()}, name='game_day'))
+
+
+def refresh_interval(today: date, settings: Settings | None = None) -> timedelta:
+    settings = settings or get_settings()
+    minutes = settings.refresh_game_day_minutes if is_game_day(today) else settings.refresh_interval_minutes
+    return timedelta(minutes=minutes)
+
+
+def last_started() -> datetime | None:
+    started = next((r['started_at'] for r in recent_runs() if r['started_at'] is not None), None)
+    return datetime.fromisoformat(str(started)) if started is not None else None
+
+
+class RefreshService:
+    """The one process that runs ETL refreshes: on a cadence, and whenever the dashboard queues one.
+
+    It holds the `refresh` lease in service_leases while alive, so a second worker started by
+    mistake idles instead of running overlapping refreshes against the same database.
+    """
+
+    def __init__(self, runner: Callable[..., PipelineReport] = run_pipeline, owner: str | None = None, settings: Settings | None = None):
+        self.runner = runner
+        self.owner = owner or f'{socket.gethostname()}:{os.getpid()}'
+        self.settings = settings or get_settings()
+        self.stop_event = threading.Event()
+        self.holding = False
+        self.last_started: datetime | None = None
+
+    def hold_lease(self) -> bool:
+        held = acquire_lease(self.owner, self.settings.refresh_lease_seconds)
+        if held and not self.holding:
+            orphans = fail_orphaned_runs()
+            if orphans:
+                LOGGER.warning('Marked %s refresh run(s) left running by a stopped worker as failed', orphans)
+            self.last_started = last_started()
+            LOGGER.info('Refresh worker %s holds the lease', self.owner)
+        self.holding = held
+        return held
+
+    def due(self, now: datetime) -> bool:
+        if self.last_started is None:
+            return True
+        return now - self.last_started >= refresh_interval(self.settings.etl_today or date.today(), self.settings)
+
+    def tick(self) -> str | None:
+        """Run the queued refresh, or a scheduled one if it is due; returns the run id if one ran."""
+        if not self.hold_lease():
+            return None
+        if self.due(datetime.utcnow()):
+            request_refresh('schedule', self.owner)
+        run_id = claim_next()
+        if run_id is not None:
+            self.run(run_id)
+        return run_id
+
+    def run(self, run_id: str) -> str:
+        self.last_started = datetime.utcnow()
+
+        def progress(results: list[StageResult]) -> None:
+            running = ', '.join(r.name for r in results if r.status == 'running') or None
+            done = sum(r.status in ('ok', 'failed') for r in results)
+            try:
+                record_progress(run_id, running, done, len(results))
+            except Exception:
+                LOGGER.exception('Could not record progress of refresh %s', run_id)
+
+        LOGGER.info('Refresh %s started', run_id)
+        status, error = 'ok', None
+        try:
+            report = self.runner(on_progress=progress)
+        except PipelineError as exc:
+            report, status, error = exc.report, 'failed', str(exc)
+        except Exception as exc:
+            LOGGER.exception('Refresh %s failed', run_id)
+            report, status, error = PipelineReport(), 'failed', str(exc)
+        snapshot = None
+        if status == 'ok' and self.settings.db_snapshots:
+            try:
+                snapshot = publish_snapshot(self.settings).name
+            except Exception as exc:
+                LOGGER.exception('Refresh %s could not publish a snapshot', run_id)
+                status, error = 'failed', f'snapshot not published: {exc}'
+        summary = {**report.as_dict(), 'snapshot': snapshot}
+        finish_run(run_id, status, summary['rows'], error, summary)
+        HTTP_CACHE.maintain()
+        METRICS.write(self.settings.metrics_dir, 'etl', {'run': summary})
+        LOGGER.info('Refresh %s %s in %.1fs (%s rows)', run_id, status, summary['seconds'], summary['rows'])
+        return status
+
+    def _heartbeat(self) -> None:
+        # Renews the lease while a long refresh keeps the main loop busy.
+        while not self.stop_event.wait(self.settings.refresh_lease_seconds / 3):
+            if self.holding and not acquire_lease(self.owner, self.settings.refresh_lease_seconds):
+                LOGGER.warning('Refresh worker %s lost its lease', self.owner)
+                self.holding = False
+
+    def serve(self) -> None:
+        threading.Thread(target=self._heartbeat, name='refresh-lease', daemon=True).start()
+        try:
+            while not self.stop_event.is_set():
+                self.tick()
+                self.stop_event.wait(self.settings.refresh_poll_seconds)
+        finally:
+            self.stop_event.set()
+            release_lease(self.owner)
+
+    def stop(self) -> None:
+        self.stop_event.set()
@@ -0,0 +1,226 @@
+import hashlib
+import io
+import json
+import logging
+import random
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from datetime import datetime
+from pathlib import Path
+from typing import Callable
+from urllib.parse import parse_qsl, urlencode, urlsplit
+
+import requests
+import requests_cache
+from requests.adapters import BaseAdapter, HTTPAdapter
+from requests.structures import CaseInsensitiveDict
+from urllib3 import HTTPResponse
+
+LOGGER = logging.getLogger(__name__)
+
+STATS_PREFIX = 'https://stats.nba.com'
+MANIFEST = 'manifest.json'
+
+
+class FixtureMissing(LookupError):
+    pass
+
+
+def fixture_key(url: str) -> tuple[str, dict, str]:
+    """(endpoint, params, digest) for a stats URL; the digest ignores parameter order."""
+    parts = urlsplit(url)
+    endpoint = parts.path.rstrip('/').rsplit('/', 1)[-1].lower()
+    params = dict(sorted(parse_qsl(parts.query, keep_blank_values=True)))
+    digest = hashlib.sha1(f'{endpoint}?{urlencode(params)}'.encode()).hexdigest()[:16]
+    return endpoint, params, digest
+
+
+class FixtureStore:
+    """Recorded responses as <root>/<endpoint>/<digest>.json, plus a manifest of run context."""
+
+    def __init__(self, root: str | Path):
+        self.root = Path(root)
+
+    def path(self, endpoint: str, digest: str) -> Path:
+        return self.root / endpoint / f'{digest}.json'
+
+    def load(self, url: str) -> dict | None:
+        endpoint, _, digest = fixture_key(url)
+        path = self.path(endpoint, digest)
+        return json.loads(path.read_text()) if path.exists() else None
+
+    def save(self, url: str, status: int, body: str) -> None:
+        endpoint, params, digest = fixture_key(url)
+        path = self.path(endpoint, digest)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(json.dumps({'endpoint': endpoint, 'params': params, 'status': status, 'body': body}))
+
+    def manifest(self) -> dict:
+        path = self.root / MANIFEST
+        return json.loads(path.read_text()) if path.exists() else {}
+
+    def write_manifest(self, **context) -> None:
+        self.root.mkdir(parents=True, exist_ok=True)
+        payload = {**self.manifest(), **context, 'recorded_at': datetime.utcnow().isoformat()}
+        (self.root / MANIFEST).write_text(json.dumps(payload, indent=2, default=str))
+
+
+@dataclass
+class FaultConfig:
+    """Injected upstream behaviour; rates are per-request probabilities."""
+
+    latency_ms: float = 0.0
+    jitter_ms: float = 0.0
+    error_rate: float = 0.0
+    rate_limit_rate: float = 0.0
+    timeout_rate: float = 0.0
+    seed: int = 0
+
+
+@dataclass
+class TransportStats:
+    requests: int = 0
+    served: int = 0
+    recorded: int = 0
+    missing: int = 0
+    errors: int = 0
+    rate_limited: int = 0
+    timeouts: int = 0
+    by_endpoint: Counter = field(default_factory=Counter)
+
+    def as_dict(self) -> dict:
+        out = {k: v for k, v in self.__dict__.items() if k != 'by_endpoint'}
+        out['by_endpoint'] = dict(sorted(self.by_endpoint.items()))
+        return out
+
+
+def _response(request: requests.PreparedRequest, status: int, body: str, headers: dict | None = None) -> requests.Response:
+    content = body.encode('utf-8')
+    headers = {'Content-Type': 'application/json', **(headers or {})}
+    response = requests.Response()
+    response.status_code = status
+    response._content = content
+    response.encoding = 'utf-8'
+    response.headers = CaseInsensitiveDict(headers)
+    response.raw = HTTPResponse(io.BytesIO(content), headers=headers, status=status, preload_content=False, request_url=request.url)
+    response.url = request.url
+    response.request = request
+    response.reason = requests.status_codes._codes.get(status, ('',))[0].upper()
+    return response
+
+
+class ReplayAdapter(BaseAdapter):
+    """Serves stats.nba.com requests from a FixtureStore with injected latency and faults.
+
+    `responder(endpoint, params) -> dict` answers requests with no fixture (and the answer is
+    saved when `record` is set), which lets fixtures be synthesized without network.
+    """
+
+    def __init__(
+        self,
+        store: FixtureStore | None,
+        faults: FaultConfig | None = None,
+        responder: Callable[[str, dict], dict | None] | None = None,
+        record: bool = False,
+    ):
+        super().__init__()
+        self.store = store
+        self.faults = faults or FaultConfig()
+        self.responder = responder
+        self.record = record
+        self.stats = TransportStats()
+        self.rng = random.Random(self.faults.seed)
+        self.lock = threading.Lock()
+
+    def _draw(self) -> tuple[float, float]:
+        with self.lock:
+            return self.rng.random(), self.rng.uniform(-1, 1)
+
+    def send(self, request, stream=False, timeout=None, verify=True, cert=None, proxies=None):
+        endpoint, params, _ = fixture_key(request.url)
+        roll, jitter = self._draw()
+        delay = max(0.0, self.faults.latency_ms + jitter * self.faults.jitter_ms) / 1000
+        with self.lock:
+            self.stats.requests += 1
+            self.stats.by_endpoint[endpoint] += 1
+        if delay:
+            time.sleep(delay)
+
+        f = self.faults
+        if roll < f.timeout_rate:
+            self._count('timeouts')
+            raise requests.exceptions.ReadTimeout(f'Injected timeout for {endpoint}', request=request)
+        if roll < f.timeout_rate + f.error_rate:
+            self._count('errors')
+            return _response(request, 500, '<html>Internal Server Error</html>', {'Content-Type': 'text/html'})
+        if roll < f.timeout_rate + f.error_rate + f.rate_limit_rate:
+            self._count('rate_limited')
+            return _response(request, 429, '', {'Retry-After': '1'})
+
+        fixture = self.store.load(request.url) if self.store else None
+        if fixture is None and self.responder is not None:
+            payload = self.responder(endpoint, params)
+            if payload is not None:
+                fixture = {'status': 200, 'body': json.dumps(payload)}
+                if self.record and self.store:
+                    self.store.save(request.url, 200, fixture['body'])
+                    self._count('recorded')
+        if fixture is None:
+            self._count('missing')
+            raise FixtureMissing(f'No fixture for {endpoint} {params}')
+        self._count('served')
+        return _response(request, fixture['status'], fixture['body'])
+
+    def _count(self, name: str) -> None:
+        with self.lock:
+            setattr(self.stats, name, getattr(self.stats, name) + 1)
+
+    def close(self) -> None:
+        pass
+
+
+class RecordingAdapter(HTTPAdapter):
+    """Real HTTP transport that also writes every successful response to the store."""
+
+    def __init__(self, store: FixtureStore):
+        super().__init__()
+        self.store = store
+        self.stats = TransportStats()
+        self.lock = threading.Lock()
+
+    def send(self, request, **kwargs):
+        response = super().send(request, **kwargs)
+        endpoint = fixture_key(request.url)[0]
+        with self.lock:
+            self.stats.requests += 1
+            self.stats.by_endpoint[endpoint] += 1
+            if response.status_code == 200:
+                self.stats.recorded += 1
+        if response.status_code == 200:
+            self.store.save(request.url, response.status_code, response.text)
+        return response
+
+
+@contextmanager
+def mounted(adapter: BaseAdapter, prefix: str = STATS_PREFIX):
+    """Route every requests Session (nba_api uses requests.get) through `adapter` for `prefix`.
+
+    The HTTP cache is bypassed while mounted so each call reaches the adapter.
+    """
+    with requests_cache.disabled():
+        session_cls = requests.sessions.Session
+        original = session_cls.get_adapter
+
+        def get_adapter(session, url):
+            if url.lower().startswith(prefix):
+                return adapter
+            return original(session, url)
+
+        session_cls.get_adapter = get_adapter
+        try:
+            yield adapter
+        finally:
+            session_cls.get_adapter = original
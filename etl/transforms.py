@@ -1,5 +1,14 @@
 from typing import Any
 
+import pandas as pd
+
+TEAM_GAME_COLUMNS = ['game_id', 'team_id', 'game_date', 'matchup', 'wl', 'pts', 'reb', 'ast', 'tov', 'fg_pct', 'fg3_pct', 'plus_minus']
+PLAYER_GAME_COLUMNS = [
+    'game_id', 'player_id', 'team_id', 'game_date', 'matchup', 'minutes',
+    'pts', 'reb', 'ast', 'stl', 'blk', 'tov', 'fg_pct', 'fg3_pct', 'is_starter',
+]
+PLAYER_STUB_COLUMNS = ['player_id', 'full_name', 'team_id']
+
 
 def parse_team_game_row(row: Any) -> dict:
     return {
@@ -16,3 +25,134 @@ def parse_team_game_row(row: Any) -> dict:
         'fg3_pct': float(row.FG3_PCT),
         'plus_minus': float(row.PLUS_MINUS),
     }
+
+
+def _col(df: pd.DataFrame, name: str) -> pd.Series:
+    return df[name] if name in df.columns else pd.Series(pd.NA, index=df.index, dtype='object')
+
+
+def _ints(df: pd.DataFrame, name: str) -> pd.Series:
+    return pd.to_numeric(_col(df, name), errors='coerce').fillna(0).astype('int64')
+
+
+def _floats(df: pd.DataFrame, name: str) -> pd.Series:
+    return pd.to_numeric(_col(df, name), errors='coerce').fillna(0.0).astype('float64')
+
+
+def _text(df: pd.DataFrame, name: str) -> pd.Series:
+    return _col(df, name).astype('string').str.strip()
+
+
+def parse_minutes(values: pd.Series) -> pd.Series:
+    """Decimal minutes from numeric or 'MM:SS' values; unparseable entries become NaN."""
+    text = values.astype('string').str.strip()
+    parts = text.str.split(':', n=1, expand=True)
+    if parts.shape[1] == 1:
+        return pd.to_numeric(text, errors='coerce').astype('float64')
+    mins = pd.to_numeric(parts[0], errors='coerce')
+    secs = pd.to_numeric(parts[1], errors='coerce').fillna(0)
+    return (mins + secs / 60).astype('float64')
+
+
+def height_inches(value: Any) -> int | None:
+    """Inches from the stats API's feet-inches height ('6-7' -> 79); None when unparseable."""
+    feet, sep, inches = str(value if value is not None else '').strip().partition('-')
+    if not (sep and feet.isdigit() and inches.isdigit()):
+        return None
+    return int(feet) * 12 + int(inches)
+
+
+def whole_number(value: Any) -> int | None:
+    text = str(value if value is not None else '').strip()
+    return int(text) if text.isdigit() else None
+
+
+def _write_ready(out: pd.DataFrame, valid: pd.Series, updated_at: str | None) -> pd.DataFrame:
+    out = out[valid].reset_index(drop=True)
+    if updated_at is not None:
+        out['updated_at'] = updated_at
+    return out
+
+
+def normalize_team_games(games: pd.DataFrame, updated_at: str | None = None) -> pd.DataFrame:
+    """Columnar LeagueGameFinder/LeagueGameLog team rows -> team_game_stats rows."""
+    if games.empty:
+        return pd.DataFrame(columns=TEAM_GAME_COLUMNS)
+    df = games.rename(columns=str.lower)
+    game_date = pd.to_datetime(_col(df, 'game_date'), errors='coerce')
+    out = pd.DataFrame(
+        {
+            'game_id': _text(df, 'game_id').fillna(''),
+            'team_id': pd.to_numeric(_col(df, 'team_id'), errors='coerce').astype('Int64'),
+            'game_date': game_date.dt.strftime('%Y-%m-%d'),
+            'matchup': _col(df, 'matchup'),
+            'wl': _col(df, 'wl'),
+            'pts': _ints(df, 'pts'),
+            'reb': _ints(df, 'reb'),
+            'ast': _ints(df, 'ast'),
+            'tov': _ints(df, 'tov'),
+            'fg_pct': _floats(df, 'fg_pct'),
+            'fg3_pct': _floats(df, 'fg3_pct'),
+            'plus_minus': _floats(df, 'plus_minus'),
+        }
+    )
+    valid = game_date.notna() & (out['game_id'] != '') & out['team_id'].notna()
+    return _write_ready(out, valid, updated_at)
+
+
+def normalize_player_games(logs: pd.DataFrame, player_id: int | None = None, updated_at: str | None = None) -> pd.DataFrame:
+    """Columnar player game log rows -> player_game_stats rows.
+
+    `player_id` fills rows whose log lacks a PLAYER_ID (per-player endpoints). Rows without a
+    parseable date or a game id are dropped.
+    """
+    if logs.empty:
+        return pd.DataFrame(columns=PLAYER_GAME_COLUMNS)
+    df = logs.rename(columns=str.lower)
+    game_date = pd.to_datetime(_col(df, 'game_date'), errors='coerce')
+    ids = pd.to_numeric(_col(df, 'player_id'), errors='coerce')
+    if player_id is not None:
+        ids = ids.fillna(player_id)
+    minutes = parse_minutes(_col(df, 'min')).round(2)
+    out = pd.DataFrame(
+        {
+            'game_id': _text(df, 'game_id').fillna(''),
+            'player_id': ids.astype('Int64'),
+            'team_id': pd.to_numeric(_col(df, 'team_id'), errors='coerce').astype('Int64'),
+            'game_date': game_date.dt.strftime('%Y-%m-%d'),
+            'matchup': _col(df, 'matchup'),
+            'minutes': minutes,
+            'pts': _ints(df, 'pts'),
+            'reb': _ints(df, 'reb'),
+            'ast': _ints(df, 'ast'),
+            'stl': _ints(df, 'stl'),
+            'blk': _ints(df, 'blk'),
+            'tov': _ints(df, 'tov'),
+            'fg_pct': _floats(df, 'fg_pct'),
+            'fg3_pct': _floats(df, 'fg3_pct'),
+            'is_starter': (_text(df, 'start_position').fillna('') != '').astype(bool),
+        }
+    )
+    valid = game_date.notna() & (out['game_id'] != '') & out['player_id'].notna()
+    return _write_ready(out, valid, updated_at)
+
+
+def normalize_player_stubs(logs: pd.DataFrame, updated_at: str | None = None) -> pd.DataFrame:
+    """Columnar player game log rows -> one teamless players row per player, named from PLAYER_NAME.
+
+    Game logs reference players the roster stage never loaded (past seasons, waived players);
+    these rows give them a parent row. A log without a name falls back to 'Player <id>'.
+    """
+    if logs.empty:
+        return pd.DataFrame(columns=PLAYER_STUB_COLUMNS)
+    df = logs.rename(columns=str.lower)
+    ids = pd.to_numeric(_col(df, 'player_id'), errors='coerce').astype('Int64')
+    names = _text(df, 'player_name')
+    out = pd.DataFrame(
+        {
+            'player_id': ids,
+            'full_name': names.where(names.fillna('') != '', 'Player ' + ids.astype('string')),
+            'team_id': pd.Series(pd.NA, index=df.index, dtype='Int64'),
+        }
+    )
+    return _write_ready(out, ids.notna() & ~ids.duplicated(keep='last'), updated_at)
@@ -0,0 +1,105 @@
+import logging
+from datetime import date, datetime, timedelta
+
+import pandas as pd
+
+from db.query import fetch_all
+from etl.common import SETTINGS, etl_today, now_iso, upsert_rows
+
+LOGGER = logging.getLogger(__name__)
+
+LAST_PLAYED_SQL = """
+    SELECT team_id, MAX(game_date) AS last_played
+    FROM (
+        SELECT home_team_id AS team_id, game_date FROM schedule WHERE game_date < :today
+        UNION ALL
+        SELECT away_team_id AS team_id, game_date FROM schedule WHERE game_date < :today
+    ) played
+    GROUP BY team_id
+"""
+WATERMARKS_SQL = 'SELECT entity_id, watermark FROM etl_watermarks WHERE stage = :stage'
+TEAM_HIGH_WATER_SQL = 'SELECT team_id, MAX(game_date) FROM team_game_stats GROUP BY team_id'
+PLAYER_HIGH_WATER_SQL = 'SELECT player_id, MAX(game_date) FROM player_game_stats GROUP BY player_id'
+PLAYER_TEAMS_SQL = 'SELECT player_id, team_id FROM players'
+
+
+def load_watermarks(stage: str) -> dict[int, str]:
+    rows = fetch_all(WATERMARKS_SQL, {'stage': stage}, name='watermarks')
+    return {int(r[0]): str(r[1]) for r in rows}
+
+
+def save_watermarks(stage: str, entity_ids, watermark: str) -> None:
+    rows = [{'stage': stage, 'entity_id': int(e), 'watermark': watermark, 'updated_at': now_iso()} for e in entity_ids]
+    upsert_rows('etl_watermarks', rows, ['stage', 'entity_id'])
+
+
+def completed_through(today: date | None = None) -> str:
+    """Last calendar day whose games are final; the watermark saved after a successful fetch."""
+    return ((today or etl_today()) - timedelta(days=1)).isoformat()
+
+
+def team_last_played(today: date | None = None) -> dict[int, str]:
+    rows = fetch_all(LAST_PLAYED_SQL, {'today': (today or etl_today()).isoformat()}, name='team_last_played')
+    return {int(r[0]): str(r[1])[:10] for r in rows}
+
+
+def _high_water(stage: str, stored_sql: str) -> dict[int, str]:
+    marks = load_watermarks(stage)
+    for entity_id, latest in fetch_all(stored_sql, name='stored_high_water'):
+        if latest is not None:
+            marks[int(entity_id)] = max(marks.get(int(entity_id), ''), str(latest)[:10])
+    return marks
+
+
+def past_stored_games(rows: pd.DataFrame, key: str) -> pd.Series:
+    """Rows dated after their entity's latest stored game, so certainly not stored yet.
+
+    Only stored dates count: a saved watermark can run ahead of what was actually written.
+    """
+    if rows.empty:
+        return pd.Series(False, index=rows.index)
+    stored_sql = TEAM_HIGH_WATER_SQL if key == 'team_id' else PLAYER_HIGH_WATER_SQL
+    latest = {int(e): str(d)[:10] for e, d in fetch_all(stored_sql, name='stored_high_water') if d is not None}
+    return rows['game_date'] > rows[key].map(latest).fillna('')
+
+
+def select_stale(entity_ids: list[int], marks: dict[int, str], played: dict[int, str], team_of: dict | None = None) -> list[int]:
+    """Keep entities with no mark, or whose team last played after the entity's mark."""
+    stale = []
+    for entity_id in entity_ids:
+        team_id = team_of.get(entity_id) if team_of is not None else entity_id
+        if entity_id not in marks or played.get(team_id, '') > marks[entity_id]:
+            stale.append(entity_id)
+    return stale
+
+
+def stale_teams(team_ids: list[int], stage: str = 'recent_games', today: date | None = None) -> list[int]:
+    """Teams that have played since their high-water mark (or were never loaded)."""
+    if not SETTINGS.etl_incremental:
+        return list(team_ids)
+    marks = _high_water(stage, TEAM_HIGH_WATER_SQL)
+    stale = select_stale(team_ids, marks, team_last_played(today))
+    LOGGER.info('%s: %s/%s teams have new games', stage, len(stale), len(team_ids))
+    return stale
+
+
+def stale_players(player_ids: list[int], stage: str = 'player_gamelogs', today: date | None = None) -> list[int]:
+    """Players whose team has played since the player's high-water mark (or never loaded)."""
+    if not SETTINGS.etl_incremental:
+        return list(player_ids)
+    marks = _high_water(stage, PLAYER_HIGH_WATER_SQL)
+    team_of = {int(r[0]): r[1] for r in fetch_all(PLAYER_TEAMS_SQL, name='player_teams')}
+    stale = select_stale(player_ids, marks, team_last_played(today), team_of)
+    LOGGER.info('%s: %s/%s players have new games', stage, len(stale), len(player_ids))
+    return stale
+
+
+def stale_rosters(team_ids: list[int], stage: str = 'rosters') -> list[int]:
+    """Teams whose roster was last fetched more than ROSTER_REFRESH_HOURS ago."""
+    if not SETTINGS.etl_incremental:
+        return list(team_ids)
+    cutoff = (datetime.utcnow() - timedelta(hours=SETTINGS.roster_refresh_hours)).isoformat()
+    marks = load_watermarks(stage)
+    stale = [t for t in team_ids if marks.get(t, '') < cutoff]
+    LOGGER.info('%s: %s/%s rosters are due', stage, len(stale), len(team_ids))
+    return stale
@@ -0,0 +1,38 @@
+import argparse
+import sys
+
+from etl.backfill import backfill_status, run_backfill, season_range
+from etl.common import SCHEDULER, SETTINGS
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description='Load game logs for a range of seasons; reruns resume from the checkpoint table.')
+    parser.add_argument('--from-season', help='First season to load, e.g. 2015-16')
+    parser.add_argument('--to-season', default=SETTINGS.nba_season, help='Last season to load (default: NBA_SEASON)')
+    parser.add_argument('--only-failed', action='store_true', help='Retry failed units only; do not plan or run pending ones')
+    parser.add_argument('--max-attempts', type=int, help='Leave units that have failed this many times alone')
+    granularity = parser.add_mutually_exclusive_group()
+    granularity.add_argument('--bulk', dest='bulk', action='store_true', default=None, help='One league-wide unit per season')
+    granularity.add_argument('--per-team', dest='bulk', action='store_false', help='One unit per season and team')
+    parser.add_argument('--no-derived', action='store_true', help='Skip refreshing running totals, the history store and the player index')
+    parser.add_argument('--status', action='store_true', help='Print checkpoint progress and exit')
+    return parser.parse_args()
+
+
+if __name__ == '__main__':
+    args = parse_args()
+    if args.status:
+        print(backfill_status().to_string(index=False))
+        sys.exit(0)
+    if not args.from_season:
+        sys.exit('--from-season is required')
+    seasons = season_range(args.from_season, args.to_season)
+    report = run_backfill(seasons, bulk=args.bulk, only_failed=args.only_failed, max_attempts=args.max_attempts, derived=not args.no_derived)
+    SCHEDULER.log_summary()
+    print(
+        f'Backfilled {report.done}/{report.ran} units ({report.team_rows} team rows, {report.player_rows} player rows) '
+        f'in {report.seconds:.1f}s'
+    )
+    if report.failed:
+        print(f"{len(report.failed)} unit(s) failed; rerun to retry: {', '.join(report.failed)}")
+    sys.exit(1 if report.failed else 0)
@@ -0,0 +1,42 @@
+import argparse
+import sys
+import tempfile
+from pathlib import Path
+
+from db.explain import check_plans
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description='EXPLAIN every dashboard and ETL query; fail on full scans or temp sorts.')
+    parser.add_argument('--seed-seasons', type=int, help='Check a scratch database seeded with this many synthetic seasons')
+    parser.add_argument('--backend', choices=['sqlite', 'postgres'], default='sqlite', help='Backend for --seed-seasons')
+    parser.add_argument('--postgres-db', default='nba_plans', help='Scratch Postgres database (dropped and recreated)')
+    return parser.parse_args()
+
+
+def seed_scratch(args) -> None:
+    from benchmarks.datagen import generate_league
+    from benchmarks.run import configure, recreate_postgres_database, seed
+
+    if args.backend == 'sqlite':
+        configure('sqlite', sqlite_path=str(Path(tempfile.mkdtemp(prefix='nba_plans_')) / 'plans.db'))
+    else:
+        recreate_postgres_database(configure('postgres', postgres_db=args.postgres_db), args.postgres_db)
+    seed(generate_league(seasons=args.seed_seasons))
+
+
+if __name__ == '__main__':
+    args = parse_args()
+    if args.seed_seasons:
+        seed_scratch(args)
+    from db.database import get_engine
+
+    engine = get_engine()
+    results = check_plans(engine)
+    for name, issues in results.items():
+        print(f"{'FAIL' if issues else 'ok':<6}{name}")
+        for issue in issues:
+            print(f'      {issue.kind}: {issue.detail}')
+    failed = [name for name, issues in results.items() if issues]
+    print(f'{len(results) - len(failed)}/{len(results)} query plans clean')
+    sys.exit(1 if failed else 0)
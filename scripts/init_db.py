@@ -1,6 +1,24 @@
-from db.database import run_sql_file
+import argparse
+
+from db.migrate import migrate, pending_migrations
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description='Create or upgrade the database schema.')
+    parser.add_argument('--status', action='store_true', help='List pending migrations without applying them')
+    parser.add_argument('--target', type=int, help='Stop after this migration version')
+    return parser.parse_args()
 
 
 if __name__ == '__main__':
-    run_sql_file('db/init.sql')
-    print('Database initialized')
+    args = parse_args()
+    if args.status:
+        pending = pending_migrations()
+        for migration in pending:
+            print(f'pending  {migration.version:04d}_{migration.name}')
+        print(f'{len(pending)} pending migration(s)')
+    else:
+        applied = migrate(target=args.target)
+        for migration in applied:
+            print(f'applied  {migration.version:04d}_{migration.name}')
+        print(f'Database initialized ({len(applied)} migration(s) applied)')
@@ -0,0 +1,53 @@
+import argparse
+import signal
+import sys
+
+from db.refresh import refresh_status, release_lease, request_refresh
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description='Background ETL refresh worker: runs scheduled and dashboard-requested refreshes one at a time.')
+    mode = parser.add_mutually_exclusive_group()
+    mode.add_argument('--once', action='store_true', help='Run the queued or due refresh, if any, and exit')
+    mode.add_argument('--request', action='store_true', help='Queue a refresh for the running worker and exit')
+    mode.add_argument('--status', action='store_true', help='Print the running, queued and last refresh and exit')
+    return parser.parse_args()
+
+
+def print_status() -> None:
+    status = refresh_status()
+    print(f"worker: {status['worker'] or 'not running'}")
+    for label in ('running', 'queued', 'last'):
+        run = status[label]
+        if run:
+            detail = f"{run['status']} ({run['kind']}) requested {run['requested_at']}"
+            if run['stages_total']:
+                detail += f", {run['stages_done']}/{run['stages_total']} stages"
+            if run['error']:
+                detail += f", error: {run['error']}"
+            print(f'{label}: {detail}')
+
+
+if __name__ == '__main__':
+    args = parse_args()
+    if args.status:
+        print_status()
+        sys.exit(0)
+    if args.request:
+        print(f"Queued refresh {request_refresh(requested_by='cli')}")
+        sys.exit(0)
+
+    from etl.refresh import RefreshService
+
+    service = RefreshService()
+    if args.once:
+        if not service.hold_lease():
+            sys.exit('Another refresh worker holds the lease')
+        try:
+            run_id = service.tick()
+        finally:
+            release_lease(service.owner)
+        print(f'Ran refresh {run_id}' if run_id else 'Nothing queued or due')
+        sys.exit(0)
+    signal.signal(signal.SIGTERM, lambda *_: service.stop())
+    service.serve()
@@ -1,15 +1,113 @@
-import subprocess
+import argparse
+import json
+import sys
+from contextlib import nullcontext
+from datetime import date
+from pathlib import Path
+
+from app.metrics import METRICS, Profiler
+from db.snapshot import publish_snapshot
+from etl.common import HTTP_CACHE, SCHEDULER, SETTINGS, etl_today
+from etl.pipeline import PipelineError, PipelineReport, format_report, run_pipeline
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description='Run the ETL pipeline in-process.')
+    parser.add_argument('--only', help='Comma-separated stages to run (dependencies are not added)')
+    parser.add_argument('--from', dest='start_from', help='Run this stage and every stage after it')
+    parser.add_argument('--full', action='store_true', help='Ignore watermarks and refetch every scheduled entity')
+    parser.add_argument('--workers', type=int, default=3, help='Maximum stages running at once')
+    parser.add_argument('--report-json', help='Write the run report (timings, API calls, rows per stage) here')
+    parser.add_argument('--metrics-dir', default=SETTINGS.metrics_dir, help='Where etl.json and etl.prom metrics are written')
+    parser.add_argument('--profile', help="Comma-separated stages to profile, or 'all'")
+    parser.add_argument('--profile-mode', choices=['cprofile', 'sample'], default='cprofile', help='Deterministic or sampling profiler')
+    parser.add_argument('--no-publish', action='store_true', help='With DB_SNAPSHOTS on, leave the dashboard on its current snapshot')
+
+    fixtures = parser.add_argument_group('record/replay')
+    mode = fixtures.add_mutually_exclusive_group()
+    mode.add_argument('--record', metavar='DIR', help='Call the live API and save every response to DIR')
+    mode.add_argument('--replay', metavar='DIR', help='Serve API calls from fixtures in DIR (no network)')
+    fixtures.add_argument('--latency-ms', type=float, default=0.0, help='Injected latency per replayed call')
+    fixtures.add_argument('--jitter-ms', type=float, default=0.0, help='Uniform +/- jitter on the injected latency')
+    fixtures.add_argument('--error-rate', type=float, default=0.0, help='Fraction of replayed calls answered with HTTP 500')
+    fixtures.add_argument('--rate-limit-rate', type=float, default=0.0, help='Fraction answered with HTTP 429')
+    fixtures.add_argument('--timeout-rate', type=float, default=0.0, help='Fraction that raise a read timeout')
+    fixtures.add_argument('--seed', type=int, default=0, help='Seed for injected faults')
+    return parser.parse_args()
+
+
+def transport(args):
+    if not (args.record or args.replay):
+        return nullcontext()
+    from etl.replay import FaultConfig, FixtureStore, RecordingAdapter, ReplayAdapter, mounted
+
+    if args.record:
+        store = FixtureStore(args.record)
+        store.write_manifest(etl_today=etl_today().isoformat(), nba_season=SETTINGS.nba_season, etl_bulk_ingest=SETTINGS.etl_bulk_ingest)
+        return mounted(RecordingAdapter(store))
+    store = FixtureStore(args.replay)
+    manifest = store.manifest()
+    if manifest.get('etl_today'):
+        SETTINGS.etl_today = date.fromisoformat(manifest['etl_today'])
+    SETTINGS.nba_season = manifest.get('nba_season', SETTINGS.nba_season)
+    SETTINGS.etl_bulk_ingest = manifest.get('etl_bulk_ingest', SETTINGS.etl_bulk_ingest)
+    faults = FaultConfig(args.latency_ms, args.jitter_ms, args.error_rate, args.rate_limit_rate, args.timeout_rate, args.seed)
+    return mounted(ReplayAdapter(store, faults))
+
+
+def run_report(report: PipelineReport, adapter=None, cache_maintenance: dict | None = None) -> dict:
+    out = {**report.as_dict(), 'api': SCHEDULER.totals(), 'http_cache': HTTP_CACHE.summary()}
+    if cache_maintenance is not None:
+        out['http_cache_maintenance'] = cache_maintenance
+    if adapter is not None:
+        out['transport'] = adapter.stats.as_dict()
+    return out
+
+
+def format_api(summary: dict) -> str:
+    api = summary['api']
+    line = f"API calls {api['calls']} (retries {api['retries']}, throttled {api['throttled']}), blocked in limiter {api['wait_s']:.2f}s (summed over workers)"
+    if 'transport' in summary:
+        t = summary['transport']
+        line += (
+            f"\nTransport: {t['requests']} requests, {t['served']} served, {t['recorded']} recorded, {t['missing']} missing, "
+            f"{t['errors']} errors, {t['rate_limited']} rate limited, {t['timeouts']} timeouts"
+        )
+    for endpoint, c in summary['http_cache'].items():
+        line += (
+            f"\nHTTP cache {endpoint}: {c['hits']} hits / {c['misses']} misses ({c['hit_rate']:.0%}), "
+            f"{c['bytes_from_cache'] / 1e6:.1f} MB from cache, {c['bytes_fetched'] / 1e6:.1f} MB fetched"
+        )
+    return line
 
-SCRIPTS = [
-    'etl/01_load_teams.py',
-    'etl/03_load_schedule.py',
-    'etl/02_load_rosters.py',
-    'etl/04_load_recent_games.py',
-    'etl/05_load_player_gamelogs.py',
-    'etl/06_load_lineups.py',
-]
 
 if __name__ == '__main__':
-    for script in SCRIPTS:
-        print(f'Running {script}')
-        subprocess.run(['python', script], check=True)
+    args = parse_args()
+    if args.full:
+        SETTINGS.etl_incremental = False
+    only = [s.strip() for s in args.only.split(',') if s.strip()] if args.only else None
+    profiler = None
+    if args.profile:
+        profiler = Profiler(frozenset(s.strip() for s in args.profile.split(',')), args.profile_mode, SETTINGS.profile_dir)
+    exit_code = 0
+    HTTP_CACHE.install()  # before the transport: --record/--replay bypass the cache only if it is already installed
+    with transport(args) as adapter:
+        try:
+            report = run_pipeline(only=only, start_from=args.start_from, max_workers=args.workers, profiler=profiler)
+        except PipelineError as exc:
+            report = exc.report
+            print(exc)
+            exit_code = 1
+    SCHEDULER.log_summary()
+    summary = run_report(report, adapter, HTTP_CACHE.maintain())
+    if SETTINGS.db_snapshots and not exit_code and not args.no_publish:
+        snapshot = publish_snapshot(SETTINGS)
+        summary['snapshot'] = snapshot.name
+        print(f'Published snapshot {snapshot.name} in {snapshot.seconds:.2f}s')
+    print(format_report(report))
+    print(format_api(summary))
+    if args.report_json:
+        Path(args.report_json).write_text(json.dumps(summary, indent=2))
+    json_path, prom_path = METRICS.write(args.metrics_dir, 'etl', {'run': summary})
+    print(f'Metrics written to {json_path} and {prom_path}')
+    sys.exit(exit_code)
@@ -0,0 +1,102 @@
+import pandas as pd
+import pytest
+from sqlalchemy import create_engine, event, text
+
+import db.query
+import etl.backfill as backfill
+from db.migrate import migrate
+
+
+@pytest.fixture
+def engine(tmp_path, monkeypatch):
+    # A file database: units run on scheduler threads, which would each see their own in-memory one.
+    engine = create_engine(f"sqlite:///{tmp_path / 'backfill.db'}")
+    migrate(engine)
+    monkeypatch.setattr(backfill, 'get_engine', lambda: engine)
+    monkeypatch.setattr(db.query, 'get_engine', lambda: engine)
+    return engine
+
+
+def fake_fetch(calls: list, fail: set):
+    def fetch(unit):
+        calls.append(unit)
+        if unit in fail:
+            fail.discard(unit)
+            raise RuntimeError('read timeout')
+        start = int(unit.season[:4])
+        game = f'{start}{unit.team_id:02d}'
+        team = pd.DataFrame({'GAME_ID': [game], 'TEAM_ID': [unit.team_id], 'GAME_DATE': [f'{start}-11-01'], 'PTS': [100]})
+        players = pd.DataFrame(
+            {
+                'GAME_ID': game,
+                'PLAYER_ID': [unit.team_id * 10, unit.team_id * 10 + 1],
+                'PLAYER_NAME': [f'Guard {unit.team_id}', f'Forward {unit.team_id}'],
+                'TEAM_ID': unit.team_id,
+                'GAME_DATE': f'{start}-11-01',
+                'MIN': '30:00',
+                'PTS': [20, 10],
+            }
+        )
+        return team, players
+
+    return fetch
+
+
+def test_season_range():
+    assert backfill.season_range('2022-23', '2024-25') == ['2022-23', '2023-24', '2024-25']
+    with pytest.raises(ValueError):
+        backfill.season_range('2024-26', '2025-26')
+    with pytest.raises(ValueError):
+        backfill.season_range('2024-25', '2023-24')
+
+
+def test_rerun_resumes_and_retries_only_failed_units(engine, monkeypatch):
+    calls, flaky = [], {backfill.Unit('2023-24', 2)}
+    monkeypatch.setattr(backfill, 'fetch_unit', fake_fetch(calls, flaky))
+    seasons = ['2023-24', '2024-25']
+
+    first = backfill.run_backfill(seasons, team_ids=[1, 2], bulk=False, derived=False)
+    assert (first.planned, first.ran, first.done, first.failed) == (4, 4, 3, ['2023-24/2'])
+    with engine.connect() as conn:
+        error, attempts = conn.execute(text("SELECT error, attempts FROM backfill_units WHERE status = 'failed'")).one()
+        assert 'read timeout' in error and attempts == 1
+        assert conn.execute(text('SELECT COUNT(*) FROM player_game_stats')).scalar() == 6
+
+    calls.clear()
+    second = backfill.run_backfill(seasons, team_ids=[1, 2], bulk=False, derived=False)
+    assert calls == [backfill.Unit('2023-24', 2)]
+    assert (second.ran, second.done, second.failed) == (1, 1, [])
+    status = backfill.backfill_status()
+    assert set(status['status']) == {'done'} and status['units'].sum() == 4
+    with engine.connect() as conn:
+        assert conn.execute(text('SELECT COUNT(*) FROM team_game_stats')).scalar() == 4
+
+    calls.clear()
+    assert backfill.run_backfill(seasons, team_ids=[1, 2], bulk=False, derived=False).ran == 0
+    assert calls == []
+
+
+def test_max_attempts_parks_repeatedly_failing_units(engine, monkeypatch):
+    monkeypatch.setattr(backfill, 'fetch_unit', fake_fetch([], {backfill.Unit('2024-25', 0)}))
+    assert backfill.run_backfill(['2024-25'], bulk=True, derived=False).failed == ['2024-25/league']
+    assert backfill.run_backfill(['2024-25'], bulk=True, only_failed=True, max_attempts=1, derived=False).ran == 0
+    assert backfill.run_backfill(['2024-25'], bulk=True, only_failed=True, derived=False).done == 1
+
+
+def test_units_add_unrostered_players_before_their_logs(engine, monkeypatch):
+    event.listen(engine, 'connect', lambda dbapi_conn, _: dbapi_conn.execute('PRAGMA foreign_keys=ON'))
+    engine.dispose()
+    with engine.begin() as conn:
+        conn.execute(text("INSERT INTO teams (team_id, name, abbreviation) VALUES (1, 'Hawks', 'ATL'), (2, 'Celtics', 'BOS')"))
+        conn.execute(text("INSERT INTO players (player_id, full_name, team_id, position) VALUES (10, 'Trae Young', 1, 'G')"))
+    monkeypatch.setattr(backfill, 'fetch_unit', fake_fetch([], set()))
+
+    assert backfill.run_backfill(['2019-20', '2020-21'], team_ids=[1, 2], bulk=False, derived=False).failed == []
+    with engine.connect() as conn:
+        orphans = conn.execute(
+            text('SELECT COUNT(*) FROM player_game_stats g LEFT JOIN players p ON p.player_id = g.player_id WHERE p.player_id IS NULL')
+        ).scalar()
+        assert orphans == 0 and conn.execute(text('SELECT COUNT(*) FROM player_game_stats')).scalar() == 8
+        players = conn.execute(text('SELECT player_id, full_name, team_id FROM players ORDER BY player_id')).all()
+    # The roster row keeps its name and team; everyone else is added by name with no current team.
+    assert [tuple(p) for p in players] == [(10, 'Trae Young', 1), (11, 'Forward 1', None), (20, 'Guard 2', None), (21, 'Forward 2', None)]
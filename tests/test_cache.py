@@ -0,0 +1,48 @@
+import pandas as pd
+from sqlalchemy import create_engine, text
+
+from app.cache import VersionedCache
+from db.versions import bump_version
+
+
+def test_cache_reuses_results_until_table_version_changes():
+    versions = {'team_game_stats': (1, 't1')}
+    cache = VersionedCache(lambda: dict(versions), version_ttl_seconds=0)
+    calls = []
+
+    @cache.cached('team_game_stats')
+    def team_last5(team_id):
+        calls.append(team_id)
+        return pd.DataFrame({'pts': [100 + len(calls)]})
+
+    first = team_last5(1)
+    first['pts'] = 0
+    assert team_last5(1)['pts'].iloc[0] == 101
+    versions['team_game_stats'] = (2, 't2')
+    assert team_last5(1)['pts'].iloc[0] == 102
+    assert calls == [1, 1]
+    assert cache.stats()['hits'] == 1
+    assert cache.stats()['misses'] == 2
+
+
+def test_cache_bypasses_when_versions_unavailable():
+    cache = VersionedCache(lambda: None, version_ttl_seconds=0)
+
+    @cache.cached('lineups')
+    def lookup():
+        return 1
+
+    lookup()
+    lookup()
+    assert cache.stats() == {'hits': 0, 'misses': 2, 'entries': 0}
+
+
+def test_bump_version_increments_per_table():
+    engine = create_engine('sqlite://')
+    with engine.begin() as conn:
+        conn.execute(text('CREATE TABLE data_versions (table_name TEXT PRIMARY KEY, version INTEGER NOT NULL DEFAULT 0, updated_at TIMESTAMP)'))
+        bump_version(conn, 'teams', 'a')
+        bump_version(conn, 'teams', 'b')
+        bump_version(conn, 'players', 'c')
+        rows = conn.execute(text('SELECT table_name, version, updated_at FROM data_versions ORDER BY table_name')).fetchall()
+    assert [tuple(r) for r in rows] == [('players', 1, 'c'), ('teams', 2, 'b')]
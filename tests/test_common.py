@@ -0,0 +1,33 @@
+import pandas as pd
+import requests_cache
+
+import etl.common as common
+from etl.common import recent_by_entity
+from etl.http_cache import HttpCache
+
+
+def test_recent_by_entity_trims_each_partition():
+    df = pd.DataFrame(
+        {
+            'TEAM_ID': [1, 1, 1, 2, 2, 3],
+            'GAME_ID': ['a', 'b', 'c', 'd', 'e', 'f'],
+            'GAME_DATE': pd.to_datetime(['2025-01-01', '2025-01-03', '2025-01-02', '2025-01-05', '2025-01-04', '2025-01-01']),
+        }
+    )
+    out = recent_by_entity(df, 'TEAM_ID', last_n=2, entity_ids=[1, 2])
+    assert sorted(out['GAME_ID']) == ['b', 'c', 'd', 'e']
+    assert out.groupby('TEAM_ID').size().max() == 2
+
+
+def test_first_api_call_installs_the_http_cache(tmp_path, monkeypatch):
+    cache = HttpCache(str(tmp_path / 'cache' / 'nba_api_cache'))
+    installs = []
+    original = HttpCache.install
+    monkeypatch.setattr(HttpCache, 'install', lambda self: installs.append(self) or original(self))
+    monkeypatch.setattr(common, 'HTTP_CACHE', cache)
+    try:
+        assert not requests_cache.is_installed()
+        assert [common.safe_call(lambda n: n * 2, n) for n in (1, 2)] == [2, 4]
+        assert requests_cache.is_installed() and installs == [cache]
+    finally:
+        requests_cache.uninstall_cache()
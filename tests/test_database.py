@@ -0,0 +1,20 @@
+from sqlalchemy import text
+
+from app.config import Settings
+from db.database import build_engine, get_engine
+
+
+def test_sqlite_engine_applies_pragmas(tmp_path):
+    settings = Settings(sqlite_path=str(tmp_path / 'nba.db'), sqlite_busy_timeout_ms=1234)
+    engine = build_engine(settings.database_url(), settings)
+    with engine.connect() as conn:
+        assert conn.execute(text('PRAGMA journal_mode')).scalar().lower() == 'wal'
+        assert conn.execute(text('PRAGMA busy_timeout')).scalar() == 1234
+        assert conn.execute(text('PRAGMA synchronous')).scalar() == 1
+    engine.dispose()
+
+
+def test_get_engine_is_cached_per_url(tmp_path):
+    url = f"sqlite:///{tmp_path / 'other.db'}"
+    assert get_engine(url) is get_engine(url)
+    assert get_engine(url) is not get_engine()
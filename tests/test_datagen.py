@@ -0,0 +1,20 @@
+from benchmarks.datagen import generate_league
+from benchmarks.run import compare
+from etl.transforms import normalize_player_games, normalize_team_games
+
+
+def test_generated_logs_normalize_cleanly():
+    league = generate_league(teams=4, players_per_team=13)
+    team_rows = normalize_team_games(league.team_logs)
+    player_rows = normalize_player_games(league.player_logs)
+    assert len(team_rows) == len(league.team_logs) == 4 * 41 * 2
+    assert len(player_rows) == len(league.player_logs)
+    assert player_rows.groupby(['game_id', 'team_id'])['is_starter'].sum().eq(5).all()
+    assert set(league.schedule['home_team_id']) <= set(league.teams['team_id'])
+    assert generate_league(teams=4).player_logs.equals(generate_league(teams=4).player_logs)
+
+
+def test_compare_flags_only_meaningful_regressions():
+    baseline = {'fast': 0.0001, 'slow': 0.100}
+    results = {'fast': 0.0005, 'slow': 0.200, 'other': 1.0}
+    assert compare(results, baseline, threshold=0.25, min_delta_ms=1.0) == ['slow: 200.00ms vs baseline 100.00ms']
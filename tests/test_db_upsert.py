@@ -1,5 +1,9 @@
 import sqlite3
 
+import pandas as pd
+from sqlalchemy import create_engine, text
+
+from db.bulk import bulk_upsert, row_hashes
 from db.sqlite_utils import upsert_sqlite_rows
 
 
@@ -19,3 +23,58 @@ def test_upsert_rows_sqlite():
 
     row = conn.execute('SELECT team_id, name, abbreviation FROM teams WHERE team_id=1').fetchone()
     assert row == (1, 'B', 'BBB')
+
+
+def test_bulk_upsert_sqlite_accepts_frames_and_iterators():
+    engine = create_engine('sqlite://')
+    with engine.begin() as conn:
+        conn.execute(text('CREATE TABLE teams (team_id INTEGER PRIMARY KEY, name TEXT, abbreviation TEXT)'))
+        frame = pd.DataFrame({'team_id': [1, 2, 3], 'name': ['A', 'B', None], 'abbreviation': ['AAA', 'BBB', 'CCC']})
+        first = bulk_upsert(conn, 'teams', frame, ['team_id'], chunk_size=2)
+        second = bulk_upsert(conn, 'teams', iter([{'team_id': 2, 'name': 'B2', 'abbreviation': 'B22'}]), ['team_id'])
+        empty = bulk_upsert(conn, 'teams', [], ['team_id'])
+        rows = conn.execute(text('SELECT team_id, name, abbreviation FROM teams ORDER BY team_id')).fetchall()
+
+    assert (first.rows, second.rows, empty.rows) == (3, 1, 0)
+    assert [tuple(r) for r in rows] == [(1, 'A', 'AAA'), (2, 'B2', 'B22'), (3, None, 'CCC')]
+
+
+def test_bulk_upsert_skips_unchanged_rows():
+    engine = create_engine('sqlite://')
+    with engine.begin() as conn:
+        conn.execute(text('CREATE TABLE lineups (game_id TEXT, team_id INTEGER, player_id INTEGER, minutes REAL, updated_at TEXT, row_hash BIGINT, '
+                          'PRIMARY KEY (game_id, team_id, player_id))'))
+        rows = pd.DataFrame({'game_id': ['g1', 'g1', 'g1'], 'team_id': [1, 1, 1], 'player_id': [10, 11, 12], 'minutes': [30.0, 25.0, None], 'updated_at': 'first'})
+        first = bulk_upsert(conn, 'lineups', rows, ['game_id', 'team_id', 'player_id'], detect_changes=True)
+        again = rows.assign(updated_at='second')
+        again.loc[1, 'minutes'] = 26.0
+        again = pd.concat([again, pd.DataFrame([{'game_id': 'g2', 'team_id': 1, 'player_id': 10, 'minutes': 31.0, 'updated_at': 'second'}])])
+        second = bulk_upsert(conn, 'lineups', again, ['game_id', 'team_id', 'player_id'], detect_changes=True)
+        stamps = conn.execute(text('SELECT game_id, player_id, updated_at FROM lineups ORDER BY game_id, player_id')).fetchall()
+
+    assert (first.inserted, first.updated, first.unchanged, first.rows) == (3, 0, 0, 3)
+    assert (second.inserted, second.updated, second.unchanged, second.rows) == (1, 1, 2, 2)
+    assert [tuple(r) for r in stamps] == [('g1', 10, 'first'), ('g1', 11, 'second'), ('g1', 12, 'first'), ('g2', 10, 'second')]
+    # Integral floats and ints hash alike, so a dtype change alone does not rewrite rows.
+    ints, floats = pd.DataFrame({'pts': [12, 7]}), pd.DataFrame({'pts': [12.0, 7.0]})
+    assert row_hashes(ints, ['pts']).tolist() == row_hashes(floats, ['pts']).tolist()
+
+
+def test_bulk_upsert_known_new_rows_skip_the_stored_hash_lookup():
+    engine = create_engine('sqlite://')
+    with engine.begin() as conn:
+        conn.execute(text('CREATE TABLE lineups (game_id TEXT, team_id INTEGER, player_id INTEGER, minutes REAL, updated_at TEXT, row_hash BIGINT, '
+                          'PRIMARY KEY (game_id, team_id, player_id))'))
+        rows = pd.DataFrame({'game_id': ['g1', 'g1', 'g2'], 'team_id': [1, 2, 1], 'player_id': [10, 20, 10], 'minutes': [30.0, 20.0, 31.0], 'updated_at': 'first'})
+        bulk_upsert(conn, 'lineups', rows, ['game_id', 'team_id', 'player_id'], detect_changes=True)
+        lookups = []
+        conn.connection.driver_connection.set_trace_callback(lambda sql: lookups.append(sql) if sql.startswith('SELECT') else None)
+        again = pd.concat([rows.iloc[:1], pd.DataFrame([{'game_id': 'g3', 'team_id': 1, 'player_id': 10, 'minutes': 28.0, 'updated_at': 'second'}])], ignore_index=True)
+        partial = bulk_upsert(conn, 'lineups', again, ['game_id', 'team_id', 'player_id'], detect_changes=True, known_new=pd.Series([False, True]))
+        fresh = bulk_upsert(conn, 'lineups', again.iloc[1:].assign(game_id='g4'), ['game_id', 'team_id', 'player_id'], detect_changes=True,
+                            known_new=pd.Series(True, index=[1]))
+
+    assert (partial.inserted, partial.unchanged, partial.rows) == (1, 1, 1)
+    assert (fresh.inserted, fresh.rows) == (1, 1)
+    # One probe on the leading key column for the partial batch, none for the all-new one.
+    assert lookups == ["SELECT game_id, team_id, player_id, row_hash FROM lineups WHERE game_id IN ('g1')"]
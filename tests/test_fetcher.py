@@ -0,0 +1,34 @@
+import time
+
+import requests
+
+from etl.fetcher import FetchScheduler, TokenBucket
+
+
+def test_token_bucket_allows_burst_then_paces():
+    bucket = TokenBucket(rate=50, burst=3)
+    assert [bucket.acquire() for _ in range(3)] == [0.0, 0.0, 0.0]
+    started = time.monotonic()
+    bucket.acquire()
+    assert time.monotonic() - started >= 0.015
+
+
+def test_scheduler_map_preserves_order_and_backs_off_on_throttle():
+    bucket = TokenBucket(rate=1000, burst=10)
+    scheduler = FetchScheduler(bucket, max_workers=4, cooldown_seconds=0, retry_min_seconds=0, retry_max_seconds=0)
+    attempts = {}
+
+    def flaky_fetch(item):
+        attempts[item] = attempts.get(item, 0) + 1
+        if item == 2 and attempts[item] == 1:
+            raise requests.exceptions.Timeout('slow down')
+        return item * 10
+
+    results = scheduler.map(lambda item: scheduler.call(flaky_fetch, item), [1, 2, 3])
+
+    assert results == [10, 20, 30]
+    stats = scheduler.summary()['flaky_fetch']
+    assert stats['calls'] == 4
+    assert stats['retries'] == 1
+    assert stats['throttled'] == 1
+    assert bucket.rate < bucket.max_rate
@@ -0,0 +1,56 @@
+import pandas as pd
+import pyarrow.compute as pc
+import pytest
+
+from app.stats import season_history
+from db.history import HistoryStore
+from etl.history import season_bounds
+
+
+def player_rows(player_id: int, dates: list[str], pts: list[int]) -> pd.DataFrame:
+    return pd.DataFrame(
+        {
+            'game_id': [f'g{player_id}-{d}' for d in dates],
+            'player_id': player_id,
+            'game_date': dates,
+            'minutes': ['30', 20.5, None][: len(dates)],
+            'pts': pts,
+            'reb': 5,
+            'is_starter': 1,
+        }
+    )
+
+
+@pytest.mark.parametrize('fmt', ['arrow', 'parquet'])
+def test_partitions_are_pruned_and_replaced(tmp_path, fmt):
+    store = HistoryStore(tmp_path, fmt)
+    store.write_partition('player_game_stats', '2023-24', 1, player_rows(7, ['2023-11-01', '2024-01-01'], [10, 20]))
+    store.write_partition('player_game_stats', '2024-25', 1, player_rows(7, ['2024-11-01'], [30]))
+    store.write_partition('player_game_stats', '2024-25', 2, player_rows(8, ['2024-11-02'], [40]))
+
+    data = store.read('player_game_stats', columns=['season', 'team_id', 'pts', 'minutes'], seasons=['2024-25'], team_ids=[1])
+    assert data.to_pylist() == [{'season': '2024-25', 'team_id': 1, 'pts': 30, 'minutes': 30.0}]
+    assert str(data.schema.field('pts').type) == 'int16'
+
+    store.write_partition('player_game_stats', '2024-25', 1, player_rows(7, ['2024-11-01', '2024-11-03'], [31, 5]))
+    assert store.read('player_game_stats', columns=['pts'], where=pc.field('player_id') == 7).num_rows == 4
+
+
+def test_season_history_aggregates_per_season(tmp_path):
+    store = HistoryStore(tmp_path)
+    store.write_partition('player_game_stats', '2023-24', 1, player_rows(7, ['2023-11-01', '2024-01-01'], [10, 20]))
+    store.write_partition('player_game_stats', '2024-25', 2, player_rows(7, ['2024-11-01'], [30]))
+    store.write_partition('player_game_stats', '2024-25', 3, player_rows(9, ['2024-11-01'], [99]))
+
+    out = season_history('player', 7, store=store)
+    assert out['season'].tolist() == ['2024-25', '2023-24']
+    assert out['games'].tolist() == [1, 2]
+    assert out['pts'].tolist() == [30.0, 15.0]
+
+
+def test_empty_store_reads_as_empty(tmp_path):
+    assert season_history('team', 1, store=HistoryStore(tmp_path)).empty
+
+
+def test_season_bounds():
+    assert season_bounds('2024-25') == ('2024-10-01', '2025-10-01')
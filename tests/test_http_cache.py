@@ -0,0 +1,44 @@
+from datetime import date
+
+from requests_cache import NEVER_EXPIRE
+
+from etl.http_cache import CachePolicy, HttpCache, PolicySession
+from etl.replay import STATS_PREFIX, ReplayAdapter
+
+SCOREBOARD = 'https://stats.nba.com/stats/scoreboardv2'
+
+
+def policy() -> CachePolicy:
+    return CachePolicy(today=lambda: date(2025, 3, 10), current_season=lambda: '2024-25')
+
+
+def test_policy_ttl_by_endpoint_and_parameters():
+    p = policy()
+    assert p.expire_after('scoreboardv2', {'GameDate': '03/01/2025'}) == NEVER_EXPIRE
+    assert p.expire_after('scoreboardv2', {'GameDate': '03/09/2025'}) == p.live_seconds
+    assert p.expire_after('scoreboardv2', {'GameDate': '03/10/2025'}) == p.live_seconds
+    assert p.expire_after('scoreboardv2', {'GameDate': '03/14/2025'}) == p.schedule_seconds
+    assert p.expire_after('leaguegamelog', {'Season': '2023-24'}) == NEVER_EXPIRE
+    assert p.expire_after('leaguegamelog', {'Season': '2024-25'}) == p.season_seconds
+    assert p.expire_after('commonteamroster', {'Season': '2024-25'}) == p.roster_seconds
+
+
+def test_hit_metrics_and_lru_eviction(tmp_path):
+    cache = HttpCache(str(tmp_path / 'http'), policy())
+    PolicySession.http_cache = cache
+    try:
+        session = PolicySession(cache_name=cache.cache_name, backend='sqlite')
+        session.mount(STATS_PREFIX, ReplayAdapter(None, responder=lambda endpoint, params: {'day': params['GameDate']}))
+        for day in ['03/01/2025', '03/02/2025', '03/01/2025']:
+            session.get(SCOREBOARD, params=[('GameDate', day)])
+        session.close()
+    finally:
+        PolicySession.http_cache = None
+
+    stats = cache.summary()['scoreboardv2']
+    assert (stats['hits'], stats['misses']) == (1, 2)
+    assert stats['bytes_from_cache'] > 0
+
+    cache.max_bytes = 1
+    result = cache.maintain()
+    assert result['evicted'] == 2 and result['compacted']
@@ -0,0 +1,41 @@
+import importlib
+
+import pandas as pd
+from sqlalchemy import create_engine, text
+
+from db.migrate import migrate
+
+lineups = importlib.import_module('etl.06_load_lineups')
+
+
+def seeded_engine():
+    engine = create_engine('sqlite://')
+    migrate(engine)
+    with engine.begin() as conn:
+        conn.execute(text("INSERT INTO schedule (game_id, game_date, home_team_id, away_team_id) VALUES ('g9', '2025-01-10', 1, 2)"))
+        rows = []
+        for player in range(1, 8):
+            # Team 1: latest game g2 has five official starters; older g1 is ignored.
+            rows.append(('g1', 100 + player, 1, '2025-01-01', '40', 1))
+            rows.append(('g2', 100 + player, 1, '2025-01-03', str(10 + player), int(player <= 5)))
+            # Team 2: no starter flags, so the top five by minutes are inferred.
+            rows.append(('g3', 200 + player, 2, '2025-01-02', str(player), 0))
+        conn.execute(
+            text('INSERT INTO player_game_stats (game_id, player_id, team_id, game_date, minutes, is_starter) VALUES (:g, :p, :t, :d, :m, :s)'),
+            [dict(zip('gptdms', r)) for r in rows],
+        )
+    return engine
+
+
+def test_lineups_are_inferred_for_all_teams_in_one_query():
+    engine = seeded_engine()
+    with engine.connect() as conn:
+        df = pd.read_sql(text(lineups.LINEUP_SQL), conn)
+
+    team1 = df[df['team_id'] == 1]
+    team2 = df[df['team_id'] == 2]
+    assert set(team1['game_id']) == {'g2'}
+    assert sorted(team1['player_id']) == [101, 102, 103, 104, 105]
+    assert set(team1['lineup_source']) == {'official_starters'}
+    assert sorted(team2['player_id']) == [203, 204, 205, 206, 207]
+    assert set(team2['lineup_source']) == {'inferred_by_minutes'}
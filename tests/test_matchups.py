@@ -0,0 +1,93 @@
+from itertools import permutations
+
+import numpy as np
+import pandas as pd
+import pytest
+from sqlalchemy import create_engine, text
+
+import db.query
+import etl.matchups as matchups
+from db.migrate import migrate
+
+
+def starters(team_id: int, base: int, positions: list[str], minutes: list[float]) -> pd.DataFrame:
+    return pd.DataFrame(
+        {
+            'team_id': team_id,
+            'player_id': [base + i for i in range(len(positions))],
+            'position': positions,
+            'height_inches': [74 + 2 * i for i in range(len(positions))],
+            'weight': [190 + 15 * i for i in range(len(positions))],
+            'minutes': minutes,
+            'form': [30.0 - 2 * i for i in range(len(positions))],
+        }
+    )
+
+
+def test_position_coords():
+    assert matchups.position_coord('G') == 1.5
+    assert matchups.position_coord('F-C') == 4.25
+    assert np.isnan(matchups.position_coord(None))
+
+
+def brute_force(score: np.ndarray) -> float:
+    n, m = score.shape
+    if n > m:
+        return brute_force(score.T)
+    return max(sum(score[r, c] for r, c in enumerate(cols)) for cols in permutations(range(m), n))
+
+
+def test_best_assignment_matches_brute_force():
+    rng = np.random.default_rng(7)
+    for shape in [(5, 5), (4, 5), (5, 3)]:
+        score = rng.random(shape)
+        pairs = matchups.best_assignment(score)
+        assert len({r for r, _ in pairs}) == len({c for _, c in pairs}) == min(shape)
+        assert sum(score[r, c] for r, c in pairs) == pytest.approx(brute_force(score))
+
+
+def test_each_starter_is_used_once_even_with_duplicate_positions():
+    game = pd.Series({'game_id': 'g1', 'home_team_id': 1, 'away_team_id': 2})
+    home = starters(1, 100, ['G', 'G', 'F', 'F', 'C'], [36, 34, 32, 30, 28])
+    away = starters(2, 200, ['C', 'C', 'G', 'F', 'G-F'], [35, 20, 33, 31, 30])
+    rows = matchups.game_matchups(game, home, away, 'now')
+
+    assert [r['slot'] for r in rows] == [1, 2, 3, 4, 5]
+    assert sorted(r['home_player_id'] for r in rows) == [100, 101, 102, 103, 104]
+    assert sorted(r['away_player_id'] for r in rows) == [200, 201, 202, 203, 204]
+    center = next(r for r in rows if r['home_player_id'] == 104)
+    assert center['away_player_id'] in (200, 201) and center['position_fit'] == 1.0
+    assert all(0 <= r['score'] <= 1 for r in rows)
+
+
+def test_missing_side_keeps_known_starters_unpaired():
+    game = pd.Series({'game_id': 'g1', 'home_team_id': 1, 'away_team_id': 2})
+    home = starters(1, 100, ['G', 'G', 'F', 'F', 'C'], [36, 34, 32, 30, 28])
+    out = matchups.build_matchups(pd.DataFrame([{**game, 'game_date': '2025-01-10'}]), home, 'now')
+    assert len(out) == 5 and out['away_player_id'].isna().all() and out['score'].isna().all()
+
+
+def test_refresh_matchups_writes_the_slate(tmp_path, monkeypatch):
+    engine = create_engine(f"sqlite:///{tmp_path / 'matchups.db'}")
+    migrate(engine)
+    monkeypatch.setattr(matchups, 'get_engine', lambda: engine)
+    monkeypatch.setattr(db.query, 'get_engine', lambda: engine)
+    monkeypatch.setattr(matchups.SETTINGS, 'etl_today', pd.Timestamp('2025-01-10').date())
+    with engine.begin() as conn:
+        conn.execute(text("INSERT INTO schedule (game_id, game_date, home_team_id, away_team_id) VALUES ('g9', '2025-01-10', 1, 2), ('g0', '2025-01-08', 1, 2)"))
+        for team_id, base in ((1, 100), (2, 200)):
+            for i, pos in enumerate(['G', 'G', 'F', 'F', 'C']):
+                player = {'p': base + i, 't': team_id, 'pos': pos, 'h': 74 + 2 * i, 'w': 190 + 15 * i}
+                conn.execute(text('INSERT INTO players (player_id, full_name, team_id, position, height_inches, weight) VALUES (:p, :p, :t, :pos, :h, :w)'), player)
+                conn.execute(
+                    text("INSERT INTO lineups (game_id, team_id, player_id, is_starter, minutes, lineup_source, updated_at) VALUES ('g0', :t, :p, 1, :m, 'official_starters', '2025-01-09')"),
+                    {**player, 'm': 36 - i},
+                )
+                conn.execute(text("INSERT INTO player_game_stats (game_id, player_id, team_id, game_date, pts, reb, ast) VALUES ('g0', :p, :t, '2025-01-08', 20, 5, 5)"), player)
+
+    assert matchups.refresh_matchups() == 5
+    assert matchups.refresh_matchups() == 5  # replaced, not duplicated
+    with engine.connect() as conn:
+        rows = conn.execute(text('SELECT home_player_id, away_player_id, form_fit FROM matchups ORDER BY slot')).fetchall()
+    assert [(h - 100, a - 200) for h, a, _ in rows] == [(0, 0), (1, 1), (2, 2), (3, 3), (4, 4)]
+    assert {f for *_, f in rows} == {1.0}
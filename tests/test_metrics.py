@@ -0,0 +1,40 @@
+import pytest
+
+from app.metrics import Histogram, Profiler, Registry
+
+
+def test_histogram_quantiles_use_bucket_bounds():
+    hist = Histogram()
+    for value in [0.002] * 90 + [0.4] * 9 + [200.0]:
+        hist.observe(value)
+    assert hist.quantile(0.5) == 0.0025
+    assert hist.quantile(0.95) == 0.5
+    assert hist.quantile(1.0) == 200.0
+
+
+def test_span_records_latency_and_errors_and_exports():
+    metrics = Registry()
+    with metrics.span('db_query', query='schedule'):
+        pass
+    with pytest.raises(ValueError):
+        with metrics.span('db_query', query='schedule'):
+            raise ValueError('boom')
+    metrics.inc('db_rows_read_total', 12, query='schedule')
+
+    snap = metrics.snapshot()
+    assert snap['histograms']['db_query_seconds'][0]['count'] == 2
+    assert snap['counters']['db_query_errors_total'][0]['value'] == 1
+
+    prom = metrics.to_prometheus()
+    assert '# TYPE nba_mvp_db_query_seconds histogram' in prom
+    assert 'nba_mvp_db_query_seconds_bucket{query="schedule",le="+Inf"} 2' in prom
+    assert 'nba_mvp_db_rows_read_total{query="schedule"} 12' in prom
+
+
+def test_profiler_only_wraps_selected_stages(tmp_path):
+    profiler = Profiler(frozenset({'lineups'}), 'cprofile', str(tmp_path))
+    with profiler.stage('teams'):
+        pass
+    with profiler.stage('lineups'):
+        sum(range(1000))
+    assert [p.suffix for p in tmp_path.iterdir()] == ['.prof']
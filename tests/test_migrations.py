@@ -0,0 +1,77 @@
+import pytest
+from sqlalchemy import create_engine, inspect
+
+from db.explain import check_plans
+from db.migrate import MigrationError, discover, migrate
+
+
+def write(directory, name, sql):
+    (directory / name).write_text(sql)
+
+
+def test_migrate_applies_each_version_once(tmp_path):
+    write(tmp_path, '0001_base.sql', 'CREATE TABLE t (id INTEGER PRIMARY KEY);')
+    write(tmp_path, '0002_add_col.sql', '-- new column\nALTER TABLE t ADD COLUMN name TEXT;\nCREATE INDEX idx_t_name ON t(name);')
+    engine = create_engine('sqlite://')
+
+    assert [m.version for m in migrate(engine, target=1, directory=tmp_path)] == [1]
+    assert [m.version for m in migrate(engine, directory=tmp_path)] == [2]
+    assert migrate(engine, directory=tmp_path) == []
+    assert {c['name'] for c in inspect(engine).get_columns('t')} == {'id', 'name'}
+    assert [i['name'] for i in inspect(engine).get_indexes('t')] == ['idx_t_name']
+
+
+def test_edited_migration_is_rejected(tmp_path):
+    write(tmp_path, '0001_base.sql', 'CREATE TABLE t (id INTEGER PRIMARY KEY);')
+    engine = create_engine('sqlite://')
+    migrate(engine, directory=tmp_path)
+    write(tmp_path, '0001_base.sql', 'CREATE TABLE t (id INTEGER PRIMARY KEY, extra TEXT);')
+    with pytest.raises(MigrationError):
+        migrate(engine, directory=tmp_path)
+
+
+def test_backend_specific_file_replaces_generic(tmp_path):
+    write(tmp_path, '0001_base.sql', 'SELECT 1;')
+    write(tmp_path, '0002_retype.sql', 'ALTER TABLE t ALTER COLUMN x TYPE REAL;')
+    write(tmp_path, '0002_retype.sqlite.sql', 'SELECT 2;')
+    assert [m.path.name for m in discover('sqlite', tmp_path)] == ['0001_base.sql', '0002_retype.sqlite.sql']
+    assert [m.path.name for m in discover('postgres', tmp_path)] == ['0001_base.sql', '0002_retype.sql']
+
+
+def test_hot_queries_use_indexes_after_migrations():
+    engine = create_engine('sqlite://')
+    migrate(engine)
+    assert {name: issues for name, issues in check_plans(engine).items() if issues} == {}
+
+
+def test_plan_check_flags_missing_indexes():
+    engine = create_engine('sqlite://')
+    migrate(engine)
+    with engine.begin() as conn:
+        for index in ('idx_lineups_team_updated', 'idx_player_stats_player_date', 'idx_players_team'):
+            conn.exec_driver_sql(f'DROP INDEX {index}')
+    failing = {name: {i.kind for i in issues} for name, issues in check_plans(engine).items() if issues}
+    assert failing['player_log_rolling'] == {'temp_sort'}
+    assert failing['scheduled_players'] == {'full_scan'}
+    assert failing['latest_lineup'] == {'temp_sort'}
+
+
+def test_typed_columns_migration_converts_text_values():
+    engine = create_engine('sqlite://')
+    migrate(engine, target=2)
+    with engine.begin() as conn:
+        conn.exec_driver_sql("INSERT INTO players (player_id, full_name, height, weight) VALUES (1, 'A', '6-7', '225'), (2, 'B', '', 'n/a')")
+        conn.exec_driver_sql(
+            "INSERT INTO player_game_stats (game_id, player_id, minutes) VALUES ('g1', 1, '34:30'), ('g2', 1, '20'), ('g3', 1, 'DNP'), ('g4', 1, NULL)"
+        )
+        conn.exec_driver_sql("INSERT INTO lineups (game_id, team_id, player_id, minutes) VALUES ('g1', 1, 1, '12:06')")
+    migrate(engine)
+
+    with engine.connect() as conn:
+        minutes = dict(conn.exec_driver_sql('SELECT game_id, minutes FROM player_game_stats').fetchall())
+        players = conn.exec_driver_sql('SELECT player_id, height_inches, weight FROM players ORDER BY player_id').fetchall()
+        lineup = conn.exec_driver_sql('SELECT minutes FROM lineups').scalar()
+    assert minutes == {'g1': 34.5, 'g2': 20.0, 'g3': None, 'g4': None}
+    assert [tuple(r) for r in players] == [(1, 79, 225), (2, None, None)]
+    assert lineup == 12.1
+    assert {i['name'] for i in inspect(engine).get_indexes('player_game_stats')} >= {'idx_player_stats_player_date', 'idx_player_stats_team_date'}
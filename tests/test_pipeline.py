@@ -0,0 +1,74 @@
+import threading
+
+import pytest
+from sqlalchemy import create_engine, text
+
+from db.bulk import bulk_upsert
+from etl.pipeline import PipelineError, Stage, load_stages, run_pipeline, select_stages
+
+
+def make_stages(calls, barrier=None, fail=None):
+    def body(name):
+        def run():
+            if barrier is not None and name in ('rosters', 'recent_games'):
+                barrier.wait(timeout=5)
+            if name == fail:
+                raise RuntimeError('boom')
+            calls.append(name)
+            return 1
+
+        return run
+
+    spec = [('teams', ()), ('schedule', ('teams',)), ('rosters', ('schedule',)), ('recent_games', ('schedule',)), ('lineups', ('rosters',))]
+    return {name: Stage(name, body(name), after) for name, after in spec}
+
+
+def test_real_stages_are_registered_in_order():
+    assert list(load_stages()) == ['teams', 'schedule', 'rosters', 'recent_games', 'player_gamelogs', 'lineups', 'rolling_stats', 'history', 'matchups', 'player_index']
+
+
+def test_independent_stages_overlap_and_rows_are_reported():
+    calls = []
+    report = run_pipeline(stages=make_stages(calls, barrier=threading.Barrier(2)))
+    assert calls[:2] == ['teams', 'schedule']
+    assert calls[-1] == 'lineups'
+    assert [r.rows for r in report.results] == [1, 1, 1, 1, 1]
+
+
+def test_subset_selection():
+    stages = make_stages([])
+    assert select_stages(stages, only=['lineups']) == ['lineups']
+    assert select_stages(stages, start_from='rosters') == ['rosters', 'recent_games', 'lineups']
+    with pytest.raises(ValueError):
+        select_stages(stages, only=['nope'])
+
+
+def test_failure_skips_downstream_stages():
+    with pytest.raises(PipelineError) as err:
+        run_pipeline(stages=make_stages([], fail='rosters'))
+    statuses = {r.name: r.status for r in err.value.report.results}
+    assert statuses['rosters'] == 'failed'
+    assert statuses['lineups'] == 'skipped'
+
+
+def test_progress_is_reported_as_stages_start_and_finish():
+    snapshots = []
+    run_pipeline(stages=make_stages([]), on_progress=lambda results: snapshots.append({r.name: r.status for r in results}))
+    assert len(snapshots) == 10
+    assert snapshots[0]['teams'] == 'running' and snapshots[0]['lineups'] == 'pending'
+    assert set(snapshots[-1].values()) == {'ok'}
+
+
+def test_stage_reports_change_counts(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'changes.db'}")
+    with engine.begin() as conn:
+        conn.execute(text('CREATE TABLE teams (team_id INTEGER PRIMARY KEY, name TEXT, updated_at TEXT, row_hash BIGINT)'))
+
+    def load_teams():
+        with engine.begin() as conn:
+            return bulk_upsert(conn, 'teams', [{'team_id': 1, 'name': 'A'}, {'team_id': 2, 'name': 'B'}], ['team_id'], detect_changes=True).rows
+
+    stages = {'teams': Stage('teams', load_teams)}
+    first, second = run_pipeline(stages=stages).results[0], run_pipeline(stages=stages).results[0]
+    assert (first.rows, first.inserted, first.unchanged) == (2, 2, 0)
+    assert (second.rows, second.inserted, second.updated, second.unchanged) == (0, 0, 0, 2)
@@ -0,0 +1,91 @@
+import pandas as pd
+from sqlalchemy import create_engine, text
+
+import db.query
+import etl.backfill as backfill
+import etl.player_index as player_index
+from app.players import PlayerIndex, load_player_index, search_key
+from db.migrate import migrate
+from db.versions import load_versions
+
+PLAYERS = [
+    (1, 'Luka Dončić', 10, 'DAL', 'G-F', 400, '2025-01-09'),
+    (2, 'Lukas Kennard', 20, 'MEM', 'G', 500, '2025-01-08'),
+    (3, "De'Aaron Fox", 30, 'SAS', 'G', 550, '2025-01-09'),
+    (4, 'Anthony Davis', 10, 'DAL', 'F-C', 700, '2025-01-09'),
+    (5, 'Davis Bertans', None, None, 'F', 450, '2023-04-01'),
+]
+
+
+def make_index() -> PlayerIndex:
+    frame = pd.DataFrame(PLAYERS, columns=['player_id', 'full_name', 'team_id', 'team_abbreviation', 'position', 'games', 'last_game_date'])
+    frame['team_id'] = frame['team_id'].astype('Int64')
+    return PlayerIndex.from_frame(frame.assign(search_name=frame['full_name'].map(search_key)))
+
+
+def names(found: pd.DataFrame) -> list[str]:
+    return found['full_name'].tolist()
+
+
+def test_search_matches_prefixes_typos_ids_and_filters():
+    index = make_index()
+    assert search_key("  P.J. Tucker-Smith ") == 'pj tucker smith'
+    assert names(index.search('luka')) == ['Luka Dončić', 'Lukas Kennard']
+    assert names(index.search('doncic luka')) == ['Luka Dončić']
+    assert names(index.search('deaaron')) == ["De'Aaron Fox"]
+    # Whole-name prefixes rank first, then word prefixes by most recent game.
+    assert names(index.search('davis')) == ['Davis Bertans', 'Anthony Davis']
+    assert names(index.search('antony dvis')) == ['Anthony Davis']
+    assert names(index.search('4')) == ['Anthony Davis']
+    assert names(index.search('luka', position='F')) == ['Luka Dončić']
+    assert names(index.search('', team_id=10)) == ['Anthony Davis', 'Luka Dončić']
+    assert index.search('zzzz', position='C').empty
+    assert index.teams() == {'DAL': 10, 'MEM': 20, 'SAS': 30}
+
+
+def test_refresh_indexes_roster_and_log_only_players(tmp_path, monkeypatch):
+    engine = create_engine(f"sqlite:///{tmp_path / 'players.db'}")
+    migrate(engine)
+    monkeypatch.setattr(player_index, 'get_engine', lambda: engine)
+    monkeypatch.setattr(player_index, 'static_player_names', lambda: {})
+    monkeypatch.setattr(db.query, 'get_engine', lambda: engine)
+    with engine.begin() as conn:
+        conn.execute(text("INSERT INTO teams (team_id, name, abbreviation) VALUES (1, 'Hawks', 'ATL'), (2, 'Celtics', 'BOS')"))
+        conn.execute(text("INSERT INTO players (player_id, full_name, team_id, position) VALUES (7, 'Trae Young', 1, 'G')"))
+        conn.execute(text(
+            "INSERT INTO player_game_stats (game_id, player_id, team_id, game_date) VALUES "
+            "('g1', 7, 1, '2025-01-01'), ('g2', 7, 1, '2025-01-03'), ('g0', 9, 2, '2019-03-01'), ('g3', 9, 1, '2020-02-01')"
+        ))
+
+    assert player_index.refresh_player_index() == 2
+    index = load_player_index()
+    trae = index.search('trae').iloc[0]
+    assert (trae['team_abbreviation'], trae['games'], trae['first_game_date'], trae['last_game_date']) == ('ATL', 2, '2025-01-01', '2025-01-03')
+    assert index.search('9')[['full_name', 'team_id']].values.tolist() == [['Player 9', 1]]  # no name anywhere; last team played for
+
+    version = load_versions()['player_index']
+    assert player_index.refresh_player_index() == 0
+    assert load_versions()['player_index'] == version  # nothing changed, so cached indexes stay valid
+
+
+def test_backfilled_players_are_found_by_name(tmp_path, monkeypatch):
+    engine = create_engine(f"sqlite:///{tmp_path / 'players.db'}")
+    migrate(engine)
+    for module in (player_index, backfill, db.query):
+        monkeypatch.setattr(module, 'get_engine', lambda: engine)
+    monkeypatch.setattr(player_index, 'static_player_names', lambda: {8: 'Dikembe Mutombo'})
+    logs = pd.DataFrame(
+        {'GAME_ID': 'g0', 'PLAYER_ID': [3, 4], 'PLAYER_NAME': ['Allen Iverson', 'Aaron McKie'], 'TEAM_ID': 2, 'GAME_DATE': '2001-03-01', 'PTS': [40, 12]}
+    )
+    monkeypatch.setattr(backfill, 'fetch_unit', lambda unit: (pd.DataFrame(), logs))
+    with engine.begin() as conn:
+        conn.execute(text("INSERT INTO teams (team_id, name, abbreviation) VALUES (2, '76ers', 'PHI')"))
+        conn.execute(text("INSERT INTO player_game_stats (game_id, player_id, team_id, game_date) VALUES ('g1', 8, 2, '2001-03-03')"))
+
+    backfill.run_unit(backfill.Unit('2000-01', 2))
+    player_index.refresh_player_index()
+    index = load_player_index()
+    assert names(index.search('iverson')) == ['Allen Iverson']
+    assert names(index.search('mckei')) == ['Aaron McKie']
+    assert index.search('allen').iloc[0]['team_abbreviation'] == 'PHI'
+    assert names(index.search('mutombo')) == ['Dikembe Mutombo']  # a log from before backfill added players rows
@@ -0,0 +1,129 @@
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime
+from types import SimpleNamespace
+
+import pytest
+from sqlalchemy import create_engine, text
+from sqlalchemy.exc import IntegrityError
+
+import db.query
+import db.refresh as queue
+import etl.refresh as refresh
+from app.config import Settings
+from db.migrate import migrate
+from etl.pipeline import PipelineError, PipelineReport, StageResult
+
+
+@pytest.fixture
+def engine(tmp_path, monkeypatch):
+    engine = create_engine(f"sqlite:///{tmp_path / 'refresh.db'}")
+    migrate(engine)
+    monkeypatch.setattr(queue, 'get_engine', lambda url=None: engine)
+    monkeypatch.setattr(db.query, 'get_engine', lambda: engine)
+    monkeypatch.setattr(refresh, 'HTTP_CACHE', SimpleNamespace(maintain=lambda: {}))
+    return engine
+
+
+def service(tmp_path, runner, owner='worker-a'):
+    settings = Settings(metrics_dir=str(tmp_path / 'metrics'), refresh_interval_minutes=60, refresh_game_day_minutes=10)
+    return refresh.RefreshService(runner, owner=owner, settings=settings)
+
+
+def test_requests_coalesce_while_queued(engine):
+    first = queue.request_refresh(requested_by='a')
+    assert queue.request_refresh(requested_by='b') == first
+    with pytest.raises(IntegrityError), engine.begin() as conn:
+        conn.execute(text("INSERT INTO refresh_runs (run_id, kind, status, requested_at) VALUES ('racer', 'manual', 'queued', '2000-01-01')"))
+
+    assert queue.claim_next() == first
+    assert queue.claim_next() is None
+    follow_up = queue.request_refresh()
+    status = queue.refresh_status()
+    assert status['running']['run_id'] == first
+    assert status['queued']['run_id'] == follow_up
+
+
+def test_concurrent_requests_queue_one_run(engine):
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        run_ids = set(pool.map(lambda n: queue.request_refresh(requested_by=f'session-{n}'), range(16)))
+    assert len(run_ids) == 1
+    with engine.connect() as conn:
+        assert conn.execute(text("SELECT COUNT(*) FROM refresh_runs WHERE status = 'queued'")).scalar() == 1
+
+
+def test_lease_admits_one_live_worker(engine):
+    assert queue.acquire_lease('a', 60)
+    assert not queue.acquire_lease('b', 60)
+    assert queue.acquire_lease('a', -1)  # renewed, but already expired
+    assert queue.acquire_lease('b', 60)
+    assert queue.refresh_status()['worker'] == 'b'
+    queue.release_lease('b')
+    assert queue.refresh_status()['worker'] is None
+
+
+def test_service_runs_scheduled_and_requested_refreshes(engine, tmp_path):
+    calls = []
+
+    def runner(on_progress):
+        calls.append('run')
+        on_progress([StageResult('teams', 'ok'), StageResult('schedule', 'running')])
+        return PipelineReport([StageResult('teams', 'ok', rows=3)])
+
+    worker = service(tmp_path, runner)
+    first = worker.tick()
+    assert first is not None and calls == ['run']
+    assert worker.tick() is None  # not due again for an hour
+
+    queue.request_refresh(requested_by='dashboard')
+    assert worker.tick() is not None and len(calls) == 2
+    last = queue.refresh_status()['last']
+    assert (last['status'], last['rows_written'], last['stages_done'], last['stages_total']) == ('ok', 3, 1, 2)
+    assert not service(tmp_path, runner, owner='worker-b').hold_lease()
+
+
+def test_failed_and_orphaned_runs_are_recorded(engine, tmp_path):
+    def runner(on_progress):
+        raise PipelineError(PipelineReport([StageResult('rosters', 'failed', error='timeout')]))
+
+    service(tmp_path, runner).tick()
+    last = queue.refresh_status()['last']
+    assert last['status'] == 'failed' and 'rosters' in last['error']
+
+    queue.request_refresh()
+    stuck = queue.claim_next()  # a worker claims it, then dies without finishing
+    queue.release_lease('worker-a')
+    assert service(tmp_path, runner, owner='worker-b').hold_lease()
+    assert queue.refresh_status()['last']['run_id'] == stuck
+
+
+def test_game_days_refresh_more_often(engine, tmp_path):
+    settings = service(tmp_path, None).settings
+    assert refresh.refresh_interval(date(2025, 1, 10), settings).total_seconds() == 3600
+    with engine.begin() as conn:
+        conn.execute(text("INSERT INTO schedule (game_id, game_date, home_team_id, away_team_id) VALUES ('g1', '2025-01-10', 1, 2)"))
+    assert refresh.refresh_interval(date(2025, 1, 10), settings).total_seconds() == 600
+    worker = service(tmp_path, None)
+    worker.last_started = datetime.utcnow()
+    assert not worker.due(datetime.utcnow())
+
+
+def test_successful_run_publishes_a_snapshot(engine, tmp_path, monkeypatch):
+    published = []
+
+    def publish(settings):
+        published.append(settings.db_snapshots)
+        if len(published) > 1:
+            raise RuntimeError('disk full')
+        return SimpleNamespace(name='nba.1.db', seconds=0.1)
+
+    monkeypatch.setattr(refresh, 'publish_snapshot', publish)
+    worker = service(tmp_path, lambda on_progress: PipelineReport([StageResult('teams', 'ok', rows=3)]))
+    worker.settings.db_snapshots = True
+    worker.tick()
+    assert queue.refresh_status()['last']['status'] == 'ok'
+
+    queue.request_refresh()
+    worker.tick()
+    last = queue.refresh_status()['last']
+    assert published == [True, True]
+    assert last['status'] == 'failed' and 'snapshot not published' in last['error']
@@ -0,0 +1,38 @@
+import pytest
+import requests
+
+from etl.replay import FaultConfig, FixtureMissing, FixtureStore, ReplayAdapter, fixture_key, mounted
+
+URL = 'https://stats.nba.com/stats/commonteamroster?TeamID=1610612737&Season=2024-25'
+
+
+def test_fixture_key_ignores_parameter_order():
+    reordered = 'https://stats.nba.com/stats/CommonTeamRoster?Season=2024-25&TeamID=1610612737'
+    assert fixture_key(URL)[0] == 'commonteamroster'
+    assert fixture_key(URL)[2] == fixture_key(reordered)[2]
+
+
+def test_replay_serves_fixtures_and_injects_faults(tmp_path):
+    store = FixtureStore(tmp_path)
+    store.save(URL, 200, '{"resultSets": []}')
+
+    with mounted(ReplayAdapter(store)) as adapter:
+        assert requests.get(URL, timeout=1).json() == {'resultSets': []}
+        with pytest.raises(FixtureMissing):
+            requests.get(URL.replace('1610612737', '1'), timeout=1)
+    assert adapter.stats.served == 1 and adapter.stats.missing == 1
+
+    with mounted(ReplayAdapter(store, FaultConfig(rate_limit_rate=1.0))) as adapter:
+        assert requests.get(URL, timeout=1).status_code == 429
+    with mounted(ReplayAdapter(store, FaultConfig(timeout_rate=1.0))):
+        with pytest.raises(requests.exceptions.Timeout):
+            requests.get(URL, timeout=1)
+
+
+def test_responder_answers_are_recorded_for_replay(tmp_path):
+    store = FixtureStore(tmp_path)
+    responder = ReplayAdapter(store, responder=lambda endpoint, params: {'endpoint': endpoint, 'team': params['TeamID']}, record=True)
+    with mounted(responder):
+        requests.get(URL, timeout=1)
+    with mounted(ReplayAdapter(store)):
+        assert requests.get(URL, timeout=1).json() == {'endpoint': 'commonteamroster', 'team': '1610612737'}
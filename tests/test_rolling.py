@@ -0,0 +1,28 @@
+import pandas as pd
+
+from etl.rolling import PLAYER_TOTALS, compute_totals, season_for_dates
+
+
+def test_season_for_dates_rolls_over_in_october():
+    dates = pd.Series(['2024-10-22', '2025-04-13', '2025-10-01'])
+    assert season_for_dates(dates).tolist() == ['2024-25', '2024-25', '2025-26']
+
+
+def test_compute_totals_continues_from_base_row():
+    games = pd.DataFrame(
+        {
+            'entity_id': [7, 7, 8],
+            'game_id': ['g3', 'g2', 'g1'],
+            'game_date': ['2025-01-03', '2025-01-02', '2025-01-01'],
+            'minutes': ['30', '20:30', None],
+            'pts': [10, 20, 5], 'reb': [1, 2, 3], 'ast': [0, 1, 0], 'stl': [0, 0, 0], 'blk': [0, 0, 0],
+            'tov': [0, 0, 0], 'fg_pct': [0.5, 0.5, 0.5], 'fg3_pct': [0.1, 0.2, 0.3],
+        }
+    )
+    base = pd.DataFrame([{'player_id': 7, 'game_seq': 4, 'gp': 4, **{f'{s}_sum': 100 for s in PLAYER_TOTALS.stats}}])
+    out = compute_totals(PLAYER_TOTALS, games, base, 'now').set_index(['player_id', 'game_seq'])
+
+    assert out.loc[(7, 5), 'game_id'] == 'g2'
+    assert out.loc[(7, 6), 'pts_sum'] == 130
+    assert out.loc[(7, 6), 'minutes_sum'] == 150.5
+    assert out.loc[(8, 1), 'gp'] == 1
@@ -0,0 +1,75 @@
+import pandas as pd
+import pytest
+from sqlalchemy import create_engine, text
+
+import db.query
+import etl.rolling as rolling
+from app.queries import LATEST_LINEUP_DTYPES, LATEST_LINEUP_SQL, TEAM_LAST5_DTYPES, TEAM_LAST5_SQL
+from app.slate import load_slate
+from app.stats import player_log_with_rolling, window_averages
+from db.migrate import migrate
+from db.query import read_df
+
+
+@pytest.fixture
+def engine(tmp_path, monkeypatch):
+    engine = create_engine(f"sqlite:///{tmp_path / 'slate.db'}")
+    migrate(engine)
+    monkeypatch.setattr(db.query, 'get_engine', lambda: engine)
+    monkeypatch.setattr(rolling, 'get_engine', lambda: engine)
+    with engine.begin() as conn:
+        for team_id in (1, 2, 3, 4):
+            conn.execute(text("INSERT INTO teams (team_id, name, abbreviation) VALUES (:t, :n, :n)"), {'t': team_id, 'n': f'T{team_id}'})
+        conn.execute(text(
+            "INSERT INTO schedule (game_id, game_date, home_team_id, away_team_id) VALUES ('s1', '2025-01-20', 1, 2), ('s2', '2025-01-20', 3, 4)"
+        ))
+        for team_id in (1, 2, 3):
+            for day in range(1, 13):
+                game = {'g': f'g{day}', 't': team_id, 'd': f'2025-01-{day:02d}', 'pts': 100 + day + team_id, 'wl': 'W' if day % 2 else 'L'}
+                conn.execute(text(
+                    "INSERT INTO team_game_stats (game_id, team_id, game_date, matchup, wl, pts, reb, ast, tov, fg_pct, fg3_pct, plus_minus) "
+                    "VALUES (:g, :t, :d, 'vs', :wl, :pts, 40, 20, 10, 0.5, 0.3, 2)"
+                ), game)
+                for slot in range(5):
+                    conn.execute(text(
+                        "INSERT INTO player_game_stats (game_id, player_id, team_id, game_date, matchup, minutes, pts, reb, ast, stl, blk, tov, fg_pct, fg3_pct) "
+                        "VALUES (:g, :p, :t, :d, 'vs', :m, :pts, 5, 3, 1, 0, 2, 0.5, 0.3)"
+                    ), {**game, 'p': team_id * 100 + slot, 'm': 30 - slot, 'pts': day + slot})
+            for slot in range(5):
+                player = {'p': team_id * 100 + slot, 't': team_id}
+                conn.execute(text("INSERT INTO players (player_id, full_name, team_id, position) VALUES (:p, :p, :t, 'G')"), player)
+                # An older, partial lineup, then the latest one the slate should pick.
+                games = ['g11', 'g12'] if slot < 4 else ['g12']
+                conn.execute(text(
+                    "INSERT INTO lineups (game_id, team_id, player_id, is_starter, minutes, lineup_source, updated_at) "
+                    "VALUES (:g, :t, :p, 1, :m, 'official_starters', :u)"
+                ), [{**player, 'g': g, 'm': 30 - slot, 'u': f'2025-01-{g[1:]}'} for g in games])
+    rolling.refresh_totals(rolling.PLAYER_TOTALS)
+    rolling.refresh_totals(rolling.TEAM_TOTALS)
+    return engine
+
+
+@pytest.mark.parametrize('window', [5, None])
+def test_slate_matches_single_entity_queries(engine, window):
+    slate = load_slate(pd.Timestamp('2025-01-20').date(), window)
+    assert slate.games['game_id'].tolist() == ['s1', 's2']
+
+    for team_id in (1, 2, 3, 4):
+        pd.testing.assert_frame_equal(slate.team_last5(team_id), read_df(TEAM_LAST5_SQL, {'team_id': team_id}, dtype=TEAM_LAST5_DTYPES))
+        expected = read_df(LATEST_LINEUP_SQL, {'team_id': team_id}, dtype=LATEST_LINEUP_DTYPES)
+        pd.testing.assert_frame_equal(slate.latest_lineup(team_id)[expected.columns], expected, check_dtype=not expected.empty)
+        pd.testing.assert_frame_equal(slate.form('team', team_id), window_averages('team', team_id, window), check_dtype=False)
+        for player_id in expected['player_id']:
+            pd.testing.assert_frame_equal(slate.player_log(player_id), player_log_with_rolling(player_id, window), check_dtype=False)
+            pd.testing.assert_frame_equal(slate.form('player', player_id), window_averages('player', player_id, window), check_dtype=False)
+
+    assert slate.latest_lineup(1)['game_id'].unique().tolist() == ['g12']
+    assert slate.latest_lineup(4).empty and slate.team_last5(4).empty
+
+
+def test_slate_lookups_issue_no_queries(engine, monkeypatch):
+    slate = load_slate(pd.Timestamp('2025-01-20').date())
+    monkeypatch.setattr(db.query, 'get_engine', lambda: pytest.fail('slate lookup hit the database'))
+    assert len(slate.team_last5(2)) == 5
+    assert len(slate.player_log(301)) == 10
+    assert slate.game_matchups('s1').empty
@@ -0,0 +1,53 @@
+import pytest
+from sqlalchemy import text
+
+import db.database as database
+from app.config import Settings
+from db.migrate import migrate
+from db.query import fetch_all
+from db.snapshot import SnapshotError, publish_snapshot
+
+COUNT_SQL = 'SELECT COUNT(*) FROM teams'
+
+
+@pytest.fixture
+def settings(tmp_path, monkeypatch):
+    settings = Settings(sqlite_path=str(tmp_path / 'live.db'), db_snapshots=True, db_snapshot_keep=2)
+    monkeypatch.setattr(database, 'get_settings', lambda: settings)
+    monkeypatch.setattr(database, '_SNAPSHOTS', {'enabled': False, 'key': None, 'url': None})
+    migrate(database.get_engine(settings.database_url()))
+    yield settings
+    database.dispose_engines()
+
+
+def add_team(team_id: int) -> None:
+    with database.get_engine(database.live_url()).begin() as conn:
+        conn.execute(text("INSERT INTO teams (team_id, name, abbreviation) VALUES (:t, 'T', 'T')"), {'t': team_id})
+        conn.execute(text("INSERT INTO schedule (game_id, game_date, home_team_id, away_team_id) VALUES (:g, '2025-01-01', :t, :t)"), {'g': f'g{team_id}', 't': team_id})
+
+
+def test_readers_move_to_each_published_snapshot(settings):
+    add_team(1)
+    database.read_snapshots()
+    assert fetch_all(COUNT_SQL)[0][0] == 1  # nothing published yet: the live database
+
+    first = publish_snapshot(settings).name
+    add_team(2)
+    assert str(database.get_engine().url).endswith(first)
+    assert fetch_all(COUNT_SQL)[0][0] == 1  # live writes stay invisible until the next publish
+
+    second = publish_snapshot(settings).name
+    assert fetch_all(COUNT_SQL)[0][0] == 2
+    assert str(database.get_engine().url).endswith(second)
+
+    publish_snapshot(settings)
+    snapshots = sorted(p.name for p in database.snapshot_dir(settings).glob('*.db'))
+    assert len(snapshots) == 2 and first not in snapshots
+
+
+def test_invalid_snapshot_is_not_swapped_in(settings):
+    with pytest.raises(SnapshotError):
+        publish_snapshot(settings)
+    directory = database.snapshot_dir(settings)
+    assert not (directory / database.SNAPSHOT_POINTER).exists()
+    assert not list(directory.iterdir())
@@ -0,0 +1,10 @@
+from benchmarks.startup import ENTRY_POINTS, import_profile
+
+# Only runs that call the API (or open an ORM session) should pay for these.
+DEFERRED = ('nba_api.stats.endpoints', 'requests_cache', 'requests', 'tenacity', 'sqlalchemy.orm')
+
+
+def test_stage_import_defers_api_and_orm_modules():
+    profile = import_profile(ENTRY_POINTS['etl/01_load_teams.py'])
+    assert 'etl.common' in profile.modules and profile.total_us > 0
+    assert not [name for name in DEFERRED if name in profile.modules]
@@ -1,6 +1,8 @@
 from types import SimpleNamespace
 
-from etl.transforms import parse_team_game_row
+import pandas as pd
+
+from etl.transforms import height_inches, normalize_player_games, normalize_team_games, parse_team_game_row, whole_number
 
 
 def test_parse_team_game_row():
@@ -23,3 +25,57 @@ def test_parse_team_game_row():
     assert parsed['team_id'] == 1610612747
     assert parsed['pts'] == 110
     assert parsed['fg_pct'] == 0.48
+
+
+def test_normalize_player_games_coerces_and_filters_columnar():
+    logs = pd.DataFrame(
+        {
+            'GAME_ID': ['0022400001', '0022400002', None],
+            'TEAM_ID': [1610612747, 1610612747, 1610612747],
+            'GAME_DATE': ['2025-01-02', 'not a date', '2025-01-03'],
+            'MATCHUP': ['LAL vs BOS', 'LAL @ NYK', 'LAL @ MIA'],
+            'MIN': ['34:30', '20', '12'],
+            'PTS': [30, None, 5],
+            'REB': ['7', 3, 1],
+            'AST': [5, 2, 0],
+            'STL': [1, 0, 0],
+            'BLK': [0, 0, 0],
+            'TOV': [2, 1, 0],
+            'FG_PCT': [0.5, None, 0.2],
+            'FG3_PCT': [0.4, 0.1, None],
+            'START_POSITION': ['F', '', None],
+        }
+    )
+    out = normalize_player_games(logs, player_id=2544, updated_at='now')
+
+    assert len(out) == 1
+    row = out.iloc[0]
+    assert row['game_id'] == '0022400001'
+    assert row['player_id'] == 2544
+    assert row['game_date'] == '2025-01-02'
+    assert row['minutes'] == 34.5
+    assert row['reb'] == 7
+    assert bool(row['is_starter']) is True
+    assert row['updated_at'] == 'now'
+
+
+def test_normalize_team_games_matches_row_parser():
+    games = pd.DataFrame(
+        {
+            'GAME_ID': ['001'], 'TEAM_ID': [1610612747], 'GAME_DATE': pd.to_datetime(['2025-01-01']),
+            'MATCHUP': ['LAL vs BOS'], 'WL': ['W'], 'PTS': [110], 'REB': [44], 'AST': [25], 'TOV': [12],
+            'FG_PCT': [0.48], 'FG3_PCT': [0.37], 'PLUS_MINUS': [8],
+        }
+    )
+    out = normalize_team_games(games)
+    expected = parse_team_game_row(next(games.itertuples()))
+    assert out.iloc[0].to_dict() == expected
+
+
+def test_roster_height_and_weight_parsing():
+    assert height_inches('6-7') == 79
+    assert height_inches(' 7-0') == 84
+    assert height_inches('') is None
+    assert height_inches(None) is None
+    assert whole_number('225') == 225
+    assert whole_number(' ') is None
@@ -0,0 +1,30 @@
+import pandas as pd
+from sqlalchemy import create_engine, text
+
+import db.query
+from db.migrate import migrate
+from etl.watermarks import past_stored_games, select_stale
+
+
+def test_select_stale_teams_only_returns_teams_that_played_since_mark():
+    marks = {1: '2025-01-10', 2: '2025-01-10'}
+    played = {1: '2025-01-11', 2: '2025-01-09', 3: '2025-01-11'}
+    assert select_stale([1, 2, 3], marks, played) == [1, 3]
+
+
+def test_select_stale_players_follow_their_team():
+    marks = {10: '2025-01-10', 20: '2025-01-10'}
+    played = {1: '2025-01-11', 2: '2025-01-10'}
+    team_of = {10: 1, 20: 2, 30: 2}
+    assert select_stale([10, 20, 30], marks, played, team_of) == [10, 30]
+
+
+def test_past_stored_games_flags_rows_after_each_entitys_latest_stored_game(tmp_path, monkeypatch):
+    engine = create_engine(f"sqlite:///{tmp_path / 'marks.db'}")
+    migrate(engine)
+    monkeypatch.setattr(db.query, 'get_engine', lambda: engine)
+    with engine.begin() as conn:
+        conn.execute(text("INSERT INTO team_game_stats (game_id, team_id, game_date) VALUES ('g1', 1, '2025-01-10'), ('g2', 2, '2025-01-12')"))
+    rows = pd.DataFrame({'game_id': ['g1', 'g3', 'g2', 'g4'], 'team_id': [1, 1, 2, 3], 'game_date': ['2025-01-10', '2025-01-11', '2025-01-12', '2025-01-01']})
+    assert past_stored_games(rows, 'team_id').tolist() == [False, True, False, True]
+    assert past_stored_games(rows.iloc[:0], 'team_id').empty